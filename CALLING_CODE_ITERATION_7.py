@@ -1,16 +1,17 @@
 # CALLING_CODE_BATCH_RUN.py
 
+import os
 import pandas as pd
 import numpy as np
-import importlib.util
+
+from tail_structure import run_tail_structure
+from detailed_codes import load_path
 
 # ==================================================
 # HELPER: LOAD FUNCTION DIRECTLY FROM FILE PATH
 # ==================================================
 def load_function_from_file(file_path, function_name):
-    spec = importlib.util.spec_from_file_location("loaded_module", file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    module = load_path(file_path, "loaded_module")
 
     if not hasattr(module, function_name):
         raise RuntimeError(
@@ -20,20 +21,6 @@ def load_function_from_file(file_path, function_name):
 
     return getattr(module, function_name)
 
-# ==================================================
-# USER INPUTS
-# ==================================================
-print("\n=== MDAO CALLING CODE (BATCH MODE) ===")
-
-WING_CODE_PATH = input("Path to wing_analysis.py: ").strip()
-FUSELAGE_CODE_PATH = input("Path to fuselage_analysis.py: ").strip()
-TAIL_CODE_PATH = input("Path to tail_analysis.py: ").strip()
-
-DIMENSIONS_CSV = input("Path to aircraft_dimensions.csv: ").strip()
-AIRFOIL_CSV = input("Path to airfoil file (x y): ").strip()
-
-OUTPUT_CSV = input("Output CSV name (e.g. run01_results.csv): ").strip()
-
 # ==================================================
 # FIXED ASSUMPTIONS (LOCKED)
 # ==================================================
@@ -50,31 +37,19 @@ TAIL_E = 3000.0
 
 DENSITY_DEFAULT = 140.0  # kg/m3
 
-# ==================================================
-# LOAD ANALYSIS FUNCTIONS
-# ==================================================
-wing_spar_sizing = load_function_from_file(WING_CODE_PATH, "wing_spar_sizing")
-fuselage_moi_analysis = load_function_from_file(FUSELAGE_CODE_PATH, "fuselage_moi_analysis")
-run_tail_structure = load_function_from_file(TAIL_CODE_PATH, "run_tail_structure")
-
-# ==================================================
-# READ FILES
-# ==================================================
-df = pd.read_csv(DIMENSIONS_CSV)
-
-if "aircraft_id" not in df.columns:
-    raise ValueError("CSV must contain aircraft_id")
-
-airfoil_coords = np.loadtxt(AIRFOIL_CSV)
-
-results_rows = []
 
 # ==================================================
-# MAIN LOOP — ALL AIRCRAFT
+# ONE AIRCRAFT
 # ==================================================
-for _, row in df.iterrows():
+def analyze_aircraft(
+    row,
+    wing_spar_sizing,
+    fuselage_moi_analysis,
+    airfoil_csv,
+    airfoil_coords,
+    output_dir="."
+):
     aircraft_id = row["aircraft_id"]
-    print(f"\n▶ Running aircraft: {aircraft_id}")
 
     # ---------------- WING ----------------
     wing_out = wing_spar_sizing(
@@ -85,7 +60,7 @@ for _, row in df.iterrows():
 
     # ---------------- FUSELAGE ----------------
     fus_out = fuselage_moi_analysis(
-        airfoil_csv=AIRFOIL_CSV,
+        airfoil_csv=airfoil_csv,
         baseplate_gap=BASEPLATE_GAP_MM,
         w=row["fuse_rib_chord_mm"],
         tw=TW_MM,
@@ -94,7 +69,7 @@ for _, row in df.iterrows():
         k_min=K_MIN_MM,
         step=K_STEP_MM,
         point_loads=[],
-        output_csv=f"fuselage_{aircraft_id}.csv"
+        output_csv=os.path.join(output_dir, f"fuselage_{aircraft_id}.csv")
     )
 
     # ---------------- TAIL ----------------
@@ -117,19 +92,70 @@ for _, row in df.iterrows():
     )
 
     # ---------------- COLLECT ----------------
-    results_rows.append({
+    return {
         "aircraft_id": aircraft_id,
         "wing_b1_mm": wing_out["b1_mm"],
         "wing_b2_mm": wing_out["b2_mm"],
         "tail_feasible": tail_ok,
         "tail_mass_g_per_m": tail_best["mass_g_per_m"] if tail_ok else None,
         "fuselage_rows": len(fus_out)
-    })
+    }
+
+
+def main():
+    # ==================================================
+    # USER INPUTS
+    # ==================================================
+    print("\n=== MDAO CALLING CODE (BATCH MODE) ===")
+
+    WING_CODE_PATH = input("Path to wing_analysis.py: ").strip()
+    FUSELAGE_CODE_PATH = input("Path to fuselage_analysis.py: ").strip()
+
+    DIMENSIONS_CSV = input("Path to aircraft_dimensions.csv: ").strip()
+    AIRFOIL_CSV = input("Path to airfoil file (x y): ").strip()
+
+    OUTPUT_CSV = input("Output CSV name (e.g. run01_results.csv): ").strip()
+
+    # ==================================================
+    # LOAD ANALYSIS FUNCTIONS
+    # ==================================================
+    wing_spar_sizing = load_function_from_file(WING_CODE_PATH, "wing_spar_sizing")
+    fuselage_moi_analysis = load_function_from_file(FUSELAGE_CODE_PATH, "fuselage_moi_analysis")
+
+    # ==================================================
+    # READ FILES
+    # ==================================================
+    df = pd.read_csv(DIMENSIONS_CSV)
+
+    if "aircraft_id" not in df.columns:
+        raise ValueError("CSV must contain aircraft_id")
+
+    airfoil_coords = np.loadtxt(AIRFOIL_CSV)
+
+    results_rows = []
+
+    # ==================================================
+    # MAIN LOOP — ALL AIRCRAFT
+    # ==================================================
+    for _, row in df.iterrows():
+        print(f"\n▶ Running aircraft: {row['aircraft_id']}")
+
+        results_rows.append(analyze_aircraft(
+            row,
+            wing_spar_sizing,
+            fuselage_moi_analysis,
+            AIRFOIL_CSV,
+            airfoil_coords
+        ))
+
+    # ==================================================
+    # SAVE OUTPUT
+    # ==================================================
+    results_df = pd.DataFrame(results_rows)
+    results_df.to_csv(OUTPUT_CSV, index=False)
+
+    print(f"\n✅ Batch run complete. Results saved to {OUTPUT_CSV}")
 
-# ==================================================
-# SAVE OUTPUT
-# ==================================================
-results_df = pd.DataFrame(results_rows)
-results_df.to_csv(OUTPUT_CSV, index=False)
 
-print(f"\n✅ Batch run complete. Results saved to {OUTPUT_CSV}")
+if __name__ == "__main__":
+    main()
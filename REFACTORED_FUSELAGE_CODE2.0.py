@@ -2,6 +2,8 @@ import pandas as pd
 import os
 import numpy as np
 
+from profiling import profiled
+
 # ------------------ Macaulay bending moment ------------------
 def macaulay_bending_moment(point_loads, x):
     Mx = 0.0
@@ -12,6 +14,7 @@ def macaulay_bending_moment(point_loads, x):
 
 
 # ------------------ MOI sweep function ------------------
+@profiled
 def sweep_centroid_inertia(h, w, tw, rt, x_bot, k_min, step, k_max_override=None):
     k_list = []
     centroid_list = []
@@ -64,6 +67,7 @@ def sweep_centroid_inertia(h, w, tw, rt, x_bot, k_min, step, k_max_override=None
 
 
 # ------------------ MAIN ANALYSIS ------------------
+@profiled
 def fuselage_moi_analysis(
     airfoil_csv,
     baseplate_gap,
@@ -2,9 +2,16 @@
 
 import numpy as np
 import io
+import os
+import glob
+import json
+import hashlib
+import pandas as pd
 import matplotlib.patches as patches
 import matplotlib.pyplot as plt
 
+from profiling import profiled
+
 # ==================================================
 # HELPERS TO READ AIRFOIL COORDS
 # ==================================================
@@ -23,6 +30,7 @@ def get_airfoil_coords_from_file(path):
 # CP / CoP HELPER
 # ==================================================
 
+@profiled
 def calculate_cop_location(cp_text):
     try:
         with io.StringIO(cp_text) as f:
@@ -66,6 +74,222 @@ def calculate_cop_location(cp_text):
     return cm_le / cl
 
 
+# ==================================================
+# BATCHED CoP (MANY Cp TABLES)
+# ==================================================
+
+COP_OK = 0
+COP_PARSE_ERROR = 1        # unreadable / non-numeric / fewer than 2 columns
+COP_TOO_FEW_POINTS = 2     # fewer than 2 rows
+COP_ZERO_LIFT = 3          # integrated delta-Cp is zero (or not finite)
+
+COP_DEFAULT = 0.25
+COP_N_COMMON = 200
+
+# content hash -> (cop_frac, error)
+_COP_CACHE = {}
+
+
+def _cop_key(table):
+    if isinstance(table, str):
+        table = table.encode()
+    if isinstance(table, (bytes, bytearray)):
+        return "t:" + hashlib.sha1(table).hexdigest()
+
+    # Arrays and nested lists / tuples hash by value
+    try:
+        a = np.ascontiguousarray(table, dtype=float)
+    except (TypeError, ValueError):
+        return "r:" + hashlib.sha1(repr(table).encode()).hexdigest()
+    return "a:" + hashlib.sha1(a.tobytes() + str(a.shape).encode()).hexdigest()
+
+
+def _parse_cp_table(table):
+    """
+    (N, 2) float array of (x, Cp), or None if unreadable. Text skips
+    one header line and # comments, as calculate_cop_location does;
+    arrays and nested lists are taken as values.
+    """
+    if isinstance(table, str):
+        table = table.encode()
+
+    if not isinstance(table, (bytes, bytearray)):
+        try:
+            arr = np.asarray(table, dtype=float)
+        except (TypeError, ValueError):
+            return None
+        return arr[:, :2] if arr.ndim == 2 and arr.shape[1] >= 2 else None
+
+    try:
+        df = pd.read_csv(
+            io.BytesIO(table),
+            sep=r"\s+",
+            header=None,
+            skiprows=1,
+            usecols=[0, 1],
+            comment="#",     # np.loadtxt's default, as in calculate_cop_location
+            engine="c"
+        )
+    except Exception:
+        return None
+
+    arr = df.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    if not np.all(np.isfinite(arr)):
+        return None
+    return arr
+
+
+def _interp_rows(xq, xp, fp, n):
+    """
+    np.interp for every row at once. xp, fp : (T, L) with the first
+    n[t] entries of each row valid and xp sorted; xq : (Q,).
+    """
+    T, L = xp.shape
+    rows = np.arange(T)
+    last = n - 1
+
+    # Pad each row with its last valid point (keeps rows sorted)
+    pad = np.arange(L)[None, :] > last[:, None]
+    xp = np.where(pad, xp[rows, last][:, None], xp)
+    fp = np.where(pad, fp[rows, last][:, None], fp)
+
+    q = np.clip(xq[None, :], xp[:, :1], xp[rows, last][:, None])
+
+    # Offset every row into its own band so one searchsorted serves all
+    base = xp.min()
+    band = (xp.max() - base + 1.0) * rows[:, None]
+    flat = (xp - base + band).ravel()
+
+    pos = np.searchsorted(flat, (q - base + band).ravel(), side="right").reshape(q.shape) - 1
+    i0 = np.clip(pos - rows[:, None] * L, 0, np.maximum(last - 1, 0)[:, None])
+    i1 = np.minimum(i0 + 1, last[:, None])
+
+    r = rows[:, None]
+    x0, x1 = xp[r, i0], xp[r, i1]
+    f0, f1 = fp[r, i0], fp[r, i1]
+
+    dx = x1 - x0
+    w = np.where(dx > 0.0, (q - x0) / np.where(dx > 0.0, dx, 1.0), 0.0)
+    return f0 + w * (f1 - f0)
+
+
+def _cop_batch(arrays):
+    """
+    Vectorised calculate_cop_location over parsed (N_i, 2) arrays.
+    Returns (cop_frac, error).
+    """
+    T = len(arrays)
+    n = np.array([len(a) for a in arrays], dtype=int)
+    L = int(n.max())
+
+    x = np.full((T, L), np.inf)
+    cp = np.zeros((T, L))
+    for t, a in enumerate(arrays):
+        x[t, :n[t]] = a[:, 0]
+        cp[t, :n[t]] = a[:, 1]
+
+    j = np.arange(L)[None, :]
+    le = np.argmin(x, axis=1)[:, None]
+    valid = j < n[:, None]
+
+    def surface(mask, count):
+        key = np.where(mask, x, np.inf)
+        order = np.argsort(key, axis=1, kind="stable")
+        return (np.take_along_axis(key, order, axis=1),
+                np.take_along_axis(cp, order, axis=1), count)
+
+    x_common = np.linspace(0.0, 1.0, COP_N_COMMON)
+
+    xu, cu, nu = surface(valid & (j <= le), le[:, 0] + 1)
+    xl, cl_, nl = surface(valid & (j >= le), n - le[:, 0])
+
+    cp_upper = _interp_rows(x_common, xu, cu, nu)
+    cp_lower = _interp_rows(x_common, xl, cl_, nl)
+
+    delta_cp = cp_lower - cp_upper
+
+    cl = np.trapz(delta_cp, x_common, axis=1)
+    cm_le = np.trapz(delta_cp * x_common, x_common, axis=1)
+
+    ok = (cl != 0.0) & np.isfinite(cl) & np.isfinite(cm_le)
+    cop = np.where(ok, cm_le / np.where(ok, cl, 1.0), COP_DEFAULT)
+    error = np.where(ok, COP_OK, COP_ZERO_LIFT)
+
+    return cop, error
+
+
+@profiled
+def calculate_cop_locations(tables=None, directory=None, pattern="*", cache_path=None):
+    """
+    CoP fraction for many Cp tables in one vectorised pass.
+
+    tables     : list of Cp text blobs (str / bytes, one header line) or
+                 (N, 2) arrays of (x, Cp); or a dict {name: table}
+    directory  : alternatively, read every file matching pattern
+    cache_path : optional JSON file persisting the content-hash cache
+
+    Returns dict: names, cop_frac (COP_DEFAULT where error != COP_OK),
+    error (COP_* codes), cached (True where parsing was skipped).
+    """
+    if directory is not None:
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        names = [os.path.basename(p) for p in paths]
+        tables = []
+        for p in paths:
+            with open(p, "rb") as f:
+                tables.append(f.read())
+    elif isinstance(tables, dict):
+        names = list(tables)
+        tables = list(tables.values())
+    else:
+        tables = list(tables or [])
+        names = list(range(len(tables)))
+
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            _COP_CACHE.update({k: tuple(v) for k, v in json.load(f).items()})
+
+    T = len(tables)
+    cop = np.full(T, COP_DEFAULT)
+    error = np.full(T, COP_OK, dtype=np.int8)
+    cached = np.zeros(T, dtype=bool)
+
+    keys = [_cop_key(t) for t in tables]
+    todo, arrays = [], []
+
+    for i, (key, table) in enumerate(zip(keys, tables)):
+        hit = _COP_CACHE.get(key)
+        if hit is not None:
+            cop[i], error[i] = hit
+            cached[i] = True
+            continue
+
+        arr = _parse_cp_table(table)
+        if arr is None:
+            error[i] = COP_PARSE_ERROR
+        elif len(arr) < 2:
+            error[i] = COP_TOO_FEW_POINTS
+        else:
+            todo.append(i)
+            arrays.append(arr)
+            continue
+
+        _COP_CACHE[key] = (COP_DEFAULT, int(error[i]))
+
+    if arrays:
+        cop_new, err_new = _cop_batch(arrays)
+        cop[todo] = cop_new
+        error[todo] = err_new
+        for i in todo:
+            _COP_CACHE[keys[i]] = (float(cop[i]), int(error[i]))
+
+    if cache_path:
+        with open(cache_path, "w") as f:
+            json.dump(_COP_CACHE, f)
+
+    return {"names": names, "cop_frac": cop, "error": error, "cached": cached}
+
+
 # ==================================================
 # AIRFOIL THICKNESS & CENTER
 # ==================================================
@@ -112,7 +336,27 @@ def get_airfoil_thickness_and_center(coords, x_fraction, chord_length):
 # CORE WING ANALYSIS (MDAO INTERFACE)
 # ==================================================
 
-def wing_spar_sizing(row, coords, cp_text=None):
+# ---- DEFAULTS (previously locked inside wing_spar_sizing) ----
+WS_INPUT = 45.38
+MOR_MPA = 20.0
+FOS = 3.0
+
+X1_FRAC = 0.25
+X2_FRAC = 0.65
+
+
+@profiled
+def wing_spar_sizing(
+    row,
+    coords,
+    cp_text=None,
+    *,
+    ws_input=WS_INPUT,
+    mor_MPa=MOR_MPA,
+    fos=FOS,
+    x1_frac=X1_FRAC,
+    x2_frac=X2_FRAC
+):
     """
     row    : single aircraft row from dimensions CSV
     coords : airfoil coordinates (Nx2)
@@ -122,66 +366,94 @@ def wing_spar_sizing(row, coords, cp_text=None):
     chord_mm = row["wing_rib_chord_mm"]
     span_mm = row["wing_span_mm"]
 
-    chord_m = chord_mm / 1000.0
-    span_m = span_mm / 1000.0
+    # ---- AIRFOIL GEOMETRY (unit chord) ----
+    t1, _ = get_airfoil_thickness_and_center(coords, x1_frac, 1.0)
+    t2, _ = get_airfoil_thickness_and_center(coords, x2_frac, 1.0)
 
-    # ---- CONSTANTS (LOCKED FOR NOW) ----
-    ws_input = 45.38
-    mor_MPa = 20.0
-    fos = 3.0
+    # ---- LOAD SHARING / STRENGTH (shared with the trade studies) ----
+    h1_mm, h2_mm, b1_mm, b2_mm, M_total = (
+        float(v) for v in spar_sizing_broadcast(
+            chord_mm, span_mm, t1, t2,
+            ws_input=ws_input, mor_MPa=mor_MPa, fos=fos
+        )
+    )
 
-    x1_frac = 0.25
-    x2_frac = 0.65
+    cop_frac = calculate_cop_location(cp_text) if cp_text else 0.25
 
-    # ---- AIRFOIL GEOMETRY ----
-    h1_mm, y1_center = get_airfoil_thickness_and_center(
-        coords, x1_frac, chord_mm
-    )
-    h2_mm, y2_center = get_airfoil_thickness_and_center(
-        coords, x2_frac, chord_mm
-    )
+    return {
+        "chord_mm": chord_mm,
+        "span_mm": span_mm,
+        "h1_mm": h1_mm,
+        "h2_mm": h2_mm,
+        "b1_mm": b1_mm,
+        "b2_mm": b2_mm,
+        "M_total_Nm": M_total,
+        "cop_frac": cop_frac
+    }
 
-    h1_m = h1_mm / 1000.0
-    h2_m = h2_mm / 1000.0
 
-    # ---- LOAD SHARING ----
-    k1 = h1_m ** 3
-    k2 = h2_m ** 3
+# ==================================================
+# BROADCAST SPAR SIZING (TRADE STUDIES)
+# ==================================================
+
+def airfoil_thickness_at(coords, x_fracs):
+    """
+    Unit-chord thickness at each x/c in x_fracs (array in, array out),
+    same upper/lower split as get_airfoil_thickness_and_center.
+    """
+    x = coords[:, 0] / np.max(coords[:, 0])
+    y = coords[:, 1] / np.max(coords[:, 0])
+
+    le_index = np.argmin(x)
+
+    u_sort = np.argsort(x[:le_index + 1])
+    l_sort = np.argsort(x[le_index:])
 
-    total_k = k1 + k2 if (k1 + k2) != 0.0 else 1.0
+    x_fracs = np.asarray(x_fracs, dtype=float)
+    y_u = np.interp(x_fracs, x[:le_index + 1][u_sort], y[:le_index + 1][u_sort])
+    y_l = np.interp(x_fracs, x[le_index:][l_sort], y[le_index:][l_sort])
 
-    r1 = k1 / total_k
-    r2 = k2 / total_k
+    return y_u - y_l
 
-    area = chord_m * span_m
-    arm = span_m / 4.0
 
-    M_total = 0.5 * ws_input * area * arm
+def spar_sizing_broadcast(
+    chord_mm,
+    span_mm,
+    t1,
+    t2,
+    ws_input=WS_INPUT,
+    mor_MPa=MOR_MPA,
+    fos=FOS
+):
+    """
+    wing_spar_sizing for broadcast arrays.
+
+    t1, t2 : unit-chord airfoil thickness at the two spar positions
+    Returns h1_mm, h2_mm, b1_mm, b2_mm, M_total_Nm.
+    """
+    chord_m = chord_mm / 1000.0
+    span_m = span_mm / 1000.0
+
+    h1_m = t1 * chord_m
+    h2_m = t2 * chord_m
+
+    # ---- LOAD SHARING ----
+    k1 = h1_m ** 3
+    k2 = h2_m ** 3
+
+    total_k = k1 + k2
+    total_k = np.where(total_k != 0.0, total_k, 1.0)
 
-    M1 = M_total * r1
-    M2 = M_total * r2
+    M_total = 0.5 * ws_input * (chord_m * span_m) * (span_m / 4.0)
 
     # ---- STRENGTH ----
     sigma_allow = (mor_MPa * 1e6) / fos
 
-    Y1 = h1_m / 2.0
-    Y2 = h2_m / 2.0
+    # b = 12 I / h³ with I = M_i (h / 2) / sigma, M_i = M h³ / total_k
+    b_per_h = 6.0 * M_total / (sigma_allow * total_k) * 1000.0
 
-    I1_req = (M1 * Y1) / sigma_allow
-    I2_req = (M2 * Y2) / sigma_allow
+    b1_mm = np.where(h1_m > 0.0, b_per_h * h1_m, 0.0)
+    b2_mm = np.where(h2_m > 0.0, b_per_h * h2_m, 0.0)
 
-    b1_mm = (12.0 * I1_req / (h1_m ** 3)) * 1000.0 if h1_m > 0.0 else 0.0
-    b2_mm = (12.0 * I2_req / (h2_m ** 3)) * 1000.0 if h2_m > 0.0 else 0.0
+    return h1_m * 1000.0, h2_m * 1000.0, b1_mm, b2_mm, M_total
 
-    cop_frac = calculate_cop_location(cp_text) if cp_text else 0.25
-
-    return {
-        "chord_mm": chord_mm,
-        "span_mm": span_mm,
-        "h1_mm": h1_mm,
-        "h2_mm": h2_mm,
-        "b1_mm": b1_mm,
-        "b2_mm": b2_mm,
-        "M_total_Nm": M_total,
-        "cop_frac": cop_frac
-    }
@@ -0,0 +1,222 @@
+"""
+Active-learning loop for growing a copy of cad_summary.csv.
+
+Instead of adding CAD / structural rows by hand on a uniform grid, the
+sampler asks the surrogate where it is least certain (or where a lighter
+structure, i.e. more payload, is most likely) and only runs the expensive
+analysis there.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+
+ACQUISITIONS = ("variance", "expected_improvement")
+
+
+# -------------------------------
+# Candidate pool
+# -------------------------------
+
+def candidate_grid(bounds, n_per_dim=20):
+    """
+    Dense candidate pool over a box.
+
+    bounds : [(lo, hi), ...] in the surrogate's FEATURES order
+    Returns (n_per_dim ** len(bounds), len(bounds)) array.
+    """
+    axes = [np.linspace(lo, hi, n_per_dim) for lo, hi in bounds]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return np.column_stack([m.ravel() for m in mesh])
+
+
+# -------------------------------
+# Acquisition functions
+# -------------------------------
+
+def expected_improvement(mean, std, best_weight):
+    """
+    Expected reduction in structural weight below the lightest sample so far.
+    Payload = W_max - W_struct, so this is expected improvement in payload.
+    """
+    std = np.maximum(std, 1e-12)
+    z = (best_weight - mean) / std
+    return (best_weight - mean) * norm.cdf(z) + std * norm.pdf(z)
+
+
+# -------------------------------
+# Sampler
+# -------------------------------
+
+class AdaptiveSampler:
+    """
+    surrogate   : WingSurrogate / FuselageSurrogate (anything with
+                  FEATURES, TARGET, fit_frame and predict_batch)
+    analysis_fn : callable(dict of FEATURES -> value) -> dict of result
+                  columns; must contain surrogate.TARGET. Wrap
+                  wing_spar_sizing + a mass estimate, or a local stand-in.
+    candidates  : (n, len(FEATURES)) pool the next samples are drawn from
+    csv_path    : starting table (defaults to the packaged cad_summary.csv)
+    out_path    : table the new rows are written to. The starting table
+                  is copied there first. Defaults to csv_path when that
+                  is given; required with the packaged table, which is
+                  never modified.
+    """
+
+    def __init__(
+        self,
+        surrogate,
+        analysis_fn,
+        candidates,
+        csv_path=None,
+        acquisition="variance",
+        out_path=None
+    ):
+        if acquisition not in ACQUISITIONS:
+            raise ValueError(
+                f"Unknown acquisition '{acquisition}'. "
+                f"Available: {ACQUISITIONS}"
+            )
+
+        if csv_path is None:
+            if out_path is None:
+                raise ValueError(
+                    "out_path is required when growing the packaged "
+                    "cad_summary.csv (it is copied there, never modified)"
+                )
+            base_dir = os.path.dirname(__file__)
+            csv_path = os.path.join(base_dir, "cad_summary.csv")
+
+        out_path = out_path or csv_path
+
+        self.surrogate = surrogate
+        self.analysis_fn = analysis_fn
+        self.candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+        self.csv_path = csv_path
+        self.out_path = out_path
+        self.acquisition = acquisition
+
+        self.data = pd.read_csv(csv_path)
+        self.history = []
+
+        if os.path.abspath(out_path) != os.path.abspath(csv_path):
+            self.data.to_csv(out_path, index=False)
+
+        if not self.surrogate.trained:
+            self.surrogate.fit_frame(self.data)
+
+    def _sampled(self):
+        df = self.data.dropna(
+            subset=self.surrogate.FEATURES + [self.surrogate.TARGET]
+        )
+        return df[self.surrogate.FEATURES].values, df[self.surrogate.TARGET].values
+
+    def score(self):
+        """
+        Acquisition value and predictive std for every candidate.
+        """
+        mean, std = self.surrogate.predict_batch(
+            self.candidates, return_std=True
+        )
+
+        if self.acquisition == "variance":
+            return std**2, std
+
+        _, y = self._sampled()
+        return expected_improvement(mean, std, np.min(y)), std
+
+    def propose(self, n=1):
+        """
+        Returns the n best candidates not already in the table.
+        """
+        acq, _ = self.score()
+
+        X_seen, _ = self._sampled()
+        if len(X_seen):
+            d = np.abs(self.candidates[:, None, :] - X_seen[None, :, :])
+            seen = np.all(d < 1e-9, axis=2).any(axis=1)
+            acq = np.where(seen, -np.inf, acq)
+
+        order = np.argsort(acq)[::-1][:n]
+        order = order[np.isfinite(acq[order])]
+        return self.candidates[order]
+
+    def evaluate(self, X):
+        """
+        Runs the analysis callback on each proposed geometry.
+        """
+        rows = []
+        for x in X:
+            geometry = dict(zip(self.surrogate.FEATURES, map(float, x)))
+            result = self.analysis_fn(geometry)
+
+            if self.surrogate.TARGET not in result:
+                raise ValueError(
+                    f"analysis_fn must return '{self.surrogate.TARGET}'"
+                )
+
+            rows.append({**geometry, **result})
+
+        return pd.DataFrame(rows)
+
+    def append(self, new_rows):
+        """
+        Appends rows to out_path (existing column order) and retrains
+        the surrogate from its previous hyperparameters.
+        """
+        columns = list(self.data.columns)
+        for c in new_rows.columns:
+            if c not in columns:
+                raise ValueError(
+                    f"Column '{c}' not in {os.path.basename(self.csv_path)}"
+                )
+
+        new_rows = new_rows.reindex(columns=columns)
+        new_rows.to_csv(self.out_path, mode="a", header=False, index=False)
+
+        self.data = pd.concat([self.data, new_rows], ignore_index=True)
+        self.surrogate.fit_frame(self.data, warm_start=True)
+
+    def step(self, batch_size=1):
+        X = self.propose(batch_size)
+        if len(X) == 0:
+            return None
+
+        new_rows = self.evaluate(X)
+        self.append(new_rows)
+        return new_rows
+
+    def run(self, target_std, max_evaluations=50, batch_size=1):
+        """
+        Samples until the largest predictive std over the candidate pool
+        drops below target_std (grams) or the evaluation budget is spent.
+        """
+        n_evals = 0
+
+        while True:
+            _, std = self.score()
+            max_std = float(np.max(std))
+
+            self.history.append({
+                "n_rows": len(self.data),
+                "n_evaluations": n_evals,
+                "max_std_g": max_std
+            })
+
+            if max_std <= target_std or n_evals >= max_evaluations:
+                break
+
+            new_rows = self.step(min(batch_size, max_evaluations - n_evals))
+            if new_rows is None:
+                break
+
+            n_evals += len(new_rows)
+
+        return {
+            "converged": max_std <= target_std,
+            "n_evaluations": n_evals,
+            "max_std_g": max_std,
+            "history": self.history
+        }
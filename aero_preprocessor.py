@@ -1,9 +1,13 @@
 # aero/aero_preprocessor.py
 
-from aero.airfoil_2d import airfoil_2d_features
-from aero.wing_3d import wing_3d_aero
+import numpy as np
 
+from aero.airfoil_2d import airfoil_2d_features, airfoil_2d_features_batch
+from aero.wing_3d import wing_3d_aero, wing_3d_aero_batch
+from profiling import profiled
 
+
+@profiled
 def compute_aero(
     *,
     geometry,
@@ -38,3 +42,45 @@ def compute_aero(
         "wing": wing,
         "fuselage": fuselage
     }
+
+
+@profiled
+def compute_aero_batch(
+    *,
+    wingspan,
+    wing_chord,
+    Re,
+    airfoil_wing,
+    airfoil_fuse
+):
+    """
+    Array-in / array-out compute_aero for many designs at once.
+
+    wingspan, wing_chord, Re : arrays (broadcast together)
+    Returns:
+        "wing"     : structured array (Cl_max, Cd0, k)
+        "fuselage" : structured array (Cd0,)
+    """
+    wingspan, wing_chord, Re = np.broadcast_arrays(
+        np.asarray(wingspan, dtype=float),
+        np.asarray(wing_chord, dtype=float),
+        np.asarray(Re, dtype=float)
+    )
+    AR = wingspan / wing_chord
+
+    # -----------------------------
+    # WING
+    # -----------------------------
+    wing = wing_3d_aero_batch(airfoil_2d_features_batch(airfoil_wing, Re), AR)
+
+    # -----------------------------
+    # FUSELAGE (drag only)
+    # -----------------------------
+    fuse_2d = airfoil_2d_features_batch(airfoil_fuse, Re)
+    fuselage = np.empty(Re.shape, dtype=[("Cd0", "f8")])
+    fuselage["Cd0"] = fuse_2d["Cd0"]
+
+    return {
+        "wing": wing,
+        "fuselage": fuselage
+    }
@@ -1,4 +1,5 @@
 import numpy as np
+from aero.wing_3d import AERO_DTYPE
 
 def build_aircraft_aero(airfoil_aero, geometry):
     """
@@ -22,3 +23,27 @@ def build_aircraft_aero(airfoil_aero, geometry):
         "Cd0": Cd0_3d,
         "k": k
     }
+
+
+def build_aircraft_aero_batch(airfoil_aero, wingspan, wing_area, oswald=0.8):
+    """
+    Array version of build_aircraft_aero.
+    airfoil_aero : structured array from airfoil_2d_features_batch
+    wingspan, wing_area, oswald : scalars or arrays (broadcast together)
+    Returns a structured array (AERO_DTYPE).
+    """
+    b = np.asarray(wingspan, dtype=float)
+    S = np.asarray(wing_area, dtype=float)
+
+    AR = b**2 / S
+    e = np.asarray(oswald, dtype=float)
+
+    shape = np.broadcast_shapes(airfoil_aero.shape, AR.shape, e.shape)
+    out = np.empty(shape, dtype=AERO_DTYPE)
+
+    # 2D → 3D corrections
+    out["Cl_max"] = 0.9 * airfoil_aero["Cl_max_2d"]
+    out["Cd0"] = 1.05 * airfoil_aero["Cd0"]
+    out["k"] = 1.0 / (np.pi * e * AR)
+
+    return out
@@ -1,53 +1,159 @@
 import numpy as np
 import pandas as pd
+import hashlib
 import os
+import warnings
+from functools import lru_cache
+
+from profiling import profiled
 
 BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "polars")
 
-def _read_polar(airfoil, Re):
-    path = os.path.join(DATA_DIR, f"{airfoil}_{Re}.csv")
-    df = pd.read_csv(path)
-    df.columns = [c.strip().lower() for c in df.columns]
-    return df
-
-def _extract_features(df):
-    alpha = df["alpha"].values
-    cl = df["cl"].values
-    cd = df["cd"].values
+# Written by `python -m aero.polar_preprocess`
+FEATURE_TABLE = os.path.join(DATA_DIR, "polar_features.csv")
 
-    # ---- Linear lift region fit ----
-    mask = (alpha > -4) & (alpha < 6)
-    m, b = np.polyfit(alpha[mask], cl[mask], 1)
-    alpha_0 = -b / m
+# Opt-in: refit polars that are missing from the table or flagged there
+# with polar_preprocess's validated fit, instead of raising. Call
+# clear_polar_caches() after changing it.
+REFIT_POLARS = False
 
-    # ---- Cd0 at Cl ≈ 0 ----
-    idx0 = np.argmin(np.abs(cl))
-    Cd0 = cd[idx0]
+FEATURES = ("Cl_alpha", "alpha_0", "Cd0", "k", "Cl_max_2d")
+FEATURE_DTYPE = np.dtype([(k, "f8") for k in FEATURES])
 
-    # ---- Drag polar fit ----
-    k, _ = np.polyfit(cl**2, cd - Cd0, 1)
 
-    # ---- Stall ----
-    i = np.argmax(cl)
-    Cl_max = cl[i]
+@lru_cache(maxsize=None)
+def _feature_table():
+    """
+    Preprocessed features keyed by (airfoil, re_k), or {} if no table.
+    """
+    if not os.path.exists(FEATURE_TABLE):
+        return {}
 
+    df = pd.read_csv(FEATURE_TABLE)
     return {
-        "Cl_alpha": m,
-        "alpha_0": alpha_0,
-        "Cd0": Cd0,
-        "k": k,
-        "Cl_max_2d": Cl_max
+        (row["airfoil"], int(row["re_k"])): row
+        for _, row in df.iterrows()
     }
 
-def airfoil_2d_features(airfoil, Re):
-    f150 = _extract_features(_read_polar(airfoil, 150))
-    f250 = _extract_features(_read_polar(airfoil, 250))
 
+def _refit_polar(airfoil, re_k):
+    # Lazy import: polar_preprocess imports this module
+    from aero.polar_preprocess import _load_polar, _pad, fit_polars
+
+    path = os.path.join(DATA_DIR, f"{airfoil}_{re_k}.csv")
+    return fit_polars(*_pad([_load_polar(path)])).iloc[0]
+
+
+@lru_cache(maxsize=None)
+@profiled
+def _polar_features(airfoil, re_k):
+    row = _feature_table().get((airfoil, re_k))
+
+    if row is None or not row["ok"]:
+        reason = "missing" if row is None else f"flagged: {row['flags']}"
+
+        if not REFIT_POLARS:
+            raise ValueError(
+                f"Polar {airfoil} at Re={re_k}k is {reason} in {FEATURE_TABLE}; "
+                "run `python -m aero.polar_preprocess` or set "
+                "airfoil_2d.REFIT_POLARS = True"
+            )
+
+        warnings.warn(
+            f"Polar {airfoil} at Re={re_k}k is {reason}; refitting with polar_preprocess"
+        )
+        row = _refit_polar(airfoil, re_k)
+        if not row["ok"]:
+            raise ValueError(
+                f"Polar {airfoil} at Re={re_k}k has no usable fit ({row['flags']})"
+            )
+
+    return {k: float(row[k]) for k in FEATURES}
+
+
+def _blend_weight(Re):
     w = (np.log(Re) - np.log(150_000)) / (np.log(250_000) - np.log(150_000))
-    w = np.clip(w, 0.0, 1.0)
+    return np.clip(w, 0.0, 1.0)
+
+
+@profiled
+def airfoil_2d_features(airfoil, Re):
+    f150 = _polar_features(airfoil, 150)
+    f250 = _polar_features(airfoil, 250)
+
+    w = _blend_weight(Re)
 
     return {
         k: (1 - w) * f150[k] + w * f250[k]
         for k in f150
     }
+
+
+@profiled
+def airfoil_2d_features_batch(airfoil, Re):
+    """
+    Log-Re blended features for an array of Reynolds numbers.
+    Returns a structured array (FEATURE_DTYPE) shaped like Re.
+    """
+    Re = np.asarray(Re, dtype=float)
+    f150 = _polar_features(airfoil, 150)
+    f250 = _polar_features(airfoil, 250)
+
+    w = _blend_weight(Re)
+
+    out = np.empty(Re.shape, dtype=FEATURE_DTYPE)
+    for k in FEATURES:
+        out[k] = (1 - w) * f150[k] + w * f250[k]
+    return out
+
+
+# ==================================================
+# DATA FINGERPRINT (cache keys)
+# ==================================================
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None)
+    return (path, st.st_size, st.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _hash_files(signatures):
+    # Content + file name, not directory: a moved polar set keeps its hash
+    digest = hashlib.sha1()
+    for path, size, _ in signatures:
+        digest.update(os.path.basename(path).encode())
+        if size is None:
+            digest.update(b"<missing>")
+            continue
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def clear_polar_caches():
+    """
+    Drops the loaded feature table and features, so the next call reads
+    the polar data as it is now on disk.
+    """
+    _feature_table.cache_clear()
+    _polar_features.cache_clear()
+
+
+def polar_fingerprint(*airfoils):
+    """
+    Hash of the polar data behind these airfoils' features: the raw
+    polars at both blend anchors and the feature table. Files are only
+    re-read when their size or mtime changes. The in-process feature
+    caches do not follow the files; see clear_polar_caches.
+    """
+    paths = [
+        os.path.join(DATA_DIR, f"{airfoil}_{re_k}.csv")
+        for airfoil in airfoils for re_k in (150, 250)
+    ]
+    paths.append(FEATURE_TABLE)
+
+    return _hash_files(tuple(_file_signature(p) for p in paths))
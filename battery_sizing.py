@@ -6,6 +6,13 @@ Compatible with later OpenConcept and OpenMDAO integration.
 # -------------------------------
 # Imports
 # -------------------------------
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
 from mission_profile import MISSION_SEGMENTS
 
 # -------------------------------
@@ -15,10 +22,40 @@ BATTERY_NOMINAL_VOLTAGE = 14.8      # Volts (6S LiPo)
 USABLE_FRACTION = 0.8               # 80% depth of discharge
 BATTERY_ENERGY_DENSITY = 200.0      # Wh/kg (conservative LiPo)
 
+# -------------------------------
+# Battery catalog
+# -------------------------------
+BATTERY_CATALOG_CSV = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "battery_catalog.csv"
+)
+CATALOG_COLUMNS = ["capacity_mAh", "cells", "voltage_V", "mass_g"]
+
+
+def load_battery_catalog(path=None):
+    """
+    Loads the pack catalog (capacity, cell count, voltage, mass per pack).
+    Returns a dict of arrays sorted by capacity, ready for searchsorted.
+    """
+    if path is None:
+        path = BATTERY_CATALOG_CSV
+
+    df = pd.read_csv(path)
+    missing = [c for c in CATALOG_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Battery catalog missing columns: {missing}")
+
+    df = df.sort_values("capacity_mAh", kind="stable").reset_index(drop=True)
+
+    catalog = {c: df[c].values for c in CATALOG_COLUMNS}
+    catalog["name"] = df["name"].values if "name" in df else \
+        np.array([f"{c:.0f} mAh" for c in catalog["capacity_mAh"]])
+    return catalog
+
+
+BATTERY_CATALOG = load_battery_catalog()
+
 # Standard RC battery capacities (mAh)
-AVAILABLE_BATTERIES_MAH = [
-    1000, 1300, 1500, 1800, 2300, 2600, 2800, 3000
-]
+AVAILABLE_BATTERIES_MAH = BATTERY_CATALOG["capacity_mAh"].tolist()
 
 # -------------------------------
 # Core calculations
@@ -52,15 +89,33 @@ def compute_battery_energy_Wh(required_Ah):
     return required_Ah * BATTERY_NOMINAL_VOLTAGE
 
 
-def select_battery_capacity(required_mAh):
+def select_battery_index(required_mAh, catalog=None):
+    """
+    Catalog index of the smallest pack with capacity >= required_mAh.
+    Accepts scalars or arrays; -1 where no pack is large enough.
+    """
+    if catalog is None:
+        catalog = BATTERY_CATALOG
+
+    caps = catalog["capacity_mAh"]
+    idx = np.searchsorted(caps, required_mAh, side="left")
+    return np.where(idx < len(caps), idx, -1)
+
+
+def select_battery_capacity(required_mAh, catalog=None):
     """
     Selects the nearest higher standard battery capacity (mAh).
+    Accepts scalars or arrays.
     """
-    for cap in AVAILABLE_BATTERIES_MAH:
-        if cap >= required_mAh:
-            return cap
+    if catalog is None:
+        catalog = BATTERY_CATALOG
+
+    idx = select_battery_index(required_mAh, catalog)
+    if np.any(idx < 0):
+        raise ValueError("Required capacity exceeds available battery range.")
 
-    raise ValueError("Required capacity exceeds available battery range.")
+    caps = catalog["capacity_mAh"][idx]
+    return caps.item() if np.ndim(caps) == 0 else caps
 
 
 def compute_battery_mass(energy_Wh):
@@ -74,26 +129,254 @@ def compute_battery_mass(energy_Wh):
 # High-level sizing interface
 # -------------------------------
 
-def size_battery():
+def _battery_summary(required_Ah):
     """
-    High-level battery sizing interface.
-    Returns a dictionary of battery sizing results.
+    Sizing summary for a required capacity (Ah, already / USABLE_FRACTION).
     """
-
-    required_Ah = compute_required_capacity_Ah()
     required_mAh = required_Ah * 1000.0
     energy_Wh = compute_battery_energy_Wh(required_Ah)
     selected_mAh = select_battery_capacity(required_mAh)
-    battery_mass = compute_battery_mass(energy_Wh)
+
+    # Real pack mass from the catalog
+    idx = int(select_battery_index(required_mAh))
+    battery_mass = BATTERY_CATALOG["mass_g"][idx] / 1000.0
 
     return {
         "required_capacity_mAh": required_mAh,
         "selected_battery_mAh": selected_mAh,
+        "selected_battery_name": BATTERY_CATALOG["name"][idx],
         "battery_energy_Wh": energy_Wh,
         "battery_mass_kg": battery_mass
     }
 
 
+def size_battery():
+    """
+    High-level battery sizing interface.
+    Returns a dictionary of battery sizing results.
+    """
+    return _battery_summary(compute_required_capacity_Ah())
+
+
+def size_battery_batch(durations_s, current_A, catalog=None):
+    """
+    Vectorised size_battery over many mission / design combinations.
+
+    durations_s, current_A : (..., S) segment arrays, broadcast against
+                             each other (e.g. (designs, 1, S) currents
+                             with (missions, S) durations)
+
+    Returns dict of arrays over the leading dimensions. Combinations no
+    catalog pack can cover get feasible=False and NaN pack fields.
+    """
+    if catalog is None:
+        catalog = BATTERY_CATALOG
+
+    durations_s = np.asarray(durations_s, dtype=float)
+    current_A = np.asarray(current_A, dtype=float)
+
+    required_Ah = np.sum(current_A * durations_s, axis=-1) / 3600.0 / USABLE_FRACTION
+    required_mAh = required_Ah * 1000.0
+
+    idx = select_battery_index(required_mAh, catalog)
+    feasible = idx >= 0
+    safe = np.where(feasible, idx, 0)
+
+    def pick(col):
+        return np.where(feasible, catalog[col][safe].astype(float), np.nan)
+
+    return {
+        "required_capacity_mAh": required_mAh,
+        "battery_energy_Wh": compute_battery_energy_Wh(required_Ah),
+        "feasible": feasible,
+        "catalog_index": idx,
+        "selected_battery_mAh": pick("capacity_mAh"),
+        "battery_voltage_V": pick("voltage_V"),
+        "battery_mass_kg": pick("mass_g") / 1000.0,
+    }
+
+
+# -------------------------------
+# Flight-log ingestion
+# -------------------------------
+# Logs carry time_s, current_A and optionally voltage_V and phase.
+# CSV logs are streamed with pandas chunks; .npy logs are memory-mapped
+# (structured array with those field names, or an (N, 2..4) float array
+# in that column order with numeric phase codes); .bin logs are raw
+# float64 records in the same column order. Memory stays at one chunk.
+
+LOG_CHUNK_ROWS = 1_000_000
+
+
+class _PhaseIntegrator:
+    """
+    Incremental trapezoidal Ah / Wh integration per flight-phase label.
+    The last sample of each chunk is carried over, so chunk boundaries
+    do not lose an interval. Each interval belongs to its left sample's
+    phase.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._last = None
+
+    def add(self, t, I, V, phase):
+        t = np.asarray(t, dtype=float)
+        I = np.asarray(I, dtype=float)
+        V = np.asarray(V, dtype=float)
+        phase = np.asarray(phase)
+
+        if self._last is not None:
+            t0, I0, V0, p0 = self._last
+            t = np.concatenate([[t0], t])
+            I = np.concatenate([[I0], I])
+            V = np.concatenate([[V0], V])
+            phase = np.concatenate([np.asarray([p0]), phase])
+
+        if len(t) == 0:
+            return
+
+        self._last = (t[-1], I[-1], V[-1], phase[-1])
+        if len(t) < 2:
+            return
+
+        dt = np.diff(t)
+        dAh = 0.5 * (I[:-1] + I[1:]) * dt / 3600.0
+        dWh = 0.5 * (V[:-1] * I[:-1] + V[1:] * I[1:]) * dt / 3600.0
+
+        labels, inv = np.unique(phase[:-1], return_inverse=True)
+        Ah = np.bincount(inv, weights=dAh, minlength=len(labels))
+        Wh = np.bincount(inv, weights=dWh, minlength=len(labels))
+        dur = np.bincount(inv, weights=dt, minlength=len(labels))
+
+        for k, label in enumerate(labels.tolist()):
+            acc = self.phases.setdefault(
+                label, {"Ah": 0.0, "Wh": 0.0, "duration_s": 0.0}
+            )
+            acc["Ah"] += Ah[k]
+            acc["Wh"] += Wh[k]
+            acc["duration_s"] += dur[k]
+
+    def summary(self):
+        measured_Ah = sum(p["Ah"] for p in self.phases.values())
+        measured_Wh = sum(p["Wh"] for p in self.phases.values())
+        duration = sum(p["duration_s"] for p in self.phases.values())
+
+        return {
+            **_battery_summary(measured_Ah / USABLE_FRACTION),
+            "measured_Ah": measured_Ah,
+            "measured_Wh": measured_Wh,
+            "duration_s": duration,
+            "phases": self.phases,
+        }
+
+
+def _iter_csv_log(path, chunk_rows):
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk.columns = [c.strip() for c in chunk.columns]
+        yield (
+            chunk["time_s"].values,
+            chunk["current_A"].values,
+            chunk["voltage_V"].values if "voltage_V" in chunk
+            else np.full(len(chunk), BATTERY_NOMINAL_VOLTAGE),
+            chunk["phase"].astype(str).values if "phase" in chunk
+            else np.full(len(chunk), "all"),
+        )
+
+
+def _iter_array_log(data, chunk_rows, phase_labels):
+    structured = data.dtype.names is not None
+    n_cols = None if structured else data.shape[1]
+
+    for i in range(0, data.shape[0], chunk_rows):
+        block = data[i:i + chunk_rows]
+
+        if structured:
+            cols = {name: np.asarray(block[name]) for name in block.dtype.names}
+        else:
+            block = np.asarray(block)
+            cols = dict(zip(("time_s", "current_A", "voltage_V", "phase"),
+                            block.T[:n_cols]))
+
+        n = len(block)
+        V = cols.get("voltage_V", np.full(n, BATTERY_NOMINAL_VOLTAGE))
+        phase = cols.get("phase", np.zeros(n))
+
+        if phase_labels is not None and phase.dtype.kind in "fiu":
+            codes, inv = np.unique(phase, return_inverse=True)
+            names = np.array(
+                [phase_labels.get(int(c), str(int(c))) for c in codes]
+            )
+            phase = names[inv]
+
+        yield cols["time_s"], cols["current_A"], V, phase
+
+
+def analyze_flight_log(
+    path,
+    chunk_rows=LOG_CHUNK_ROWS,
+    phase_labels=None,
+    n_fields=4
+):
+    """
+    Streams one telemetry log and integrates Ah / Wh per flight phase.
+
+    path         : .csv, .npy (memory-mapped) or .bin (raw float64)
+    phase_labels : optional {code: name} for numeric phase columns
+    n_fields     : columns per record in .bin logs
+
+    Returns the size_battery summary for the measured charge, plus
+    measured_Ah, measured_Wh, duration_s and a per-phase breakdown.
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        chunks = _iter_csv_log(path, chunk_rows)
+    elif ext == ".npy":
+        chunks = _iter_array_log(np.load(path, mmap_mode="r"),
+                                 chunk_rows, phase_labels)
+    elif ext == ".bin":
+        data = np.memmap(path, dtype=np.float64, mode="r").reshape(-1, n_fields)
+        chunks = _iter_array_log(data, chunk_rows, phase_labels)
+    else:
+        raise ValueError(f"Unsupported log format: {path}")
+
+    integ = _PhaseIntegrator()
+    for t, I, V, phase in chunks:
+        integ.add(t, I, V, phase)
+
+    return integ.summary()
+
+
+def _analyze_log_safe(args):
+    path, kwargs = args
+    try:
+        return analyze_flight_log(path, **kwargs)
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+def analyze_log_directory(
+    log_dir,
+    patterns=("*.csv", "*.npy", "*.bin"),
+    max_workers=None,
+    **kwargs
+):
+    """
+    Runs analyze_flight_log on every log in a directory in parallel.
+    Returns {filename: summary}; failed logs get {"error": ...}.
+    """
+    paths = sorted(
+        p for pattern in patterns
+        for p in glob.glob(os.path.join(log_dir, pattern))
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(_analyze_log_safe, [(p, kwargs) for p in paths])
+
+    return {os.path.basename(p): r for p, r in zip(paths, results)}
+
+
 # -------------------------------
 # Standalone test
 # -------------------------------
@@ -0,0 +1,454 @@
+# benchmark_suite.py
+"""
+Offline benchmark suite for the MDAO hot paths.
+
+Every benchmark runs on generated fixtures (NACA airfoils, polars,
+cad_summary and aircraft-dimension tables written to a temp dir), so
+it needs no network and no project data. Each case is timed at several
+problem sizes; results are saved as a JSON baseline and compared
+against a previous run with a regression threshold.
+
+Usage:
+    python benchmark_suite.py run [--out bench.json] [--only NAME ...] [--repeats N]
+    python benchmark_suite.py compare baseline.json current.json [--threshold 0.2]
+
+Cases whose dependencies are not installed (e.g. gpkit) are recorded
+as skipped rather than failing the run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from detailed_codes import fuselage_code, wing_code
+from mdo_config import GEOM_LIMITS, ENV_PARAMS
+
+
+
+# ==================================================
+# FIXTURES
+# ==================================================
+
+def naca4_coords(code="4412", n=100):
+    """
+    Selig-ordered NACA 4-digit coordinates (TE → upper → LE → lower → TE).
+    """
+    m = int(code[0]) / 100.0
+    p = int(code[1]) / 10.0
+    t = int(code[2:]) / 100.0
+
+    beta = np.linspace(0.0, np.pi, n)
+    x = 0.5 * (1.0 - np.cos(beta))
+
+    yt = 5 * t * (0.2969 * np.sqrt(x) - 0.1260 * x - 0.3516 * x**2
+                  + 0.2843 * x**3 - 0.1015 * x**4)
+
+    yc = np.where(x < p, m / p**2 * (2 * p * x - x**2),
+                  m / (1 - p)**2 * ((1 - 2 * p) + 2 * p * x - x**2))
+
+    upper = np.column_stack([x, yc + yt])[::-1]
+    lower = np.column_stack([x, yc - yt])[1:]
+    return np.vstack([upper, lower])
+
+
+def synthetic_polar(cl_alpha=0.1, alpha_0=-3.0, cl_max=1.6, cd0=0.012, k=0.012):
+    alpha = np.arange(-8.0, 18.0, 0.5)
+    cl_lin = cl_alpha * (alpha - alpha_0)
+    cl = cl_max * np.tanh(cl_lin / cl_max)
+    cd = cd0 + k * cl**2 + 0.002 * np.maximum(alpha - 12.0, 0.0)**2
+    return pd.DataFrame({"alpha": alpha, "cl": cl, "cd": cd})
+
+
+def synthetic_dimensions(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "aircraft_id": [f"AC{i:05d}" for i in range(n_rows)],
+        "wing_rib_chord_mm": rng.uniform(150.0, 200.0, n_rows),
+        "wing_span_mm": rng.uniform(800.0, 1300.0, n_rows),
+        "fuse_rib_chord_mm": rng.uniform(280.0, 320.0, n_rows),
+        "fuse_rib_thickness_mm": rng.uniform(2.0, 4.0, n_rows),
+        "tail_flange_thickness_mm": rng.choice([1.5, 2.0, 3.0], n_rows),
+        "tail_web_thickness_mm": rng.choice([1.5, 2.0, 3.0], n_rows),
+        "tail_boom_length_mm": rng.uniform(400.0, 700.0, n_rows),
+    })
+
+
+class Fixtures:
+    """
+    Writes all generated inputs into one temporary directory.
+
+    Module globals that benchmarks point at the fixtures (polar paths,
+    trained structural surrogates) are saved with preserve() / patch()
+    and restored, with their caches cleared, on close(). Use as a
+    context manager.
+    """
+
+    def __init__(self):
+        self.tmp = tempfile.TemporaryDirectory(prefix="mdao_bench_")
+        self.dir = self.tmp.name
+        self._saved = []
+        self._on_close = []
+
+        self.polar_dir = os.path.join(self.dir, "polars")
+        os.makedirs(self.polar_dir)
+        for airfoil, cl_max in (("s1223", 2.0), ("e858", 1.1)):
+            for re_k, scale in ((150, 0.95), (250, 1.0)):
+                synthetic_polar(cl_max=cl_max * scale).to_csv(
+                    os.path.join(self.polar_dir, f"{airfoil}_{re_k}.csv"),
+                    index=False
+                )
+
+    def airfoil_file(self, n):
+        path = os.path.join(self.dir, f"naca4412_{n}.dat")
+        if not os.path.exists(path):
+            np.savetxt(path, naca4_coords(n=n))
+        return path
+
+    def cad_summary(self, n_rows):
+        from structural_surrogate.surrogate_benchmark import make_synthetic_cad_summary
+
+        path = os.path.join(self.dir, f"cad_summary_{n_rows}.csv")
+        if not os.path.exists(path):
+            make_synthetic_cad_summary(n_rows).to_csv(path, index=False)
+        return path
+
+    def preserve(self, module, *names, on_close=None):
+        """
+        Saves module attributes so close() puts them back.
+        """
+        for name in names:
+            self._saved.append((module, name, getattr(module, name)))
+        if on_close is not None:
+            self._on_close.append(on_close)
+
+    def patch(self, module, on_close=None, **values):
+        self.preserve(module, *values, on_close=on_close)
+        for name, value in values.items():
+            setattr(module, name, value)
+
+    def close(self):
+        for module, name, value in reversed(self._saved):
+            setattr(module, name, value)
+        self._saved.clear()
+
+        for fn in self._on_close:
+            fn()
+        self._on_close.clear()
+
+        self.tmp.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _use_synthetic_polars(fx):
+    from aero import airfoil_2d
+    from aero.polar_preprocess import build_feature_table
+
+    table_path = os.path.join(fx.polar_dir, "polar_features.csv")
+    if not os.path.exists(table_path):
+        build_feature_table(fx.polar_dir, workers=1).to_csv(table_path, index=False)
+
+    fx.patch(
+        airfoil_2d,
+        on_close=airfoil_2d.clear_polar_caches,
+        DATA_DIR=fx.polar_dir,
+        FEATURE_TABLE=table_path
+    )
+    airfoil_2d.clear_polar_caches()
+    return airfoil_2d
+
+
+def _use_synthetic_surrogates(fx, n_rows):
+    import structural_surrogate.interface as structural
+
+    fx.preserve(
+        structural,
+        "wing_model", "fuse_model", "combined_model",
+        "surrogate_fingerprint", "structural_correction"
+    )
+    structural.set_structural_correction(None)
+    structural.initialize_structural_surrogates(csv_path=fx.cad_summary(n_rows))
+
+
+# ==================================================
+# BENCHMARKS
+# ==================================================
+# Each setup(fixtures, size) returns a zero-argument callable to time.
+
+def bench_sweep_centroid_inertia(fx, step):
+    fus = fuselage_code()
+    return lambda: fus.sweep_centroid_inertia(
+        h=60.0, w=280.0, tw=6.0, rt=3.0, x_bot=10.0, k_min=1.0, step=step
+    )
+
+
+def bench_fuselage_moi_analysis(fx, n_points):
+    fus = fuselage_code()
+    airfoil = fx.airfoil_file(n_points)
+
+    # Scale the unit airfoil to a 300 mm rib so the sweep has depth
+    coords = np.loadtxt(airfoil) * 300.0
+    scaled = os.path.join(fx.dir, f"naca4412_{n_points}_mm.dat")
+    np.savetxt(scaled, coords)
+
+    out = os.path.join(fx.dir, "fuselage_moi.csv")
+    return lambda: fus.fuselage_moi_analysis(
+        airfoil_csv=scaled, baseplate_gap=2.0, w=300.0, tw=6.0, rt=3.0,
+        x_bot=10.0, k_min=1.0, step=0.2, point_loads=[(5.0, 100.0)],
+        output_csv=out
+    )
+
+
+def bench_wing_spar_sizing(fx, n_rows):
+    wing = wing_code()
+    coords = naca4_coords()
+    rows = [row for _, row in synthetic_dimensions(n_rows).iterrows()]
+
+    def run():
+        for row in rows:
+            wing.wing_spar_sizing(row=row, coords=coords)
+
+    return run
+
+
+def bench_surrogate_train(fx, n_rows):
+    from structural_surrogate.wing_surrogate import WingSurrogate
+
+    csv_path = fx.cad_summary(n_rows)
+    return lambda: WingSurrogate().load_and_train(csv_path)
+
+
+def bench_surrogate_predict(fx, n_points):
+    from structural_surrogate.wing_surrogate import WingSurrogate
+
+    model = WingSurrogate()
+    model.load_and_train(fx.cad_summary(100))
+    X = np.column_stack([
+        np.linspace(0.8, 1.3, n_points), np.linspace(0.15, 0.20, n_points)
+    ])
+
+    def run():
+        for x in X:
+            model.predict(*x)
+
+    return run
+
+
+def bench_surrogate_predict_batch(fx, n_points):
+    from structural_surrogate.wing_surrogate import WingSurrogate
+
+    model = WingSurrogate()
+    model.load_and_train(fx.cad_summary(100))
+    X = np.column_stack([
+        np.linspace(0.8, 1.3, n_points), np.linspace(0.15, 0.20, n_points)
+    ])
+    return lambda: model.predict_batch(X)
+
+
+def bench_airfoil_2d_features(fx, n_calls):
+    airfoil_2d = _use_synthetic_polars(fx)
+    Re = np.linspace(120e3, 280e3, n_calls)
+
+    def run():
+        # Cold start: include loading the feature table
+        airfoil_2d.clear_polar_caches()
+        for r in Re:
+            airfoil_2d.airfoil_2d_features("s1223", r)
+
+    return run
+
+
+def bench_run_gpkit_inner(fx, n_solves):
+    from gpkit_inner_solver import run_gpkit_inner
+
+    W_struct = np.linspace(3.0, 6.0, n_solves)
+
+    def run():
+        for w in W_struct:
+            run_gpkit_inner(W_struct_N=w, geom_limits=GEOM_LIMITS)
+
+    return run
+
+
+def bench_evaluate_design(fx, n_designs):
+    from mdo_outer_loop import evaluate_design
+
+    _use_synthetic_polars(fx)
+    _use_synthetic_surrogates(fx, 50)
+
+    geometries = [
+        (b, 0.175, 0.30, 1.0) for b in np.linspace(0.8, 1.3, n_designs)
+    ]
+
+    def run():
+        for geometry in geometries:
+            evaluate_design(
+                geometry=geometry, geom_limits=GEOM_LIMITS, env_params=ENV_PARAMS
+            )
+
+    return run
+
+
+_WC_AERO = {"Cd0": 0.02, "Cl_max_2d": 1.8}
+_WC_GEOM = {"T": 0.12, "sweep_deg": 0.0, "taper": 1.0}
+
+
+def bench_evaluate_wing_constraints(fx, n_designs):
+    from wing_constraints import evaluate_wing_constraints
+
+    spans = np.linspace(0.8, 1.3, n_designs)
+
+    def run():
+        for b in spans:
+            evaluate_wing_constraints(
+                b, 0.15, 1.5, 30.0, 10.0, 2.0, _WC_AERO, _WC_GEOM
+            )
+
+    return run
+
+
+def bench_evaluate_wing_constraints_batch(fx, n_designs):
+    from wing_constraints import evaluate_wing_constraints_batch
+
+    spans = np.linspace(0.8, 1.3, n_designs)
+    return lambda: evaluate_wing_constraints_batch(
+        spans, 0.15, 1.5, 30.0, 10.0, 2.0, _WC_AERO, _WC_GEOM
+    )
+
+
+BENCHMARKS = {
+    "sweep_centroid_inertia": (bench_sweep_centroid_inertia, [1.0, 0.2, 0.05]),
+    "fuselage_moi_analysis": (bench_fuselage_moi_analysis, [50, 100, 200]),
+    "wing_spar_sizing": (bench_wing_spar_sizing, [10, 100, 1000]),
+    "surrogate_train": (bench_surrogate_train, [25, 100, 400]),
+    "surrogate_predict": (bench_surrogate_predict, [1, 10, 100]),
+    "surrogate_predict_batch": (bench_surrogate_predict_batch, [100, 1000, 10000]),
+    "airfoil_2d_features": (bench_airfoil_2d_features, [1, 10, 100]),
+    "run_gpkit_inner": (bench_run_gpkit_inner, [1, 5, 20]),
+    "evaluate_design": (bench_evaluate_design, [1, 5, 20]),
+    "evaluate_wing_constraints": (bench_evaluate_wing_constraints, [1, 10, 100]),
+    "evaluate_wing_constraints_batch": (bench_evaluate_wing_constraints_batch, [100, 1000, 10000]),
+}
+
+
+# ==================================================
+# RUN / COMPARE
+# ==================================================
+
+def _time(fn, repeats):
+    fn()  # warm-up (imports, caches, JIT-free but allocator warm)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run_suite(only=None, repeats=5):
+    names = only or list(BENCHMARKS)
+    results = {}
+
+    with Fixtures() as fx:
+        for name in names:
+            setup, sizes = BENCHMARKS[name]
+            for size in sizes:
+                key = f"{name}[{size}]"
+                try:
+                    fn = setup(fx, size)
+                except ImportError as exc:
+                    results[key] = {"skipped": f"missing dependency: {exc.name}"}
+                    print(f"{key:<45} skipped ({exc.name} not installed)")
+                    continue
+
+                times = _time(fn, repeats)
+                results[key] = {
+                    "median_s": float(np.median(times)),
+                    "min_s": float(np.min(times)),
+                    "mean_s": float(np.mean(times)),
+                    "repeats": repeats,
+                }
+                print(f"{key:<45} {1e3 * results[key]['median_s']:10.3f} ms")
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Returns [(key, baseline_s, current_s, ratio)] for cases whose median
+    time grew by more than threshold (0.2 = 20 %).
+    """
+    regressions = []
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if not base or "median_s" not in base or "median_s" not in cur:
+            continue
+
+        ratio = cur["median_s"] / base["median_s"]
+        if ratio > 1.0 + threshold:
+            regressions.append((key, base["median_s"], cur["median_s"], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MDAO offline benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--out", default="bench_baseline.json")
+    p_run.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    p_run.add_argument("--repeats", type=int, default=5)
+
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(only=args.only, repeats=args.repeats)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.out}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    for key, base, cur, ratio in regressions:
+        print(f"REGRESSION {key:<45} {1e3 * base:9.3f} → {1e3 * cur:9.3f} ms (x{ratio:.2f})")
+
+    if not regressions:
+        print(f"No regressions beyond {100 * args.threshold:.0f} %.")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+import pandas as pd
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+from .preprocess import Scaler
+from .gp_gradient import gp_mean_gradient, scaler_jacobian
+from profiling import profiled
+
+
+class StructuralSurrogate:
+    """
+    Wing and fuselage weight from one multi-output GP.
+
+    Both targets share one kernel over one feature matrix, so a design
+    costs a single kernel evaluation and cad_summary.csv is read once.
+    The default RBF is anisotropic (one length scale per input), but the
+    length scales are shared by both outputs: an input that matters to
+    either weight keeps a short length scale for both. Use the separate
+    wing/fuse surrogates when per-output length scales are needed.
+    """
+
+    # Inputs: geometry (Category A)
+    FEATURES = ["wingspan", "wing_rib_chord", "fuse_rib_chord"]
+
+    # Targets: component weights (grams)
+    TARGETS = ["wing_weight", "fuse_weight"]
+
+    def __init__(self, kernel=None):
+        if kernel is None:
+            kernel = ConstantKernel(1.0) * RBF(length_scale=[1.0, 1.0, 1.0])
+        self.model = GaussianProcessRegressor(
+            kernel=kernel,
+            alpha=1e-4,
+            normalize_y=True
+        )
+        self.scaler = Scaler()
+        self.trained = False
+
+    def load_and_train(self, csv_path=None):
+        if csv_path is None:
+            base_dir = os.path.dirname(__file__)
+            csv_path = os.path.join(base_dir, "cad_summary.csv")
+
+        df = pd.read_csv(csv_path)
+        self.fit_frame(df)
+
+    @profiled
+    def fit_frame(self, df, warm_start=False):
+        """
+        Trains on a cad_summary-shaped DataFrame.
+        Only rows carrying every feature and both weights are used.
+        """
+        df = df.dropna(subset=self.FEATURES + self.TARGETS)
+
+        X = df[self.FEATURES].values
+        Y = df[self.TARGETS].values
+
+        if warm_start and self.trained:
+            self.model.kernel = self.model.kernel_
+
+        self.scaler.fit(X)
+        Xn = self.scaler.transform(X)
+        self.model.fit(Xn, Y)
+
+        self.trained = True
+
+    @profiled
+    def predict(self, wingspan, wing_chord, fuse_chord):
+        """
+        Returns (wing_weight_g, fuselage_weight_g).
+        """
+        if not self.trained:
+            raise RuntimeError("StructuralSurrogate used before training.")
+
+        X = np.array([[wingspan, wing_chord, fuse_chord]])
+        Xn = self.scaler.transform(X)
+        W_wing, W_fuse = self.model.predict(Xn)[0]
+        return float(W_wing), float(W_fuse)
+
+    @profiled
+    def predict_batch(self, X, return_std=False):
+        """
+        X : (n, 3) array of [wingspan, wing_rib_chord, fuse_rib_chord]
+        Returns (n, 2) weights (grams), plus predictive std if requested.
+        """
+        if not self.trained:
+            raise RuntimeError("StructuralSurrogate used before training.")
+
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        Xn = self.scaler.transform(X)
+        return self.model.predict(Xn, return_std=return_std)
+
+    @profiled
+    def predict_with_grad(self, wingspan, wing_chord, fuse_chord):
+        """
+        Returns (wing_weight_g, fuselage_weight_g) and the (3, 2) Jacobian
+        d[W_wing, W_fuse] / d[wingspan, wing_chord, fuse_chord].
+        """
+        if not self.trained:
+            raise RuntimeError("StructuralSurrogate used before training.")
+
+        X = np.array([[wingspan, wing_chord, fuse_chord]])
+        Xn = self.scaler.transform(X)
+
+        W_wing, W_fuse = self.model.predict(Xn)[0]
+        grad_n = gp_mean_gradient(self.model, Xn)[0]
+        jac = scaler_jacobian(self.scaler, X) @ grad_n
+
+        return (float(W_wing), float(W_fuse)), jac
@@ -1,5 +1,8 @@
+import os
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 def plot_constraints(
     ws,
@@ -52,3 +55,107 @@ def plot_constraints(
     plt.legend()
     plt.title("Constraint Diagram (T/W vs W/S)")
     plt.show()
+
+
+# ==================================================
+# HEADLESS BATCH RENDERING
+# ==================================================
+
+class ConstraintRenderer:
+    """
+    Non-interactive constraint diagrams on the Agg canvas.
+
+    One figure and one set of line artists are created up front; each
+    diagram only swaps the line data and writes files, so sweeps over
+    thousands of designs neither block on plt.show() nor pay figure
+    setup (or leak figures through pyplot) per design.
+
+    Takes the dicts returned by evaluate_wing_constraints (one design)
+    or evaluate_wing_constraints_batch (many designs) directly.
+    """
+
+    CURVES = {
+        "TW_takeoff": dict(label="Takeoff"),
+        "TW_climb": dict(label="Climb"),
+        "TW_cruise": dict(label="Cruise"),
+        "TW_required": dict(label="Required", color="k", linewidth=2.0),
+        "TW_avail": dict(label="Available", color="k", linestyle="--"),
+    }
+
+    def __init__(self, figsize=(8, 6), dpi=100, ylim=None):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+
+        self.ax = self.fig.add_subplot(111)
+        self.lines = {
+            name: self.ax.plot([], [], **style)[0]
+            for name, style in self.CURVES.items()
+        }
+
+        self.ax.set_xlabel("Wing Loading W/S (N/m²)")
+        self.ax.set_ylabel("Thrust-to-Weight T/W")
+        self.ax.grid(True)
+
+        self.ylim = ylim
+        self._legend_key = None
+
+    def render(self, result, path, title=None, formats=("png",)):
+        """
+        result : dict with "ws" and any of the CURVES keys (1-D arrays)
+        path   : output path without extension
+        """
+        ws = result["ws"]
+        shown = []
+
+        for name, line in self.lines.items():
+            if name in result:
+                line.set_data(ws, result[name])
+                line.set_visible(True)
+                shown.append(name)
+            else:
+                line.set_visible(False)
+
+        # Legend only rebuilt when the set of curves changes
+        key = tuple(shown)
+        if key != self._legend_key:
+            self.ax.legend([self.lines[n] for n in shown],
+                           [self.CURVES[n]["label"] for n in shown])
+            self._legend_key = key
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        if self.ylim is not None:
+            self.ax.set_ylim(*self.ylim)
+
+        self.ax.set_title(title or "Constraint Diagram (T/W vs W/S)")
+
+        written = []
+        for fmt in formats:
+            out = f"{path}.{fmt}"
+            self.fig.savefig(out, format=fmt)
+            written.append(out)
+
+        return written
+
+    def render_batch(self, batch, out_dir, names=None, formats=("png",)):
+        """
+        batch : dict from evaluate_wing_constraints_batch ((n, n_ws) curves)
+        names : file stems per design (default design_00000, ...)
+        """
+        os.makedirs(out_dir, exist_ok=True)
+
+        curves = [k for k in self.CURVES if k in batch]
+        n = batch[curves[0]].shape[0]
+
+        if names is None:
+            names = [f"design_{i:05d}" for i in range(n)]
+
+        written = []
+        for i, name in enumerate(names):
+            result = {"ws": batch["ws"], **{k: batch[k][i] for k in curves}}
+            written += self.render(
+                result, os.path.join(out_dir, name),
+                title=str(name), formats=formats
+            )
+
+        return written
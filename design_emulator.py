@@ -0,0 +1,203 @@
+# design_emulator.py
+"""
+Whole-design response surface for rapid screening.
+
+A quadratic response surface is fitted to logged evaluate_design outputs
+(payload, TW_required and the thrust margin TW_max - TW_required). The
+fit is kept as accumulated normal equations, so every new evaluation
+refits in O(p^2) without revisiting old data, and predicting millions of
+candidate geometries is a few matrix products.
+
+Typical use:
+    emu = DesignEmulator(TW_max=geom_limits["TW_max"], bounds=bounds)
+    emu.record(results)                      # evaluate_design dicts
+    best = triage(emu, candidates, evaluate, fraction=0.01)
+"""
+
+import numpy as np
+from scipy.stats import norm
+
+
+FEATURES = ("wingspan", "wing_chord", "fuse_chord", "taper")
+OUTPUTS = ("payload_N", "TW_required", "TW_margin")
+
+
+def quadratic_features(Xs):
+    """
+    [1, x_i, x_i * x_j (i <= j)] for scaled inputs Xs (n, d).
+    """
+    n, d = Xs.shape
+    iu, ju = np.triu_indices(d)
+    return np.hstack([
+        np.ones((n, 1)),
+        Xs,
+        Xs[:, iu] * Xs[:, ju]
+    ])
+
+
+class DesignEmulator:
+    """
+    TW_max : thrust limit used to turn TW_required into a feasibility margin
+    bounds : [(lo, hi), ...] per FEATURES entry, used to scale inputs to
+             [-1, 1]; fixed up front so the normal equations stay valid
+    ridge  : Tikhonov term (constant taper in a sweep makes columns collinear)
+    """
+
+    def __init__(self, TW_max, bounds=None, ridge=1e-8):
+        d = len(FEATURES)
+        if bounds is None:
+            bounds = [(0.0, 1.0)] * d
+
+        lo, hi = np.asarray(bounds, dtype=float).T
+        self.center = 0.5 * (lo + hi)
+        self.half_range = np.where(hi > lo, 0.5 * (hi - lo), 1.0)
+
+        self.TW_max = TW_max
+        self.ridge = ridge
+
+        p = quadratic_features(np.zeros((1, d))).shape[1]
+        self.XtX = np.zeros((p, p))
+        self.XtY = np.zeros((p, len(OUTPUTS)))
+        self.YtY = np.zeros(len(OUTPUTS))
+        self.n = 0
+
+        self.coef = None
+        self.resid_std = None
+
+    # -----------------------------
+    # TRAINING
+    # -----------------------------
+    def _features(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return quadratic_features((X - self.center) / self.half_range)
+
+    def update(self, X, Y, refit=True):
+        """
+        X : (n, 4) geometries, Y : (n, 3) in OUTPUTS order
+        """
+        F = self._features(X)
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
+
+        self.XtX += F.T @ F
+        self.XtY += F.T @ Y
+        self.YtY += np.sum(Y**2, axis=0)
+        self.n += len(F)
+
+        if refit:
+            self.refit()
+
+    def record(self, results, refit=True):
+        """
+        Adds one or more evaluate_design result dicts.
+        """
+        if isinstance(results, dict):
+            results = [results]
+
+        X = [r["geometry"] for r in results]
+        Y = [
+            (r["payload_N"], r["TW_required"], self.TW_max - r["TW_required"])
+            for r in results
+        ]
+        self.update(X, Y, refit=refit)
+
+    def refit(self):
+        p = self.XtX.shape[0]
+        A = self.XtX + self.ridge * np.eye(p)
+        self.coef = np.linalg.solve(A, self.XtY)
+
+        # Residual variance straight from the normal equations
+        sse = (
+            self.YtY
+            - 2.0 * np.sum(self.coef * self.XtY, axis=0)
+            + np.sum(self.coef * (self.XtX @ self.coef), axis=0)
+        )
+        dof = max(self.n - p, 1)
+        self.resid_std = np.sqrt(np.maximum(sse, 0.0) / dof)
+
+    # -----------------------------
+    # PREDICTION
+    # -----------------------------
+    def predict(self, X, chunk_size=262_144):
+        """
+        Returns dict of arrays: payload_N, TW_required, p_feasible.
+        """
+        if self.coef is None:
+            raise RuntimeError("DesignEmulator used before training.")
+
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        out = np.empty((len(X), len(OUTPUTS)))
+
+        for i in range(0, len(X), chunk_size):
+            out[i:i + chunk_size] = self._features(X[i:i + chunk_size]) @ self.coef
+
+        margin_std = max(self.resid_std[2], 1e-12)
+
+        return {
+            "payload_N": out[:, 0],
+            "TW_required": out[:, 1],
+            "p_feasible": norm.cdf(out[:, 2] / margin_std),
+        }
+
+    def screen(self, X, fraction=0.01, n=None):
+        """
+        Indices of the most promising candidates, best first, ranked by
+        expected payload = payload * P(feasible).
+        """
+        pred = self.predict(X)
+        score = np.maximum(pred["payload_N"], 0.0) * pred["p_feasible"]
+
+        n = max(1, int(np.ceil(fraction * len(score)))) if n is None else n
+        n = min(n, len(score))
+
+        top = np.argpartition(-score, n - 1)[:n]
+        return top[np.argsort(-score[top])]
+
+    # -----------------------------
+    # PERSISTENCE
+    # -----------------------------
+    def save(self, path):
+        np.savez(
+            path,
+            center=self.center, half_range=self.half_range,
+            TW_max=self.TW_max, ridge=self.ridge,
+            XtX=self.XtX, XtY=self.XtY, YtY=self.YtY, n=self.n
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        emu = cls(float(data["TW_max"]), ridge=float(data["ridge"]))
+        emu.center = data["center"]
+        emu.half_range = data["half_range"]
+        emu.XtX = data["XtX"]
+        emu.XtY = data["XtY"]
+        emu.YtY = data["YtY"]
+        emu.n = int(data["n"])
+        if emu.n:
+            emu.refit()
+        return emu
+
+
+def triage(emulator, candidates, evaluate_fn, fraction=0.01, n=None):
+    """
+    Screens candidates with the emulator, runs the exact evaluate_fn
+    (geometry -> evaluate_design dict) only on the top fraction, and feeds
+    those results back into the emulator.
+
+    Returns (exact results best first, best feasible result or None).
+    """
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+    idx = emulator.screen(candidates, fraction=fraction, n=n)
+
+    results = []
+    for i in idx:
+        res = evaluate_fn(tuple(candidates[i]))
+        results.append(res)
+
+    emulator.record(results)
+
+    feasible = [r for r in results if r["feasible"]]
+    best = max(feasible, key=lambda r: r["payload_N"]) if feasible else None
+
+    results.sort(key=lambda r: r["payload_N"], reverse=True)
+    return results, best
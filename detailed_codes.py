@@ -0,0 +1,58 @@
+# detailed_codes.py
+"""
+The detailed structural codes as modules.
+
+REFACTORED_WING_CODE4.0.py / REFACTORED_FUSELAGE_CODE2.0.py are not
+importable by name (the version dot), so they are loaded from their
+file path, once per process. They import the repo's own modules
+(profiling), so the repo directory is on sys.path while they execute,
+wherever the caller runs from.
+"""
+
+import importlib.util
+import os
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WING_CODE = "REFACTORED_WING_CODE4.0.py"
+FUSELAGE_CODE = "REFACTORED_FUSELAGE_CODE2.0.py"
+
+
+@contextmanager
+def _repo_importable():
+    added = BASE_DIR not in sys.path
+    if added:
+        sys.path.insert(0, BASE_DIR)
+    try:
+        yield
+    finally:
+        if added:
+            sys.path.remove(BASE_DIR)
+
+
+def load_path(path, name=None):
+    """
+    Executes a source file as a new module (not cached).
+    """
+    name = name or os.path.splitext(os.path.basename(path))[0].replace(".", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    with _repo_importable():
+        spec.loader.exec_module(module)
+    return module
+
+
+@lru_cache(maxsize=None)
+def load_module(filename):
+    return load_path(os.path.join(BASE_DIR, filename))
+
+
+def wing_code():
+    return load_module(WING_CODE)
+
+
+def fuselage_code():
+    return load_module(FUSELAGE_CODE)
@@ -0,0 +1,100 @@
+"""
+Analytic gradients of a fitted GaussianProcessRegressor mean.
+
+mean(x) = y_mean + y_std * k(x, X_train) @ alpha
+
+so d mean / dx only needs the kernel derivative. Analytic kernels are
+the ones the structural surrogates use: [ConstantKernel *] RBF,
+[ConstantKernel *] Matern(nu=2.5), isotropic or anisotropic, and
+[ConstantKernel *] RationalQuadratic. Any other kernel (including
+Matern with nu != 2.5) falls back to central finite differences of
+model.predict.
+"""
+
+import numpy as np
+from sklearn.gaussian_process.kernels import (
+    RBF, ConstantKernel, Matern, Product, RationalQuadratic
+)
+
+FD_STEP = 1e-6
+
+
+def _split_constant(kernel):
+    if isinstance(kernel, Product):
+        if isinstance(kernel.k1, ConstantKernel):
+            return kernel.k1.constant_value, kernel.k2
+        if isinstance(kernel.k2, ConstantKernel):
+            return kernel.k2.constant_value, kernel.k1
+    return 1.0, kernel
+
+
+def _fd_gradient(model, Xn):
+    m, d = Xn.shape
+    step = FD_STEP * np.maximum(1.0, np.abs(Xn))
+
+    grads = []
+    for j in range(d):
+        e = np.zeros(d)
+        e[j] = 1.0
+        h = step[:, j:j + 1]
+        f_hi = model.predict(Xn + h * e)
+        f_lo = model.predict(Xn - h * e)
+        grads.append((f_hi - f_lo) / (2.0 * h.reshape((m,) + (1,) * (f_hi.ndim - 1))))
+
+    return np.stack(grads, axis=1)
+
+
+def gp_mean_gradient(model, Xn):
+    """
+    Gradient of the GP mean w.r.t. the (scaled) inputs.
+
+    model : fitted GaussianProcessRegressor
+    Xn    : (m, d) scaled inputs
+    Returns (m, d) for single-output models, (m, d, n_targets) otherwise.
+    """
+    Xn = np.atleast_2d(np.asarray(Xn, dtype=float))
+    X_train = model.X_train_
+
+    const, base = _split_constant(model.kernel_)
+
+    # Matern subclasses RBF in sklearn, so it must be tested first
+    if isinstance(base, Matern):
+        analytic = base.nu == 2.5
+    else:
+        analytic = isinstance(base, (RBF, RationalQuadratic))
+    if not analytic:
+        return _fd_gradient(model, Xn)
+
+    ls = np.broadcast_to(
+        np.asarray(base.length_scale, dtype=float), (Xn.shape[1],)
+    )
+
+    delta = Xn[:, None, :] - X_train[None, :, :]          # (m, n, d)
+    r = np.sqrt(np.sum((delta / ls) ** 2, axis=2))          # (m, n)
+
+    # dk/dx = (dk/dr / r) * (x - x_i) / l^2
+    if isinstance(base, Matern):
+        s5r = np.sqrt(5.0) * r
+        dk_dr_over_r = -const * (5.0 / 3.0) * (1.0 + s5r) * np.exp(-s5r)
+    elif isinstance(base, RBF):
+        dk_dr_over_r = -const * np.exp(-0.5 * r**2)
+    else:
+        # k = (1 + r² / 2a)^-a
+        a = base.alpha
+        dk_dr_over_r = -const * (1.0 + r**2 / (2.0 * a)) ** (-a - 1.0)
+
+    dK = dk_dr_over_r[:, :, None] * delta / ls**2          # (m, n, d)
+    grad = np.einsum("mnd,n...->md...", dK, model.alpha_)
+
+    return grad * getattr(model, "_y_train_std", 1.0)
+
+
+def scaler_jacobian(scaler, x):
+    """
+    J[i, j] = d Xn_j / d X_i for the per-column affine Scaler.
+    Probed with unit steps, which is exact for an affine transform.
+    """
+    x = np.asarray(x, dtype=float).reshape(1, -1)
+    base = scaler.transform(x)[0]
+    probe = x + np.eye(x.shape[1])
+    return scaler.transform(probe) - base
@@ -1,6 +1,8 @@
 # gpkit_inner_solver.py
 import gpkit as gp
+from profiling import profiled
 
+@profiled
 def run_gpkit_inner(
     *,
     W_struct_N,     # numeric [N]
@@ -0,0 +1,206 @@
+# grid_search.py
+"""
+Branch-and-bound search of the run_mdo geometry grid.
+
+evaluate_design's payload depends on geometry only through the
+structural weight (the GP sizing sees W_struct and the limits), and
+falls as W_struct rises. Both relations are checked numerically while
+searching:
+
+  * W_struct over the whole grid comes from one batched surrogate call;
+    if it is monotone along every axis the lower corner of a box is its
+    lightest design, otherwise the box minimum is used.
+  * Every evaluated design becomes a (W_struct, payload) reference; a
+    box whose lightest design is at least as heavy as some reference
+    cannot out-carry it. If a new evaluation breaks the monotone
+    payload ordering, bounding is switched off, every box pruned by the
+    bound so far is visited again, and the search finishes
+    exhaustively. Only evaluated designs can disprove the ordering, so
+    a violation hidden entirely inside pruned boxes goes unseen.
+
+Boxes are split along their leading axis and visited lower half first,
+so designs are reached in the same order as the nested run_mdo loops
+and ties resolve to the same (first) design. Boxes whose lightest
+design already exceeds min(W_max g, WS_max S_max) are certainly
+infeasible and skipped. Revisited boxes come after later designs, so
+ties are broken on grid order rather than on visit order.
+"""
+
+import bisect
+import itertools
+
+import numpy as np
+
+from mdo_outer_loop import evaluate_design
+from structural_surrogate.interface import get_structural_weight_batch
+
+
+def _structural_grid(axes):
+    b, c, fc = np.meshgrid(axes[0], axes[1], axes[2], indexing="ij")
+    W_struct_g, _, _ = get_structural_weight_batch(b, c, fc)
+    W = W_struct_g / 1000.0 * 9.81
+    return np.broadcast_to(W[..., None], tuple(len(a) for a in axes))
+
+
+class _References:
+    """
+    Evaluated (W_struct, payload) pairs, sorted by W_struct.
+    """
+
+    def __init__(self, tol):
+        self.w = []
+        self.p = []
+        self.tol = tol
+        self.monotone = True
+
+    def add(self, w, p):
+        i = bisect.bisect_left(self.w, w)
+
+        # Payload must not rise with W_struct (beyond solver noise)
+        if i > 0 and p > self.p[i - 1] + self.tol:
+            self.monotone = False
+        if i < len(self.w) and p < self.p[i] - self.tol:
+            self.monotone = False
+
+        self.w.insert(i, w)
+        self.p.insert(i, p)
+
+    def bound(self, w_min):
+        """
+        Best payload any design with W_struct >= w_min can reach
+        (None if no reference is light enough).
+        """
+        i = bisect.bisect_right(self.w, w_min)
+        if i == 0:
+            return None
+        return min(self.p[:i])
+
+
+def branch_and_bound_search(
+    axes,
+    *,
+    geom_limits,
+    env_params,
+    evaluate=evaluate_design,
+    tol=1e-6,
+    verbose=False
+):
+    """
+    axes : (wingspans, wing_chords, fuse_chords, tapers)
+    tol  : payload noise [N] tolerated when checking monotonicity
+
+    Returns dict: best (evaluate_design result or None), n_evaluated,
+    n_total, n_pruned_bound, n_pruned_infeasible, structure_monotone,
+    payload_monotone.
+    """
+    axes = [np.asarray(a, dtype=float) for a in axes]
+    shape = tuple(len(a) for a in axes)
+
+    W = _structural_grid(axes)
+    structure_monotone = all(
+        np.all(np.diff(W, axis=k) >= 0.0) for k in range(len(axes))
+    )
+
+    W_cap = min(
+        geom_limits["W_max"] * 9.81,
+        geom_limits.get("WS_max", 200.0) * geom_limits.get("S_max", 2.0)
+    )
+
+    refs = _References(tol)
+    state = {"best": None, "best_index": None,
+             "evaluated": 0, "pruned_bound": 0, "pruned_infeasible": 0}
+    deferred = []   # boxes pruned by the bound, valid only while monotone
+
+    def w_lower(box):
+        if structure_monotone:
+            return W[tuple(lo for lo, _ in box)]
+        return W[tuple(slice(lo, hi + 1) for lo, hi in box)].min()
+
+    def size(box):
+        return int(np.prod([hi - lo + 1 for lo, hi in box]))
+
+    def visit(box):
+        w_min = w_lower(box)
+
+        if w_min >= W_cap:
+            state["pruned_infeasible"] += size(box)
+            return
+
+        best = state["best"]
+        if best is not None and refs.monotone:
+            bound = refs.bound(w_min)
+            if bound is not None and bound <= best["payload_N"]:
+                state["pruned_bound"] += size(box)
+                deferred.append(box)
+                return
+
+        # Split along the leading axis that still has extent
+        for k, (lo, hi) in enumerate(box):
+            if hi > lo:
+                mid = (lo + hi) // 2
+                visit(box[:k] + [(lo, mid)] + box[k + 1:])
+                visit(box[:k] + [(mid + 1, hi)] + box[k + 1:])
+                return
+
+        # Single design
+        index = tuple(lo for lo, _ in box)
+        geometry = tuple(float(axes[k][i]) for k, i in enumerate(index))
+        state["evaluated"] += 1
+
+        try:
+            res = evaluate(
+                geometry=geometry, geom_limits=geom_limits, env_params=env_params
+            )
+        except Exception:
+            return
+
+        refs.add(float(W[index]), float(res["payload_N"]))
+
+        if not res["feasible"]:
+            return
+
+        if (best is None or res["payload_N"] > best["payload_N"]
+                or (res["payload_N"] == best["payload_N"] and index < state["best_index"])):
+            state["best"] = res
+            state["best_index"] = index
+            if verbose:
+                print("New best:", res)
+
+    visit([(0, n - 1) for n in shape])
+
+    # Monotonicity disproved: the bound pruned these boxes unsoundly
+    while deferred and not refs.monotone:
+        box = deferred.pop(0)
+        state["pruned_bound"] -= size(box)
+        visit(box)
+
+    return {
+        "best": state["best"],
+        "n_evaluated": state["evaluated"],
+        "n_total": int(np.prod(shape)),
+        "n_pruned_bound": state["pruned_bound"],
+        "n_pruned_infeasible": state["pruned_infeasible"],
+        "structure_monotone": bool(structure_monotone),
+        "payload_monotone": refs.monotone,
+    }
+
+
+def exhaustive_search(axes, *, geom_limits, env_params, evaluate=evaluate_design):
+    """
+    Reference nested-loop search (same order and tie rule as run_mdo).
+    """
+    best = None
+    for geometry in itertools.product(*axes):
+        try:
+            res = evaluate(
+                geometry=tuple(float(v) for v in geometry),
+                geom_limits=geom_limits,
+                env_params=env_params
+            )
+        except Exception:
+            continue
+
+        if res["feasible"] and (best is None or res["payload_N"] > best["payload_N"]):
+            best = res
+
+    return best
@@ -1,28 +1,82 @@
+import hashlib
+import os
+import numpy as np
 from structural_surrogate.wing_surrogate import WingSurrogate
 from structural_surrogate.fuse_surrogate import FuselageSurrogate
+from structural_surrogate.combined_surrogate import StructuralSurrogate
+from profiling import profiled
 
 # ---- GLOBAL MODELS ----
 wing_model = None
 fuse_model = None
+combined_model = None
 
+# Optional fidelity correction, see set_structural_correction()
+structural_correction = None
 
-def initialize_structural_surrogates():
+# Identifies the training data / mode of the current models (cache keys)
+surrogate_fingerprint = None
+
+
+@profiled
+def initialize_structural_surrogates(combined=False, csv_path=None):
     """
     Must be called ONCE before MDO loop starts.
+
+    combined=True trains one multi-output StructuralSurrogate instead of
+    separate wing / fuselage GPs.
     """
-    global wing_model, fuse_model
+    global wing_model, fuse_model, combined_model, surrogate_fingerprint
 
     print("\n--- Initializing structural surrogate ---")
 
-    wing_model = WingSurrogate()
-    wing_model.load_and_train()
+    if combined:
+        combined_model = StructuralSurrogate()
+        combined_model.load_and_train(csv_path)
+        wing_model = fuse_model = None
+    else:
+        wing_model = WingSurrogate()
+        wing_model.load_and_train(csv_path)
+
+        fuse_model = FuselageSurrogate()
+        fuse_model.load_and_train(csv_path)
+        combined_model = None
 
-    fuse_model = FuselageSurrogate()
-    fuse_model.load_and_train()
+    if csv_path is None:
+        csv_path = os.path.join(os.path.dirname(__file__), "cad_summary.csv")
+    with open(csv_path, "rb") as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(b"combined" if combined else b"separate")
+    surrogate_fingerprint = digest.hexdigest()
 
     print("Structural surrogates ready.")
 
 
+def _check_initialized():
+    if combined_model is None and (wing_model is None or fuse_model is None):
+        raise RuntimeError(
+            "Structural surrogates not initialized. "
+            "Call initialize_structural_surrogates() first."
+        )
+
+
+def set_structural_correction(correction=None):
+    """
+    Installs a correction applied on top of the surrogate weights
+    (None removes it).
+
+    correction(wingspan, wing_chord, fuse_chord, W_wing_g, W_fuse_g)
+        -> (W_wing_g, W_fuse_g)
+
+    If the object also has gradient(wingspan, wing_chord, fuse_chord)
+    returning the (3,) change it adds to d(W_struct)/d(geometry), the
+    gradient path includes it.
+    """
+    global structural_correction
+    structural_correction = correction
+
+
+@profiled
 def get_structural_weight(
     wingspan,
     wing_chord,
@@ -34,15 +88,108 @@ def get_structural_weight(
         wing_weight_g,
         fuselage_weight_g
     """
-    if wing_model is None or fuse_model is None:
-        raise RuntimeError(
-            "Structural surrogates not initialized. "
-            "Call initialize_structural_surrogates() first."
+    _check_initialized()
+
+    if combined_model is not None:
+        W_wing_g, W_fuse_g = combined_model.predict(
+            wingspan, wing_chord, fuse_chord
         )
+    else:
+        W_wing_g = wing_model.predict(wingspan, wing_chord)
+        W_fuse_g = fuse_model.predict(fuse_chord)
 
-    W_wing_g = wing_model.predict(wingspan, wing_chord)
-    W_fuse_g = fuse_model.predict(fuse_chord)
+    if structural_correction is not None:
+        W_wing_g, W_fuse_g = structural_correction(
+            wingspan, wing_chord, fuse_chord, W_wing_g, W_fuse_g
+        )
 
     W_struct_g = W_wing_g + W_fuse_g
 
     return W_struct_g, W_wing_g, W_fuse_g
+
+
+@profiled
+def get_structural_weight_with_grad(
+    wingspan,
+    wing_chord,
+    fuse_chord
+):
+    """
+    Same as get_structural_weight, plus the analytic gradient of the
+    total structural weight w.r.t. (wingspan, wing_chord, fuse_chord).
+
+    Returns:
+        total_structural_weight_g,
+        wing_weight_g,
+        fuselage_weight_g,
+        grad_g_per_m   (3,) array
+    """
+    _check_initialized()
+
+    if combined_model is not None:
+        (W_wing_g, W_fuse_g), jac = combined_model.predict_with_grad(
+            wingspan, wing_chord, fuse_chord
+        )
+        grad = jac.sum(axis=1)
+    else:
+        W_wing_g, dwing = wing_model.predict_with_grad(wingspan, wing_chord)
+        W_fuse_g, dfuse = fuse_model.predict_with_grad(fuse_chord)
+        grad = np.concatenate([dwing, dfuse])
+
+    if structural_correction is not None:
+        W_wing_g, W_fuse_g = structural_correction(
+            wingspan, wing_chord, fuse_chord, W_wing_g, W_fuse_g
+        )
+        if hasattr(structural_correction, "gradient"):
+            grad = grad + structural_correction.gradient(
+                wingspan, wing_chord, fuse_chord
+            )
+
+    W_struct_g = W_wing_g + W_fuse_g
+
+    return W_struct_g, W_wing_g, W_fuse_g, grad
+
+
+@profiled
+def get_structural_weight_batch(
+    wingspan,
+    wing_chord,
+    fuse_chord
+):
+    """
+    Array version of get_structural_weight (inputs broadcast together).
+
+    Returns:
+        total_structural_weight_g,
+        wing_weight_g,
+        fuselage_weight_g
+    """
+    _check_initialized()
+
+    wingspan, wing_chord, fuse_chord = np.broadcast_arrays(
+        np.asarray(wingspan, dtype=float),
+        np.asarray(wing_chord, dtype=float),
+        np.asarray(fuse_chord, dtype=float)
+    )
+    shape = wingspan.shape
+
+    X = np.column_stack([wingspan.ravel(), wing_chord.ravel(), fuse_chord.ravel()])
+
+    if combined_model is not None:
+        W = combined_model.predict_batch(X)
+        W_wing_g, W_fuse_g = W[:, 0], W[:, 1]
+    else:
+        W_wing_g = wing_model.predict_batch(X[:, :2])
+        W_fuse_g = fuse_model.predict_batch(X[:, 2:])
+
+    if structural_correction is not None:
+        corrected = [
+            structural_correction(b, c, fc, ww, wf)
+            for (b, c, fc), ww, wf in zip(X, W_wing_g, W_fuse_g)
+        ]
+        W_wing_g, W_fuse_g = np.array(corrected, dtype=float).reshape(-1, 2).T
+
+    W_wing_g = np.reshape(W_wing_g, shape)
+    W_fuse_g = np.reshape(W_fuse_g, shape)
+
+    return W_wing_g + W_fuse_g, W_wing_g, W_fuse_g
@@ -0,0 +1,51 @@
+# mdo_config.py
+"""
+Design space and fixed data of the run_mdo sweep.
+
+Shared by run_mdo and the drivers built on it (sensitivity, robustness,
+multifidelity, sweep_queue, benchmark_suite), plus the labelled
+assumptions those drivers add on top of the detailed codes. Treat as read-only; copy
+the dicts before changing a value.
+"""
+
+import numpy as np
+
+# -----------------------------
+# GEOMETRY DESIGN SPACE
+# -----------------------------
+WINGSPANS = np.linspace(0.8, 1.3, 5)
+WING_CHORDS = np.linspace(0.15, 0.20, 5)
+FUSE_CHORDS = np.linspace(0.28, 0.32, 5)
+TAPERS = np.linspace(1.0, 1.0, 5)
+
+# -----------------------------
+# CONSTANT DATA
+# -----------------------------
+GEOM_LIMITS = {
+    "W_max": 1.5875,          # kg
+    "WS_max": 200.0,          # N/m^2
+    "S_max": 0.3,             # m^2
+    "TW_max": 5.0,
+    "k": 0.045,
+    "airfoil_wing": "s1223",
+    "airfoil_fuse": "e858"
+}
+
+ENV_PARAMS = {
+    "rho": 1.225,
+    "S_G": 30.0,
+    "V_stall": 10.0,
+    "Vv": 2.0,
+    "mu": 1.81e-5
+}
+
+# -----------------------------
+# ASSUMPTIONS (robustness spar mass)
+# -----------------------------
+# Spar density: medium balsa, the MOR = 20 MPa grade the wing module
+# sizes to (spar_trade_study.DEFAULT_MATERIALS["balsa_medium"])
+SPAR_DENSITY_KG_M3 = 140.0
+
+# Approximate S1223 thickness / chord at the wing module's spar
+# positions (x/c = 0.25, 0.65); only used without airfoil coordinates
+SPAR_DEPTH_FRAC = (0.12, 0.075)
@@ -0,0 +1,175 @@
+# mdo_openmdao.py
+"""
+evaluate_design as an OpenMDAO component, so the design problem can be
+driven by ScipyOptimizeDriver (gradient-based) or the DOE drivers with a
+case recorder instead of the hand-rolled grid in run_mdo.
+
+Designs GPkit cannot size (e.g. TW_required > TW_max makes sizing
+pass 2 infeasible) raise om.AnalysisError instead of the solver error,
+so a line search or DOE case outside the feasible region is reported
+as a failed evaluation (the DOE drivers record it and continue) rather
+than ending the run.
+
+Partials:
+- W_struct_g, payload_N : analytic, from the structural surrogate
+  gradients. GPkit maximises payload with W at its cap
+  min(W_max g, WS_max S_max), so payload = W_cap - W_struct and
+  d payload = -g/1000 * d W_struct_g.
+- TW_required           : finite difference (GPkit sizing + polar
+  blending are not differentiable analytically here; complex step
+  cannot pass through the GP solver).
+"""
+
+import openmdao.api as om
+
+import structural_surrogate.interface as structural
+from mdo_outer_loop import evaluate_design
+from structural_surrogate.interface import get_structural_weight_with_grad
+
+G = 9.81
+
+SIZING_VARS = ("wingspan", "wing_chord", "fuse_chord")
+DESIGN_VARS = SIZING_VARS + ("taper",)
+
+
+class DesignEvaluationComp(om.ExplicitComponent):
+
+    def initialize(self):
+        self.options.declare("geom_limits", types=dict)
+        self.options.declare("env_params", types=dict)
+        self.options.declare("fd_step", default=1e-4)
+
+    def setup(self):
+        # Each (possibly MPI) process needs its own trained surrogates
+        if structural.wing_model is None and structural.combined_model is None:
+            structural.initialize_structural_surrogates()
+
+        for name in SIZING_VARS:
+            self.add_input(name, val=1.0, units="m")
+        self.add_input("taper", val=1.0)
+
+        self.add_output("W_struct_g", val=0.0, units="g")
+        self.add_output("payload_N", val=0.0, units="N")
+        self.add_output("TW_required", val=0.0)
+        self.add_output("feasible", val=0.0)
+
+        self.declare_partials(["W_struct_g", "payload_N"], list(SIZING_VARS))
+        self.declare_partials(
+            "TW_required", list(SIZING_VARS),
+            method="fd", step=self.options["fd_step"]
+        )
+
+    def _geometry(self, inputs):
+        return tuple(float(inputs[name][0]) for name in DESIGN_VARS)
+
+    def compute(self, inputs, outputs):
+        geometry = self._geometry(inputs)
+        try:
+            res = evaluate_design(
+                geometry=geometry,
+                geom_limits=self.options["geom_limits"],
+                env_params=self.options["env_params"]
+            )
+        except Exception as exc:
+            raise om.AnalysisError(
+                f"evaluate_design failed at {geometry}: {type(exc).__name__}: {exc}"
+            ) from exc
+
+        outputs["W_struct_g"] = res["W_struct_g"]
+        outputs["payload_N"] = res["payload_N"]
+        outputs["TW_required"] = res["TW_required"]
+        outputs["feasible"] = float(res["feasible"])
+
+    def compute_partials(self, inputs, partials):
+        wingspan, wing_chord, fuse_chord, _ = self._geometry(inputs)
+
+        _, _, _, grad = get_structural_weight_with_grad(
+            wingspan=wingspan,
+            wing_chord=wing_chord,
+            fuse_chord=fuse_chord
+        )
+
+        for name, dW in zip(SIZING_VARS, grad):
+            partials["W_struct_g", name] = dW
+            # Valid only while W sits at min(W_max g, WS_max S_max): the
+            # cap does not depend on geometry, so all of d W_struct goes
+            # into payload. Off the cap this partial is wrong.
+            partials["payload_N", name] = -G / 1000.0 * dW
+
+
+def build_design_problem(
+    *,
+    geom_limits,
+    env_params,
+    bounds,
+    driver="slsqp",
+    taper=1.0,
+    doe_levels=5,
+    run_parallel=False,
+    recorder_path=None
+):
+    """
+    bounds : {"wingspan": (lo, hi), "wing_chord": ..., "fuse_chord": ...}
+    driver : "slsqp" (ScipyOptimizeDriver) or "doe" (full-factorial
+             DOEDriver; run_parallel=True spreads cases over MPI ranks)
+
+    Maximises payload subject to TW_required <= TW_max.
+    Returns the set-up Problem.
+    """
+    prob = om.Problem()
+    model = prob.model
+
+    model.add_subsystem(
+        "design",
+        DesignEvaluationComp(geom_limits=geom_limits, env_params=env_params),
+        promotes=["*"]
+    )
+
+    for name in SIZING_VARS:
+        lo, hi = bounds[name]
+        model.set_input_defaults(name, 0.5 * (lo + hi), units="m")
+        model.add_design_var(name, lower=lo, upper=hi)
+    model.set_input_defaults("taper", taper)
+
+    model.add_objective("payload_N", scaler=-1.0)
+    model.add_constraint("TW_required", upper=geom_limits["TW_max"])
+
+    if driver == "slsqp":
+        prob.driver = om.ScipyOptimizeDriver(optimizer="SLSQP", tol=1e-6)
+    elif driver == "doe":
+        prob.driver = om.DOEDriver(om.FullFactorialGenerator(levels=doe_levels))
+        prob.driver.options["run_parallel"] = run_parallel
+    else:
+        raise ValueError(f"Unknown driver '{driver}'. Use 'slsqp' or 'doe'.")
+
+    if recorder_path is not None:
+        prob.driver.add_recorder(om.SqliteRecorder(recorder_path))
+        prob.driver.recording_options["includes"] = ["*"]
+
+    prob.setup()
+    return prob
+
+
+def best_recorded_case(recorder_path):
+    """
+    Best feasible case from a DOE / optimisation recording.
+    """
+    cr = om.CaseReader(recorder_path)
+    best = None
+
+    for case_id in cr.list_cases("driver", out_stream=None):
+        case = cr.get_case(case_id)
+        if case["feasible"][0] < 0.5:
+            continue
+        if best is None or case["payload_N"][0] > best["payload_N"][0]:
+            best = case
+
+    if best is None:
+        return None
+
+    return {
+        **{name: float(best[name][0]) for name in SIZING_VARS},
+        "payload_N": float(best["payload_N"][0]),
+        "TW_required": float(best["TW_required"][0]),
+        "W_struct_g": float(best["W_struct_g"][0]),
+    }
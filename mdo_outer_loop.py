@@ -1,25 +1,79 @@
 # mdo_outer_loop.py
 
-from structural_surrogate.interface import get_structural_weight
+import numpy as np
+
+from structural_surrogate.interface import get_structural_weight, get_structural_weight_batch
 from gpkit_inner_solver import run_gpkit_inner
-from aero.aero_preprocessor import compute_aero
+from aero.aero_preprocessor import compute_aero, compute_aero_batch
+from profiling import profiled
 
 
-def evaluate_design(
+def required_thrust_to_weight(
     *,
-    geometry,
-    aero=None,          # kept for backward compatibility (unused)
-    geom_limits,
-    env_params
+    WS,
+    rho,
+    S_G,
+    V_stall,
+    Vv,
+    CL_max,
+    Cdmin,
+    k
 ):
-    # -----------------------------
-    # GEOMETRY UNPACK
-    # -----------------------------
-    wingspan, wing_chord, fuse_chord, taper = geometry
+    """
+    Takeoff / climb / cruise T/W at wing loading WS.
+    Scalars or arrays (broadcast together).
+    """
+    V_climb  = 1.2 * V_stall
+    V_cruise = 1.3 * V_stall
 
     # -----------------------------
-    # STRUCTURAL SURROGATE
+    # DYNAMIC PRESSURE
     # -----------------------------
+    q1 = 0.5 * rho * V_climb**2
+    q2 = 0.5 * rho * V_cruise**2
+
+    TW_takeoff = (
+        (0.123 / (rho * CL_max * S_G)) * WS
+        + (0.605 / CL_max) * Cdmin
+        + 0.04
+    )
+
+    TW_climb = (
+        (Vv / V_climb)
+        + (q1 / WS) * Cdmin
+        + (k / q1) * WS
+    )
+
+    TW_cruise = (
+        (q2 * Cdmin) / WS
+        + (k / q2) * WS
+    )
+
+    return {
+        "TW_required": np.maximum(np.maximum(TW_takeoff, TW_climb), TW_cruise),
+        "TW_takeoff": TW_takeoff,
+        "TW_climb": TW_climb,
+        "TW_cruise": TW_cruise,
+    }
+
+
+# ==========================================================
+# STAGES
+# ==========================================================
+# evaluate_design is the chain
+#   structure → sizing pass 1 → aero → T/W → sizing pass 2
+# Each stage takes only the inputs it reads (keyword-only) and returns
+# a dict of plain floats, so stage_graph.py can fingerprint and cache
+# them individually.
+
+def _gp_limits(W_max, WS_max, S_max, TW_max, TW_min=None):
+    limits = {"W_max": W_max, "WS_max": WS_max, "S_max": S_max, "TW_max": TW_max}
+    if TW_min is not None:
+        limits["TW_min"] = TW_min
+    return {k: v for k, v in limits.items() if v is not None}
+
+
+def structure_stage(*, wingspan, wing_chord, fuse_chord):
     W_struct_g, W_wing_g, W_fuse_g = get_structural_weight(
         wingspan=wingspan,
         wing_chord=wing_chord,
@@ -27,30 +81,31 @@ def evaluate_design(
     )
 
     g = 9.81
-    W_struct_N = (W_struct_g / 1000.0) * g
+    return {
+        "W_struct_g": W_struct_g,
+        "W_wing_g": W_wing_g,
+        "W_fuse_g": W_fuse_g,
+        "W_struct_N": (W_struct_g / 1000.0) * g,
+    }
+
 
-    # ==========================================================
-    # GPkit PASS 1 → sizing (no thrust constraint)
-    # ==========================================================
+def sizing_pass1_stage(*, W_struct_N, W_max, WS_max=None, S_max=None, TW_max=None, TW_min=None):
+    """
+    GPkit PASS 1 → sizing (no thrust constraint beyond a caller-supplied
+    geom_limits["TW_min"]).
+    """
     sol1 = run_gpkit_inner(
         W_struct_N=W_struct_N,
-        geom_limits=geom_limits
+        geom_limits=_gp_limits(W_max, WS_max, S_max, TW_max, TW_min=TW_min)
     )
 
-    WS = sol1["W_S"].to("N/m^2").magnitude
-
-    # -----------------------------
-    # ENVIRONMENT
-    # -----------------------------
-    rho = env_params["rho"]
-    mu  = env_params["mu"]
-    S_G = env_params["S_G"]
-    V_stall = env_params["V_stall"]
-    Vv = env_params["Vv"]
+    return {
+        "WS": sol1["W_S"].to("N/m^2").magnitude,
+        "S_wing": sol1["S"].to("m^2").magnitude,
+    }
 
-    V_climb  = 1.2 * V_stall
-    V_cruise = 1.3 * V_stall
 
+def aero_stage(*, wingspan, wing_chord, rho, V_stall, mu, airfoil_wing, airfoil_fuse):
     # -----------------------------
     # REYNOLDS NUMBER (stall-based)
     # -----------------------------
@@ -60,84 +115,245 @@ def evaluate_design(
     # AERO (LEVEL-3, MULTI-AIRFOIL)
     # -----------------------------
     aero = compute_aero(
-        geometry=geometry,
+        geometry=(wingspan, wing_chord, None, None),
         Re=Re,
-        airfoil_wing=geom_limits["airfoil_wing"],
-        airfoil_fuse=geom_limits["airfoil_fuse"]
+        airfoil_wing=airfoil_wing,
+        airfoil_fuse=airfoil_fuse
     )
 
-    CL_max = aero["wing"]["Cl_max"]
+    return {
+        "Re": Re,
+        "Cl_max": aero["wing"]["Cl_max"],
+        "Cd0_wing": aero["wing"]["Cd0"],
+        "Cd0_fuse": aero["fuselage"]["Cd0"],
+    }
+
 
+def thrust_stage(
+    *,
+    WS,
+    S_wing,
+    fuse_chord,
+    Cl_max,
+    Cd0_wing,
+    Cd0_fuse,
+    rho,
+    S_G,
+    V_stall,
+    Vv,
+    k
+):
     # -----------------------------
     # FUSELAGE DRAG NORMALIZATION
     # -----------------------------
-
-    Cd0_wing = aero["wing"]["Cd0"]
-    Cd0_fuse = aero["fuselage"]["Cd0"]
-
-    # Reference areas
-    S_wing = sol1["S"].to("m^2").magnitude
-
     fuse_span = 0.15          # [m] FIXED fuselage span (given)
     S_fuse_ref = fuse_span * fuse_chord
 
     # Total parasite drag (wing-area referenced)
     Cdmin = Cd0_wing + Cd0_fuse * (S_fuse_ref / S_wing)
 
-
-    k = geom_limits["k"]   # induced drag handled externally
-
-    # -----------------------------
-    # DYNAMIC PRESSURE
-    # -----------------------------
-    q1 = 0.5 * rho * V_climb**2
-    q2 = 0.5 * rho * V_cruise**2
-
     # -----------------------------
     # REQUIRED T/W
     # -----------------------------
-    TW_takeoff = (
-        (0.123 / (rho * CL_max * S_G)) * WS
-        + (0.605 / CL_max) * Cdmin
-        + 0.04
+    tw = required_thrust_to_weight(
+        WS=WS, rho=rho, S_G=S_G, V_stall=V_stall, Vv=Vv,
+        CL_max=Cl_max, Cdmin=Cdmin, k=k
     )
 
-    TW_climb = (
-        (Vv / V_climb)
-        + (q1 / WS) * Cdmin
-        + (k / q1) * WS
-    )
-
-    TW_cruise = (
-        (q2 * Cdmin) / WS
-        + (k / q2) * WS
-    )
+    return {
+        "Cd0_total": Cdmin,
+        "TW_required": float(tw["TW_required"]),
+        "TW_takeoff": tw["TW_takeoff"],
+        "TW_climb": tw["TW_climb"],
+        "TW_cruise": tw["TW_cruise"],
+    }
 
-    TW_required = max(TW_takeoff, TW_climb, TW_cruise)
 
-    # ==========================================================
-    # GPkit PASS 2 → enforce thrust requirement
-    # ==========================================================
+def sizing_pass2_stage(*, W_struct_N, TW_required, W_max, WS_max=None, S_max=None, TW_max=None):
+    """
+    GPkit PASS 2 → enforce thrust requirement.
+    """
     sol2 = run_gpkit_inner(
         W_struct_N=W_struct_N,
-        geom_limits={**geom_limits, "TW_min": TW_required}
+        geom_limits=_gp_limits(W_max, WS_max, S_max, TW_max, TW_min=TW_required)
     )
 
+    TW = sol2["T_W"].to("dimensionless").magnitude
+
+    return {
+        "TW": TW,
+        "payload_N": sol2["W_payload"].to("N").magnitude,
+        "S": sol2["S"].to("m^2").magnitude,
+        "W": sol2["W"].to("N").magnitude,
+        "feasible": bool(TW >= TW_required),
+    }
+
+
+def _result(geometry, s):
+    return {
+        "geometry": geometry,
+        "feasible": s["feasible"],
+        "W_struct_g": s["W_struct_g"],
+        "W_wing_g": s["W_wing_g"],
+        "W_fuse_g": s["W_fuse_g"],
+        "payload_N": s["payload_N"],
+        "W": s["W"],
+        "S": s["S"],
+        "WS": s["WS"],
+        "TW": s["TW"],
+        "TW_required": s["TW_required"],
+        "TW_takeoff": s["TW_takeoff"],
+        "TW_climb": s["TW_climb"],
+        "TW_cruise": s["TW_cruise"],
+        "Re": s["Re"],
+        "Cl_max": s["Cl_max"],
+        "Cd0_total": s["Cd0_total"]
+    }
+
+
+@profiled
+def evaluate_design(
+    *,
+    geometry,
+    aero=None,          # kept for backward compatibility (unused)
+    geom_limits,
+    env_params
+):
     # -----------------------------
-    # SAFE EXTRACTION
+    # GEOMETRY UNPACK
     # -----------------------------
-    TW = sol2["T_W"].to("dimensionless").magnitude
-    payload = sol2["W_payload"].to("N").magnitude
-    S = sol2["S"].to("m^2").magnitude
-    W = sol2["W"].to("N").magnitude
+    wingspan, wing_chord, fuse_chord, taper = geometry
+
+    limits = {
+        "W_max": geom_limits["W_max"],
+        "WS_max": geom_limits.get("WS_max"),
+        "S_max": geom_limits.get("S_max"),
+        "TW_max": geom_limits.get("TW_max"),
+    }
+
+    s = structure_stage(wingspan=wingspan, wing_chord=wing_chord, fuse_chord=fuse_chord)
+
+    s.update(sizing_pass1_stage(
+        W_struct_N=s["W_struct_N"], TW_min=geom_limits.get("TW_min"), **limits
+    ))
+
+    s.update(aero_stage(
+        wingspan=wingspan,
+        wing_chord=wing_chord,
+        rho=env_params["rho"],
+        V_stall=env_params["V_stall"],
+        mu=env_params["mu"],
+        airfoil_wing=geom_limits["airfoil_wing"],
+        airfoil_fuse=geom_limits["airfoil_fuse"]
+    ))
+
+    s.update(thrust_stage(
+        WS=s["WS"],
+        S_wing=s["S_wing"],
+        fuse_chord=fuse_chord,
+        Cl_max=s["Cl_max"],
+        Cd0_wing=s["Cd0_wing"],
+        Cd0_fuse=s["Cd0_fuse"],
+        rho=env_params["rho"],
+        S_G=env_params["S_G"],
+        V_stall=env_params["V_stall"],
+        Vv=env_params["Vv"],
+        k=geom_limits["k"]      # induced drag handled externally
+    ))
 
-    feasible = TW >= TW_required
+    s.update(sizing_pass2_stage(
+        W_struct_N=s["W_struct_N"], TW_required=s["TW_required"], **limits
+    ))
+
+    return _result(geometry, s)
+
+
+@profiled
+def evaluate_design_batch(
+    *,
+    wingspan,
+    wing_chord,
+    fuse_chord,
+    geom_limits,
+    env_params,
+    W_struct_delta_g=0.0
+):
+    """
+    Vectorised evaluate_design for many designs / operating points.
+
+    Geometry arrays and any numeric value in geom_limits / env_params
+    broadcast together (airfoil names stay scalar). The inner GP has a
+    closed form:
+        W       = min(W_max g, WS_max S_max)
+        payload = W - W_struct
+    Payload does not depend on how W splits into W_S * S, so GPkit's
+    pass-1 wing loading is arbitrary on that ray; here it is resolved
+    toward the largest permitted wing (WS = max(W / S_max, 40)). TW_*
+    can therefore differ from evaluate_design, payload does not (see
+    sensitivity.compare_evaluators).
+    Feasible iff payload >= 1e-3 N (GPkit's W_payload floor) and
+    TW_required <= TW_max.
+
+    W_struct_delta_g is added to the surrogate structural weight (e.g.
+    per-sample material scatter) and broadcasts like the other inputs.
+    """
+    g = 9.81
 
     # -----------------------------
-    # RETURN RESULTS
+    # STRUCTURAL SURROGATE
     # -----------------------------
+    W_struct_g, W_wing_g, W_fuse_g = get_structural_weight_batch(
+        wingspan, wing_chord, fuse_chord
+    )
+    W_wing_g = W_wing_g + W_struct_delta_g
+    W_struct_g = W_struct_g + W_struct_delta_g
+    W_struct_N = (W_struct_g / 1000.0) * g
+
+    # -----------------------------
+    # SIZING (closed-form inner GP)
+    # -----------------------------
+    W_max = np.asarray(geom_limits["W_max"], dtype=float) * g
+    WS_max = np.asarray(geom_limits.get("WS_max", 200.0), dtype=float)
+    S_max = np.asarray(geom_limits.get("S_max", 2.0), dtype=float)
+    TW_max = np.asarray(geom_limits.get("TW_max", 7.0), dtype=float)
+
+    W = np.minimum(W_max, WS_max * S_max)
+    payload = W - W_struct_N
+
+    WS = np.maximum(W / S_max, 40.0)
+    S = W / WS
+
+    # -----------------------------
+    # ENVIRONMENT / AERO
+    # -----------------------------
+    rho = np.asarray(env_params["rho"], dtype=float)
+    mu = np.asarray(env_params["mu"], dtype=float)
+    V_stall = np.asarray(env_params["V_stall"], dtype=float)
+
+    Re = rho * V_stall * np.asarray(wing_chord, dtype=float) / mu
+
+    aero = compute_aero_batch(
+        wingspan=wingspan,
+        wing_chord=wing_chord,
+        Re=Re,
+        airfoil_wing=geom_limits["airfoil_wing"],
+        airfoil_fuse=geom_limits["airfoil_fuse"]
+    )
+
+    CL_max = aero["wing"]["Cl_max"]
+
+    fuse_span = 0.15          # [m] FIXED fuselage span (given)
+    S_fuse_ref = fuse_span * np.asarray(fuse_chord, dtype=float)
+    Cdmin = aero["wing"]["Cd0"] + aero["fuselage"]["Cd0"] * (S_fuse_ref / S)
+
+    tw = required_thrust_to_weight(
+        WS=WS, rho=rho, S_G=env_params["S_G"], V_stall=V_stall,
+        Vv=env_params["Vv"], CL_max=CL_max, Cdmin=Cdmin, k=geom_limits["k"]
+    )
+
+    feasible = (payload >= 1e-3) & (tw["TW_required"] <= TW_max)
+
     return {
-        "geometry": geometry,
         "feasible": feasible,
         "W_struct_g": W_struct_g,
         "W_wing_g": W_wing_g,
@@ -146,11 +362,7 @@ def evaluate_design(
         "W": W,
         "S": S,
         "WS": WS,
-        "TW": TW,
-        "TW_required": TW_required,
-        "TW_takeoff": TW_takeoff,
-        "TW_climb": TW_climb,
-        "TW_cruise": TW_cruise,
+        **tw,
         "Re": Re,
         "Cl_max": CL_max,
         "Cd0_total": Cdmin
@@ -0,0 +1,236 @@
+"""
+Time-stepped mission energy simulator.
+
+Segments are discretised into array time series and integrated with a
+simple pack model (linear open-circuit voltage vs. state of charge plus
+internal-resistance sag). Many mission variants are simulated together
+as a (missions x time) array, so fleet-wide what-if studies run in one
+NumPy pass instead of a Python loop per segment.
+"""
+
+import numpy as np
+
+from mission_profile import MISSION_SEGMENTS
+from battery_sizing import USABLE_FRACTION
+
+# -------------------------------
+# Pack model assumptions
+# -------------------------------
+N_CELLS = 4                     # 4S LiPo (14.8 V nominal)
+CELL_V_FULL = 4.2               # V at 100% SOC
+CELL_V_EMPTY = 3.3              # V at 0% SOC
+PACK_R_INTERNAL_OHM = 0.04      # Ohm, whole pack
+
+
+# -------------------------------
+# Mission packing
+# -------------------------------
+
+def pack_missions(missions):
+    """
+    Packs a list of segment lists into (M, S) arrays, padding shorter
+    missions with zero-duration segments.
+
+    A segment may give "current_end_A" for a linear ramp from
+    "current_A" over its duration.
+
+    Returns durations_s, current_A, current_end_A.
+    """
+    S = max(len(m) for m in missions)
+    shape = (len(missions), S)
+
+    durations = np.zeros(shape)
+    current = np.zeros(shape)
+    current_end = np.zeros(shape)
+
+    for i, mission in enumerate(missions):
+        for j, seg in enumerate(mission):
+            durations[i, j] = seg["duration_s"]
+            current[i, j] = seg["current_A"]
+            current_end[i, j] = seg.get("current_end_A", seg["current_A"])
+
+    return durations, current, current_end
+
+
+def mission_variants(
+    n,
+    base=MISSION_SEGMENTS,
+    duration_scale=(0.9, 1.1),
+    current_scale=(0.9, 1.2),
+    seed=0
+):
+    """
+    n random variants of a base mission, scaling each segment's duration
+    and current independently (uniform within the given ranges).
+    """
+    rng = np.random.default_rng(seed)
+    durations, current, current_end = pack_missions([base])
+
+    d = durations * rng.uniform(*duration_scale, (n, durations.shape[1]))
+    s = rng.uniform(*current_scale, (n, current.shape[1]))
+
+    return d, current * s, current_end * s
+
+
+# -------------------------------
+# Simulation
+# -------------------------------
+
+def _simulate_chunk(
+    durations,
+    current,
+    current_end,
+    dt,
+    capacity_Ah,
+    n_cells,
+    R_internal_ohm,
+    v_cell_full,
+    v_cell_empty,
+    return_series
+):
+    M, S = durations.shape
+    t_end = np.cumsum(durations, axis=1)
+    t_start = t_end - durations
+    T_total = t_end[:, -1]
+
+    # Step edges on a common grid; the last step of each mission is
+    # shortened to end at T_total.
+    t_left = np.arange(0.0, np.max(T_total), dt)
+    t_edge = np.arange(len(t_left) + 1) * dt
+    edges = np.minimum(t_edge[None, :], T_total[:, None])
+    width = np.diff(edges, axis=1)
+
+    # Charge drawn up to each edge, segment by segment, so a step that
+    # straddles a segment boundary gets each segment's exact share.
+    Q = np.zeros_like(edges)
+    for s in range(S):
+        d = durations[:, s:s + 1]
+        tau = np.clip(edges - t_start[:, s:s + 1], 0.0, d)
+        ramp = (current_end[:, s:s + 1] - current[:, s:s + 1]) / np.where(d > 0.0, d, 1.0)
+        Q += current[:, s:s + 1] * tau + 0.5 * ramp * tau**2
+
+    dQ = np.diff(Q, axis=1)                               # A·s per step
+    I = np.where(width > 0.0, dQ / np.where(width > 0.0, width, 1.0), 0.0)
+
+    # ---- Charge ----
+    dAh = dQ / 3600.0
+    Ah_cum = np.cumsum(dAh, axis=1)
+    Ah_total = Ah_cum[:, -1]
+
+    if capacity_Ah is None:
+        capacity = Ah_total / USABLE_FRACTION
+    else:
+        capacity = np.broadcast_to(np.asarray(capacity_Ah, dtype=float), (M,))
+
+    capacity = np.where(capacity > 0.0, capacity, 1.0)[:, None]
+
+    # ---- Voltage (SOC at the step midpoint) ----
+    soc = 1.0 - (Ah_cum - 0.5 * dAh) / capacity
+    v_oc = n_cells * (v_cell_empty + (v_cell_full - v_cell_empty) * soc)
+    V = v_oc - I * R_internal_ohm
+
+    # ---- Energy ----
+    Wh_total = np.sum(V * I * width, axis=1) / 3600.0
+    V_active = np.where(width > 0.0, V, np.inf)
+
+    out = {
+        "Ah": Ah_total,
+        "Wh": Wh_total,
+        "required_capacity_Ah": Ah_total / USABLE_FRACTION,
+        "min_voltage_V": np.min(V_active, axis=1),
+        "final_soc": 1.0 - Ah_total / capacity[:, 0],
+        "duration_s": T_total,
+    }
+
+    if return_series:
+        out["time_s"] = t_left
+        out["current_A"] = I
+        out["voltage_V"] = V
+
+    return out
+
+
+def simulate_missions(
+    durations_s,
+    current_A,
+    current_end_A=None,
+    *,
+    dt=0.5,
+    capacity_Ah=None,
+    n_cells=N_CELLS,
+    R_internal_ohm=PACK_R_INTERNAL_OHM,
+    v_cell_full=CELL_V_FULL,
+    v_cell_empty=CELL_V_EMPTY,
+    chunk_size=4096,
+    return_series=False
+):
+    """
+    Simulates M missions of S segments.
+
+    durations_s, current_A : (M, S) arrays (see pack_missions)
+    current_end_A          : (M, S) ramp end currents (default: constant)
+    capacity_Ah            : pack capacity per mission; None sizes each
+                             pack to its own requirement (as size_battery)
+
+    Returns dict of (M,) arrays: Ah, Wh, required_capacity_Ah,
+    min_voltage_V, final_soc, duration_s. With return_series=True (one
+    chunk only) also time_s (T,), step-mean current_A and voltage_V
+    (M, T).
+    """
+    durations_s = np.atleast_2d(np.asarray(durations_s, dtype=float))
+    current_A = np.atleast_2d(np.asarray(current_A, dtype=float))
+    current_end_A = current_A if current_end_A is None else \
+        np.atleast_2d(np.asarray(current_end_A, dtype=float))
+
+    M = durations_s.shape[0]
+    if return_series and M > chunk_size:
+        raise ValueError("return_series requires M <= chunk_size.")
+
+    capacity = None if capacity_Ah is None else \
+        np.broadcast_to(np.asarray(capacity_Ah, dtype=float), (M,))
+
+    chunks = []
+    for i in range(0, M, chunk_size):
+        sl = slice(i, i + chunk_size)
+        chunks.append(_simulate_chunk(
+            durations_s[sl], current_A[sl], current_end_A[sl], dt,
+            None if capacity is None else capacity[sl],
+            n_cells, R_internal_ohm, v_cell_full, v_cell_empty,
+            return_series
+        ))
+
+    if len(chunks) == 1:
+        return chunks[0]
+
+    return {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+
+
+def simulate_mission(segments=MISSION_SEGMENTS, **kwargs):
+    """
+    Single-mission convenience wrapper; returns scalars (and series).
+    """
+    out = simulate_missions(*pack_missions([segments]), **kwargs)
+    return {
+        k: (v if k == "time_s" else v[0])
+        for k, v in out.items()
+    }
+
+
+# -------------------------------
+# Standalone test
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    res = simulate_mission()
+    print("\n=== MISSION SIMULATION (BASE) ===")
+    print(f"Charge (Ah): {res['Ah']:.3f}")
+    print(f"Energy (Wh): {res['Wh']:.2f}")
+    print(f"Required Capacity (mAh): {res['required_capacity_Ah'] * 1000:.0f}")
+    print(f"Min Voltage (V): {res['min_voltage_V']:.2f}")
+
+    t0 = time.perf_counter()
+    batch = simulate_missions(*mission_variants(10_000))
+    print(f"\n10,000 variants in {time.perf_counter() - t0:.2f} s")
+    print(f"Required capacity p95 (mAh): "
+          f"{np.percentile(batch['required_capacity_Ah'], 95) * 1000:.0f}")
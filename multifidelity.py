@@ -0,0 +1,394 @@
+# multifidelity.py
+"""
+Two-stage structural fidelity for the design sweep.
+
+Stage 1 evaluates the whole grid with the GP structural weights
+(evaluate_design, surrogate cost). Stage 2 re-checks only the top-K
+feasible designs with the detailed structural analyses
+(wing_spar_sizing, fuselage_moi_analysis). Where the two fidelities
+disagree, the discrepancy is fitted and installed as a structural
+correction, the grid is re-ranked, and any design that enters the
+top-K is re-checked in turn, until the top-K set stops changing.
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import warnings
+
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+
+import structural_surrogate.interface as structural
+from mdo_outer_loop import evaluate_design
+from mdo_config import GEOM_LIMITS, ENV_PARAMS, WINGSPANS, WING_CHORDS, FUSE_CHORDS
+from detailed_codes import fuselage_code, wing_code
+from structural_surrogate.gp_gradient import gp_mean_gradient
+from CALLING_CODE_ITERATION_7 import (
+    DENSITY_DEFAULT as DENSITY_KG_M3,
+    TW_MM,
+    X_BOT_MM,
+    BASEPLATE_GAP_MM,
+    K_MIN_MM,
+    K_STEP_MM,
+)
+from profiling import profiled
+
+# ---- ASSUMPTIONS (not in the batch runner, which sizes no ribs and
+# passes no fuselage loads; set them from the real structure) ----
+RIB_THICKNESS_MM = 3.0
+RIB_SPACING_MM = 100.0
+FUSE_RIB_THICKNESS_MM = 3.0
+
+# (load [N], position / fuse chord): W_max 1.5875 kg at load factor 2,
+# taken at the wing quarter chord
+FUSE_POINT_LOADS = ((2.0 * 1.5875 * 9.81, 0.25),)
+
+# Residual GP of the fidelity correction
+CORRECTION_LENGTH_SCALE = (0.25, 0.025, 0.02)   # ~half the run_mdo grid ranges
+CORRECTION_NOISE = 1e-2
+
+
+def _key(geometry):
+    return tuple(round(float(v), 12) for v in geometry[:3])
+
+
+def _profile_area(coords):
+    """
+    Enclosed area of a closed airfoil loop, in chord² units.
+    """
+    x = coords[:, 0] / np.max(coords[:, 0])
+    y = coords[:, 1] / np.max(coords[:, 0])
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+# ==================================================
+# HIGH FIDELITY
+# ==================================================
+
+class DetailedStructure:
+    """
+    Component weights from the detailed structural codes.
+
+    Wing     : two rectangular spars sized by wing_spar_sizing over the
+               full span, plus ribs cut from the airfoil profile.
+    Fuselage : baseplate + side strips from fuselage_moi_analysis under
+               fuse_point_loads; at each station the shallowest strip
+               depth k whose bending stress M c / I stays within the
+               spar allowable (MOR / FoS of the wing code), integrated
+               along the profile.
+
+    Material and section constants come from the batch runner; rib and
+    load values are the labelled assumptions above.
+
+    Any callable (wingspan, wing_chord, fuse_chord) -> (W_wing_g,
+    W_fuse_g) can replace this in multifidelity_sweep.
+    """
+
+    def __init__(
+        self,
+        wing_airfoil_path,
+        fuse_airfoil_path=None,
+        *,
+        density_kg_m3=DENSITY_KG_M3,
+        rib_thickness_mm=RIB_THICKNESS_MM,
+        rib_spacing_mm=RIB_SPACING_MM,
+        fuse_rib_thickness_mm=FUSE_RIB_THICKNESS_MM,
+        fuse_point_loads=FUSE_POINT_LOADS,
+        work_dir=None
+    ):
+        self.wing = wing_code()
+        self.fuse = fuselage_code()
+
+        self.wing_coords = np.loadtxt(wing_airfoil_path)
+        self.fuse_coords = np.loadtxt(fuse_airfoil_path or wing_airfoil_path)
+
+        self.density = density_kg_m3
+        self.rib_thickness_mm = rib_thickness_mm
+        self.rib_spacing_mm = rib_spacing_mm
+        self.fuse_rib_thickness_mm = fuse_rib_thickness_mm
+        self.fuse_point_loads = fuse_point_loads
+        self.sigma_allow_MPa = self.wing.MOR_MPA / self.wing.FOS
+
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="mdao_hifi_")
+
+    def wing_weight_g(self, wingspan, wing_chord):
+        chord_mm = wing_chord * 1000.0
+        span_mm = wingspan * 1000.0
+
+        out = self.wing.wing_spar_sizing(
+            row={"wing_rib_chord_mm": chord_mm, "wing_span_mm": span_mm},
+            coords=self.wing_coords
+        )
+
+        spar_mm3 = (out["b1_mm"] * out["h1_mm"] + out["b2_mm"] * out["h2_mm"]) * span_mm
+
+        n_ribs = int(span_mm // self.rib_spacing_mm) + 1
+        rib_mm3 = n_ribs * _profile_area(self.wing_coords) * chord_mm**2 * self.rib_thickness_mm
+
+        return self.density * (spar_mm3 + rib_mm3) * 1e-6
+
+    def fuse_weight_g(self, fuse_chord):
+        chord_mm = fuse_chord * 1000.0
+
+        profile = os.path.join(self.work_dir, "fuse_profile.dat")
+        np.savetxt(profile, self.fuse_coords / np.max(self.fuse_coords[:, 0]) * chord_mm)
+
+        df = self.fuse.fuselage_moi_analysis(
+            airfoil_csv=profile,
+            baseplate_gap=BASEPLATE_GAP_MM,
+            w=chord_mm,
+            tw=TW_MM,
+            rt=self.fuse_rib_thickness_mm,
+            x_bot=X_BOT_MM,
+            k_min=K_MIN_MM,
+            step=K_STEP_MM,
+            point_loads=[(P, frac * chord_mm) for P, frac in self.fuse_point_loads],
+            output_csv=os.path.join(self.work_dir, "fuselage_moi.csv")
+        )
+
+        if df.empty:
+            return 0.0
+
+        # Bending stress of every candidate; extreme fibre from the centroid
+        c = np.maximum(df["centroid"], df["h_eff"] - df["centroid"])
+        df = df.assign(ok=df["M"] * c / df["I"] <= self.sigma_allow_MPa)
+
+        # Shallowest passing k per station (deepest if none passes)
+        passing = df[df["ok"]].groupby("x")["k"].min()
+        deepest = df.groupby("x")["k"].max()
+        k = passing.reindex(deepest.index).fillna(deepest).sort_index()
+
+        n_over = int(len(deepest) - len(passing))
+        if n_over:
+            warnings.warn(
+                f"{n_over} fuselage station(s) overstressed at the deepest strip "
+                f"(fuse chord {chord_mm:.0f} mm)"
+            )
+
+        x = k.index.values
+        area_mm2 = chord_mm * TW_MM + 2.0 * self.fuse_rib_thickness_mm * (X_BOT_MM + k.values)
+
+        if len(x) < 2:
+            return 0.0
+
+        volume_mm3 = np.sum(0.5 * (area_mm2[1:] + area_mm2[:-1]) * np.diff(x))
+        return self.density * volume_mm3 * 1e-6
+
+    @profiled
+    def __call__(self, wingspan, wing_chord, fuse_chord):
+        return self.wing_weight_g(wingspan, wing_chord), self.fuse_weight_g(fuse_chord)
+
+
+# ==================================================
+# CORRECTION
+# ==================================================
+
+class FidelityCorrection:
+    """
+    High-minus-low discrepancy on (W_wing_g, W_fuse_g) as one smooth
+    function of (wingspan, wing_chord, fuse_chord): a ridge-linear trend
+    (a constant offset while fewer than four designs are checked) plus a
+    GP on the trend residual. It passes close to the checked designs
+    (within the GP noise) and gradient() is the derivative of the same
+    function.
+    """
+
+    def __init__(self, ridge=1e-6, noise=CORRECTION_NOISE):
+        self.ridge = ridge
+        self.noise = noise
+        self.X = []
+        self.delta = []
+        self.checked = {}
+        self.coef = np.zeros((4, 2))
+        self.gp = None
+
+    def add(self, geometry, low, high):
+        self.X.append([float(v) for v in geometry[:3]])
+        self.delta.append([high[0] - low[0], high[1] - low[1]])
+        self.checked[_key(geometry)] = (float(high[0]), float(high[1]))
+
+    def _trend(self, X):
+        return np.column_stack([np.ones(len(X)), X]) @ self.coef
+
+    def fit(self):
+        X = np.asarray(self.X)
+        D = np.asarray(self.delta)
+
+        self.coef = np.zeros((4, 2))
+        if len(X) < 4:
+            self.coef[0] = D.mean(axis=0)
+        else:
+            A = np.column_stack([np.ones(len(X)), X])
+            self.coef = np.linalg.solve(
+                A.T @ A + self.ridge * np.eye(4), A.T @ D
+            )
+
+        self.gp = None
+        R = D - self._trend(X)
+        if len(X) >= 2 and np.any(np.abs(R) > 0.0):
+            self.gp = GaussianProcessRegressor(
+                kernel=ConstantKernel(1.0) * RBF(length_scale=list(CORRECTION_LENGTH_SCALE)),
+                alpha=self.noise,
+                normalize_y=True
+            ).fit(X, R)
+
+        return self
+
+    def delta_at(self, X):
+        """
+        (n, 2) correction at (n, 3) geometries.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        d = self._trend(X)
+        if self.gp is not None:
+            d = d + self.gp.predict(X)
+        return d
+
+    def __call__(self, wingspan, wing_chord, fuse_chord, W_wing_g, W_fuse_g):
+        d = self.delta_at([[wingspan, wing_chord, fuse_chord]])[0]
+        return W_wing_g + float(d[0]), W_fuse_g + float(d[1])
+
+    def gradient(self, wingspan, wing_chord, fuse_chord):
+        g = self.coef[1:].copy()                               # (3, 2)
+        if self.gp is not None:
+            g = g + gp_mean_gradient(self.gp, [[wingspan, wing_chord, fuse_chord]])[0]
+        return g.sum(axis=1)
+
+
+# ==================================================
+# TWO-STAGE SWEEP
+# ==================================================
+
+def _sweep(designs, geom_limits, env_params):
+    return [
+        evaluate_design(geometry=g, geom_limits=geom_limits, env_params=env_params)
+        for g in designs
+    ]
+
+
+def _top_k(results, k):
+    feasible = [r for r in results if r["feasible"]]
+    return sorted(feasible, key=lambda r: -r["payload_N"])[:k]
+
+
+def multifidelity_sweep(
+    designs,
+    *,
+    geom_limits,
+    env_params,
+    high_fidelity,
+    top_k=5,
+    rtol=0.05,
+    max_rounds=3
+):
+    """
+    designs       : iterable of (wingspan, wing_chord, fuse_chord, taper)
+    high_fidelity : callable (wingspan, wing_chord, fuse_chord)
+                    -> (W_wing_g, W_fuse_g), e.g. DetailedStructure
+    rtol          : relative structural-weight disagreement that
+                    triggers a correction
+
+    Returns dict with the final ranking, the top-K picks (each flagged
+    hifi_checked), the per-design fidelity comparison and the fitted
+    correction (None if the fidelities agreed).
+    """
+    designs = [tuple(g) for g in designs]
+    previous = structural.structural_correction
+
+    structural.set_structural_correction(None)
+    try:
+        results = _sweep(designs, geom_limits, env_params)
+        low = {_key(r["geometry"]): (r["W_wing_g"], r["W_fuse_g"]) for r in results}
+
+        correction = FidelityCorrection()
+        comparison = []
+        corrected = False
+        rounds = 0
+
+        for rounds in range(1, max_rounds + 1):
+            top = _top_k(results, top_k)
+            new = [r for r in top if _key(r["geometry"]) not in correction.checked]
+            if not new:
+                break
+
+            for r in new:
+                geometry = r["geometry"]
+                lo = low[_key(geometry)]
+                hi = high_fidelity(*geometry[:3])
+                correction.add(geometry, lo, hi)
+
+                W_lo, W_hi = sum(lo), sum(hi)
+                comparison.append({
+                    "geometry": geometry,
+                    "W_struct_low_g": W_lo,
+                    "W_struct_high_g": W_hi,
+                    "rel_error": (W_lo - W_hi) / W_hi if W_hi else np.inf,
+                })
+
+            if not corrected and all(abs(c["rel_error"]) <= rtol for c in comparison):
+                break
+
+            # Fidelities disagree → correct the surrogate and re-rank
+            structural.set_structural_correction(correction.fit())
+            corrected = True
+            results = _sweep(designs, geom_limits, env_params)
+    finally:
+        structural.set_structural_correction(previous)
+
+    top = _top_k(results, top_k)
+    for r in top:
+        r["hifi_checked"] = _key(r["geometry"]) in correction.checked
+
+    return {
+        "results": results,
+        "top": top,
+        "comparison": comparison,
+        "correction": correction if corrected else None,
+        "rounds": rounds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Surrogate screen + high-fidelity structural re-check")
+    parser.add_argument("--wing-airfoil", required=True, help="airfoil coordinates (x y)")
+    parser.add_argument("--fuse-airfoil", help="fuselage profile (defaults to the wing airfoil)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rtol", type=float, default=0.05)
+    parser.add_argument("--max-rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    structural.initialize_structural_surrogates()
+
+    designs = itertools.product(WINGSPANS, WING_CHORDS, FUSE_CHORDS, [1.0])
+
+    out = multifidelity_sweep(
+        designs,
+        geom_limits=GEOM_LIMITS,
+        env_params=ENV_PARAMS,
+        high_fidelity=DetailedStructure(args.wing_airfoil, args.fuse_airfoil),
+        top_k=args.top_k,
+        rtol=args.rtol,
+        max_rounds=args.max_rounds
+    )
+
+    print("\n================ FIDELITY CHECK ================")
+    for c in out["comparison"]:
+        print(
+            f"{c['geometry']}  low {c['W_struct_low_g']:8.1f} g  "
+            f"high {c['W_struct_high_g']:8.1f} g  ({100 * c['rel_error']:+.1f} %)"
+        )
+
+    print(f"\nCorrection applied: {out['correction'] is not None} "
+          f"({out['rounds']} round(s))")
+
+    print("\n================ TOP DESIGNS ================")
+    for r in out["top"]:
+        print(r["geometry"], f"payload {r['payload_N']:.3f} N",
+              "(high-fidelity checked)" if r["hifi_checked"] else "")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,149 @@
-"""
-Minimal OpenConcept battery sizing test.
-This replaces manual battery mass estimation.
-"""
-
-import openmdao.api as om
-from openconcept.energy_storage.battery import Battery
-
-
-class BatteryTest(om.Group):
-    def setup(self):
-
-        self.add_subsystem(
-            "battery",
-            Battery(
-                num_nodes=1,
-                efficiency=0.97,
-                specific_energy=200.0  # Wh/kg (LiPo)
-            ),
-            promotes=["*"]
-        )
-
-        self.set_input_defaults("battery_energy", 35.0, units="W*h")
-        self.set_input_defaults("battery_voltage", 22.2, units="V")
-
-
-if __name__ == "__main__":
-    prob = om.Problem()
-    prob.model = BatteryTest()
-    prob.setup()
-
-    prob.run_model()
-
-    print("\n=== OpenConcept Battery Sanity Check ===")
-    print(f"Battery Energy (Wh): {prob.get_val('battery_energy')[0]:.2f}")
-    print(f"Battery Mass (kg): {prob.get_val('battery_weight')[0]:.3f}")
+"""
+Minimal OpenConcept battery sizing test.
+This replaces manual battery mass estimation.
+"""
+
+import numpy as np
+import openmdao.api as om
+from openconcept.energy_storage.battery import Battery, SOCBattery
+
+from mission_simulator import simulate_mission
+from battery_sizing import USABLE_FRACTION
+
+
+class BatteryTest(om.Group):
+    def setup(self):
+
+        self.add_subsystem(
+            "battery",
+            Battery(
+                num_nodes=1,
+                efficiency=0.97,
+                specific_energy=200.0  # Wh/kg (LiPo)
+            ),
+            promotes=["*"]
+        )
+
+        self.set_input_defaults("battery_energy", 35.0, units="W*h")
+        self.set_input_defaults("battery_voltage", 22.2, units="V")
+
+
+# ==================================================
+# MISSION-LEVEL (MULTI-NODE) ANALYSIS
+# ==================================================
+
+class MissionBattery(om.Group):
+    """
+    OpenConcept SOCBattery over num_nodes mission points: integrates the
+    nodal electrical load into state of charge (Simpson's rule, so
+    num_nodes must be odd) and reports the nodal sizing margin.
+    """
+
+    def initialize(self):
+        self.options.declare("num_nodes", default=3)
+        self.options.declare("efficiency", default=0.97)
+        self.options.declare("specific_energy", default=200.0)  # Wh/kg
+        self.options.declare("specific_power", default=5000.0)  # W/kg
+
+    def setup(self):
+        self.add_subsystem(
+            "battery",
+            SOCBattery(
+                num_nodes=self.options["num_nodes"],
+                efficiency=self.options["efficiency"],
+                specific_energy=self.options["specific_energy"],
+                specific_power=self.options["specific_power"]
+            ),
+            promotes=["*"]
+        )
+
+        self.set_input_defaults("battery_weight", 0.175, units="kg")
+        self.set_input_defaults("SOC_initial", 1.0)
+
+
+class BatteryMissionAnalysis:
+    """
+    Sets up one multi-node Problem for the whole mission and reuses it.
+
+    The simulated mission power profile (mission_simulator, V * I) is
+    sampled onto an odd, uniform node grid over the mission duration and
+    fed to SOCBattery's elec_load once. Between runs only battery_weight
+    changes through set_val, which skips the setup cost for every trade.
+
+    Every run reads the model's nodal outputs back: SOC (integrated by
+    SOCBattery) and component_sizing_margin (load / rated power). A pack
+    is feasible when SOC stays above 1 - USABLE_FRACTION and the margin
+    stays at or below 1. SOCBattery has no voltage dependence; the
+    voltage is carried through to the results for the trade table only.
+    """
+
+    def __init__(self, segments=None, dt=1.0, **battery_options):
+        kwargs = {} if segments is None else {"segments": segments}
+        mission = simulate_mission(dt=dt, return_series=True, **kwargs)
+
+        self.duration_s = float(mission["duration_s"])
+        self.num_nodes = 2 * int(np.ceil(self.duration_s / (2.0 * dt))) + 1
+        self.time_s = np.linspace(0.0, self.duration_s, self.num_nodes)
+
+        # Step profile: each node takes the value of the step it falls in
+        step = np.searchsorted(mission["time_s"], self.time_s, side="right") - 1
+        step = np.clip(step, 0, len(mission["time_s"]) - 1)
+        self.power_W = (mission["voltage_V"] * mission["current_A"])[step]
+
+        self.specific_energy = battery_options.get("specific_energy", 200.0)
+
+        self.prob = om.Problem()
+        self.prob.model = MissionBattery(
+            num_nodes=self.num_nodes, **battery_options
+        )
+        self.prob.setup()
+
+        self.prob.set_val("duration", self.duration_s, units="s")
+        self.prob.set_val("elec_load", self.power_W, units="W")
+
+    def run(self, battery_energy_Wh, battery_voltage_V):
+        battery_mass_kg = float(battery_energy_Wh) / self.specific_energy
+
+        self.prob.set_val("battery_weight", battery_mass_kg, units="kg")
+        self.prob.run_model()
+
+        soc = self.prob.get_val("SOC").copy()
+        margin = self.prob.get_val("component_sizing_margin").copy()
+
+        result = {
+            "battery_energy_Wh": float(battery_energy_Wh),
+            "battery_voltage_V": float(battery_voltage_V),
+            "battery_mass_kg": battery_mass_kg,
+            "max_energy_Wh": float(self.prob.get_val("max_energy", units="W*h")[0]),
+            "soc": soc,
+            "min_soc": float(soc.min()),
+            "soc_ok": bool(soc.min() >= 1.0 - USABLE_FRACTION),
+            "sizing_margin": margin,
+            "max_sizing_margin": float(margin.max()),
+            "margin_ok": bool(margin.max() <= 1.0),
+        }
+        result["feasible"] = result["soc_ok"] and result["margin_ok"]
+
+        return result
+
+    def run_trades(self, energies_Wh, voltages_V):
+        """
+        Runs every (energy, voltage) pair on the already set-up Problem.
+        """
+        energies_Wh, voltages_V = np.broadcast_arrays(energies_Wh, voltages_V)
+        return [
+            self.run(e, v)
+            for e, v in zip(energies_Wh.ravel(), voltages_V.ravel())
+        ]
+
+
+if __name__ == "__main__":
+    prob = om.Problem()
+    prob.model = BatteryTest()
+    prob.setup()
+
+    prob.run_model()
+
+    print("\n=== OpenConcept Battery Sanity Check ===")
+    print(f"Battery Energy (Wh): {prob.get_val('battery_energy')[0]:.2f}")
+    print(f"Battery Mass (kg): {prob.get_val('battery_weight')[0]:.3f}")
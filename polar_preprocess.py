@@ -0,0 +1,219 @@
+"""
+Offline polar preprocessing.
+
+Reads every {airfoil}_{Re_k}.csv polar in the polar directory in
+parallel, fits the 2D features for all polars at once with masked
+least squares, flags poor or unreliable fits and writes a validated
+feature table (polar_features.csv). airfoil_2d loads that table at
+startup, so the MDO run never fits polars itself.
+
+Usage:
+    python -m aero.polar_preprocess [--polar-dir DIR] [--out CSV] [--workers N] [--strict]
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from aero.airfoil_2d import DATA_DIR, FEATURES
+
+POLAR_NAME = re.compile(r"^(?P<airfoil>.+)_(?P<re_k>\d+)\.csv$")
+
+FEATURE_TABLE_NAME = "polar_features.csv"
+
+MIN_POINTS = 8           # valid (alpha, cl, cd) rows per polar
+MIN_LIFT_POINTS = 3      # points in the linear lift window
+MIN_R2_LIFT = 0.95
+MIN_R2_DRAG = 0.80
+MAX_ABS_CL_AT_CD0 = 0.1  # Cd0 taken further from Cl = 0 is unreliable
+
+# Flags that make a fit unusable (the rest are informational)
+CRITICAL_FLAGS = ("sparse", "poor_lift_fit", "negative_k", "non_finite")
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+
+def find_polars(polar_dir):
+    polars = []
+    for name in sorted(os.listdir(polar_dir)):
+        m = POLAR_NAME.match(name)
+        if m and name != FEATURE_TABLE_NAME:
+            polars.append((m["airfoil"], int(m["re_k"]), os.path.join(polar_dir, name)))
+    return polars
+
+
+def _load_polar(path):
+    df = pd.read_csv(path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    df = df[["alpha", "cl", "cd"]].apply(pd.to_numeric, errors="coerce")
+    df = df.dropna().sort_values("alpha")
+    return df.values.T
+
+
+def _pad(arrays):
+    n = max((len(a[0]) for a in arrays), default=0)
+    out = np.full((3, len(arrays), max(n, 1)), np.nan)
+    for i, (alpha, cl, cd) in enumerate(arrays):
+        out[0, i, :len(alpha)] = alpha
+        out[1, i, :len(cl)] = cl
+        out[2, i, :len(cd)] = cd
+    return out
+
+
+# -------------------------------
+# Vectorised fitting
+# -------------------------------
+
+def _masked_linfit(x, y, mask):
+    """
+    Least-squares y = m x + b per row over masked entries.
+    Returns slope, intercept, r2, n (all (P,)).
+    """
+    w = mask.astype(float)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+
+    n = w.sum(axis=1)
+    Sx, Sy = x.sum(axis=1), y.sum(axis=1)
+    Sxx, Sxy, Syy = (x * x).sum(axis=1), (x * y).sum(axis=1), (y * y).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        den = n * Sxx - Sx**2
+        m = (n * Sxy - Sx * Sy) / den
+        b = (Sy - m * Sx) / n
+
+        ss_tot = Syy - Sy**2 / n
+        ss_res = Syy - 2 * m * Sxy - 2 * b * Sy + m**2 * Sxx + 2 * m * b * Sx + n * b**2
+        r2 = 1.0 - ss_res / ss_tot
+
+    return m, b, r2, n
+
+
+def fit_polars(alpha, cl, cd):
+    """
+    Features for P padded polars ((P, N) arrays, NaN padding).
+    Lift slope over -4..6 deg, Cd0 at Cl ≈ 0, drag polar k and Cl_max,
+    with fallbacks for sparse alpha ranges. Returns a DataFrame of features and quality columns.
+    """
+    valid = np.isfinite(alpha) & np.isfinite(cl) & np.isfinite(cd)
+    P = alpha.shape[0]
+    rows = np.arange(P)
+    flags = [[] for _ in range(P)]
+
+    n_points = valid.sum(axis=1)
+
+    # ---- Stall ----
+    cl_v = np.where(valid, cl, -np.inf)
+    i_max = np.argmax(cl_v, axis=1)
+    Cl_max = cl_v[rows, i_max]
+    last = np.maximum(n_points - 1, 0)
+
+    # ---- Linear lift region fit ----
+    lift_mask = valid & (alpha > -4) & (alpha < 6)
+    fallback = lift_mask.sum(axis=1) < MIN_LIFT_POINTS
+    pre_stall = valid & (alpha <= alpha[rows, i_max][:, None])
+    lift_mask = np.where(fallback[:, None], pre_stall, lift_mask)
+
+    Cl_alpha, b, r2_lift, n_lift = _masked_linfit(alpha, cl, lift_mask)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha_0 = -b / Cl_alpha
+
+    # ---- Cd0 at Cl ≈ 0 ----
+    abs_cl = np.where(valid, np.abs(cl), np.inf)
+    i0 = np.argmin(abs_cl, axis=1)
+    Cd0 = np.where(n_points > 0, cd[rows, i0], np.nan)
+
+    # ---- Drag polar fit ----
+    k, _, r2_drag, _ = _masked_linfit(cl**2, cd - Cd0[:, None], valid)
+
+    # ---- Quality flags ----
+    checks = {
+        "sparse": n_points < MIN_POINTS,
+        "lift_window_fallback": fallback,
+        "poor_lift_fit": ~(r2_lift >= MIN_R2_LIFT) | (n_lift < MIN_LIFT_POINTS),
+        "poor_drag_fit": ~(r2_drag >= MIN_R2_DRAG),
+        "cd0_off_zero_lift": abs_cl[rows, i0] > MAX_ABS_CL_AT_CD0,
+        "negative_k": ~(k > 0),
+        "no_stall": i_max >= last,
+    }
+
+    features = {
+        "Cl_alpha": Cl_alpha,
+        "alpha_0": alpha_0,
+        "Cd0": Cd0,
+        "k": k,
+        "Cl_max_2d": np.where(np.isfinite(Cl_max), Cl_max, np.nan),
+    }
+    checks["non_finite"] = ~np.all(
+        np.isfinite(np.column_stack([features[f] for f in FEATURES])), axis=1
+    )
+
+    for name, hit in checks.items():
+        for i in np.flatnonzero(hit):
+            flags[i].append(name)
+
+    df = pd.DataFrame(features)[list(FEATURES)]
+    df["n_points"] = n_points
+    df["n_lift"] = n_lift.astype(int)
+    df["r2_lift"] = r2_lift
+    df["r2_drag"] = r2_drag
+    df["flags"] = [";".join(f) for f in flags]
+    df["ok"] = [not any(f in CRITICAL_FLAGS for f in fl) for fl in flags]
+
+    return df
+
+
+# -------------------------------
+# Pipeline
+# -------------------------------
+
+def build_feature_table(polar_dir=DATA_DIR, workers=None):
+    polars = find_polars(polar_dir)
+    if not polars:
+        raise FileNotFoundError(f"No polar files found in {polar_dir}")
+
+    paths = [p for _, _, p in polars]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        arrays = list(pool.map(_load_polar, paths))
+
+    alpha, cl, cd = _pad(arrays)
+    table = fit_polars(alpha, cl, cd)
+
+    table.insert(0, "re_k", [re_k for _, re_k, _ in polars])
+    table.insert(0, "airfoil", [airfoil for airfoil, _, _ in polars])
+
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preprocess airfoil polars.")
+    parser.add_argument("--polar-dir", default=DATA_DIR)
+    parser.add_argument("--out", default=None,
+                        help=f"default: <polar-dir>/{FEATURE_TABLE_NAME}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--strict", action="store_true",
+                        help="exit non-zero if any fit is not ok")
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.join(args.polar_dir, FEATURE_TABLE_NAME)
+
+    table = build_feature_table(args.polar_dir, args.workers)
+    table.to_csv(out, index=False)
+
+    bad = table[~table["ok"]]
+    print(f"{len(table)} polars → {out} ({len(bad)} flagged)")
+    for _, row in table[table["flags"] != ""].iterrows():
+        print(f"  {row['airfoil']} Re={row['re_k']}k: {row['flags']}")
+
+    return 1 if args.strict and len(bad) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
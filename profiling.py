@@ -0,0 +1,186 @@
+# profiling.py
+"""
+Lightweight cross-module profiling hooks.
+
+Instrument with the @profiled decorator or the section() context
+manager. Profiling is off unless MDAO_PROFILE=1 is set (or enable() is
+called); when off, an instrumented call costs one flag check.
+
+When on, each instrumented name records call count, cumulative time,
+self time (excluding instrumented callees) and, with
+MDAO_PROFILE_MEMORY=1, net traced allocations. report() writes a
+Chrome-trace JSON (chrome://tracing, Perfetto) and prints a summary.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("MDAO_PROFILE", "0") not in ("", "0")
+TRACK_MEMORY = os.environ.get("MDAO_PROFILE_MEMORY", "0") not in ("", "0")
+TRACE_PATH = os.environ.get("MDAO_PROFILE_TRACE", "mdao_trace.json")
+
+MAX_EVENTS = 1_000_000   # trace events kept; aggregate stats are unbounded
+
+_lock = threading.Lock()
+_local = threading.local()
+_t0 = time.perf_counter()
+
+_stats = {}     # name -> {"calls", "cum_s", "self_s", "alloc_bytes"}
+_events = []
+
+
+# -------------------------------
+# Control
+# -------------------------------
+
+def enable(memory=False):
+    global ENABLED, TRACK_MEMORY
+    ENABLED = True
+    TRACK_MEMORY = TRACK_MEMORY or memory
+    if TRACK_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+if ENABLED and TRACK_MEMORY:
+    tracemalloc.start()
+
+
+# -------------------------------
+# Instrumentation
+# -------------------------------
+
+@contextmanager
+def section(name):
+    if not ENABLED:
+        yield
+        return
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    frame = [0.0]   # time spent in instrumented children
+    stack.append(frame)
+
+    track = TRACK_MEMORY and tracemalloc.is_tracing()
+    mem0 = tracemalloc.get_traced_memory()[0] if track else 0
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dur = time.perf_counter() - start
+        stack.pop()
+        if stack:
+            stack[-1][0] += dur
+
+        alloc = tracemalloc.get_traced_memory()[0] - mem0 if track else 0
+
+        with _lock:
+            s = _stats.get(name)
+            if s is None:
+                s = _stats[name] = {
+                    "calls": 0, "cum_s": 0.0, "self_s": 0.0, "alloc_bytes": 0
+                }
+            s["calls"] += 1
+            s["cum_s"] += dur
+            s["self_s"] += dur - frame[0]
+            s["alloc_bytes"] += alloc
+
+            if len(_events) < MAX_EVENTS:
+                _events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - _t0) * 1e6,
+                    "dur": dur * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"alloc_bytes": alloc} if track else {},
+                })
+
+
+def profiled(fn=None, *, name=None):
+    """
+    Decorator: @profiled or @profiled(name="...").
+    """
+    def decorate(f):
+        label = name or f"{f.__module__}.{f.__qualname__}"
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return f(*args, **kwargs)
+            with section(label):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+# -------------------------------
+# Export
+# -------------------------------
+
+def stats():
+    with _lock:
+        return {k: dict(v) for k, v in _stats.items()}
+
+
+def export_chrome_trace(path=TRACE_PATH):
+    with _lock:
+        events = list(_events)
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    return path
+
+
+def summary():
+    rows = sorted(stats().items(), key=lambda kv: kv[1]["cum_s"], reverse=True)
+
+    lines = [
+        f"{'name':<50} {'calls':>8} {'cum s':>10} {'self s':>10} "
+        f"{'ms/call':>10} {'alloc KB':>10}"
+    ]
+    for name, s in rows:
+        lines.append(
+            f"{name[-50:]:<50} {s['calls']:>8d} {s['cum_s']:>10.3f} "
+            f"{s['self_s']:>10.3f} {1e3 * s['cum_s'] / s['calls']:>10.3f} "
+            f"{s['alloc_bytes'] / 1024.0:>10.1f}"
+        )
+
+    return "\n".join(lines)
+
+
+def report(trace_path=TRACE_PATH):
+    """
+    Writes the Chrome trace and prints the summary (no-op when disabled).
+    """
+    if not ENABLED:
+        return None
+
+    export_chrome_trace(trace_path)
+
+    print("\n================ PROFILE ================")
+    print(summary())
+    print(f"\nChrome trace written to {trace_path}")
+
+    return trace_path
@@ -0,0 +1,383 @@
+# robustness.py
+"""
+Monte Carlo robustness of candidate designs.
+
+Environment (rho, V_stall, S_G, Vv) and the spar material constants
+locked in wing_spar_sizing (ws_input, mor_MPa, fos) are sampled from
+distributions and pushed through evaluate_design_batch, vectorised over
+designs x samples. Samples stream in chunks and are reduced into
+per-design histograms, so memory is bounded by
+n_designs x chunk_size regardless of the total sample count.
+
+Material scatter enters through the spar mass: the spars are sized
+with the wing module's own spar_sizing_broadcast, so the spar part of
+the wing weight follows (ws/ws0)(fos/fos0)(mor0/mor) exactly as in
+wing_spar_sizing. Nominal constants and spar positions come from the
+wing module; spar depths come from the airfoil coordinates when given.
+
+evaluate_design_batch resolves GPkit's arbitrary pass-1 wing loading
+its own way, so its TW_* (and therefore feasibility) can differ from
+evaluate_design. propagate first evaluates a few nominal designs with
+both and warns when they disagree (check_against_exact).
+
+TW_required is binned on [0, 2 TW_max]. Samples beyond the range are
+counted separately, and a percentile that lands in the overflow (or
+underflow) is reported as the range edge and flagged in
+TW_required_p95_clipped, so a clipped p95 is never silently low.
+
+Usage:
+    python robustness.py --samples 100000 --chunk 4096 --out robustness.csv
+"""
+
+import argparse
+import itertools
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import structural_surrogate.interface as structural
+from mdo_outer_loop import evaluate_design, evaluate_design_batch
+from mdo_config import (
+    GEOM_LIMITS, ENV_PARAMS, WINGSPANS, WING_CHORDS, FUSE_CHORDS,
+    SPAR_DENSITY_KG_M3, SPAR_DEPTH_FRAC
+)
+from detailed_codes import wing_code
+
+g = 9.81
+
+# ---- NOMINAL SPAR BASIS (wing_spar_sizing locked constants) ----
+_wing = wing_code()
+
+MATERIAL_NOMINAL = {
+    "ws_input": _wing.WS_INPUT,
+    "mor_MPa": _wing.MOR_MPA,
+    "fos": _wing.FOS,
+}
+SPAR_X_FRAC = (_wing.X1_FRAC, _wing.X2_FRAC)
+
+# name -> (kind, *params)
+#   normal (mean, sd) · uniform (lo, hi) · triangular (lo, mode, hi)
+#   lognormal (median, sigma) · const (value)
+DEFAULT_DISTRIBUTIONS = {
+    "rho": ("normal", 1.225, 0.03),
+    "V_stall": ("normal", 10.0, 0.5),
+    "S_G": ("normal", 30.0, 2.0),
+    "Vv": ("normal", 2.0, 0.2),
+    "ws_input": ("normal", MATERIAL_NOMINAL["ws_input"], 4.5),
+    "mor_MPa": ("lognormal", MATERIAL_NOMINAL["mor_MPa"], 0.10),
+    "fos": ("const", MATERIAL_NOMINAL["fos"]),
+}
+
+PERCENTILES = (5, 50, 95)
+N_BINS = 2048
+
+
+# -------------------------------
+# Sampling
+# -------------------------------
+
+def sample_distribution(spec, n, rng):
+    kind, *p = spec
+
+    if kind == "normal":
+        x = rng.normal(p[0], p[1], n)
+        return np.maximum(x, 1e-6 * abs(p[0]))    # physical quantities stay positive
+    if kind == "uniform":
+        return rng.uniform(p[0], p[1], n)
+    if kind == "triangular":
+        return rng.triangular(p[0], p[1], p[2], n)
+    if kind == "lognormal":
+        return p[0] * np.exp(rng.normal(0.0, p[1], n))
+    if kind == "const":
+        return np.full(n, float(p[0]))
+
+    raise ValueError(f"Unknown distribution '{kind}'")
+
+
+def spar_depth_frac(coords=None):
+    """
+    Unit-chord spar depths at SPAR_X_FRAC, from the airfoil coordinates
+    through the wing module; SPAR_DEPTH_FRAC when coords is None.
+    """
+    if coords is None:
+        return SPAR_DEPTH_FRAC
+    return tuple(float(t) for t in _wing.airfoil_thickness_at(coords, SPAR_X_FRAC))
+
+
+def spar_mass_g(
+    wingspan,
+    wing_chord,
+    *,
+    ws_input,
+    mor_MPa,
+    fos,
+    depth_frac=SPAR_DEPTH_FRAC,
+    density_kg_m3=SPAR_DENSITY_KG_M3
+):
+    """
+    Mass of the wing_spar_sizing spars, broadcast over inputs
+    (spar_sizing_broadcast in mm, then kg/m³ · mm² · mm → g).
+    """
+    span_mm = np.asarray(wingspan, dtype=float) * 1000.0
+    chord_mm = np.asarray(wing_chord, dtype=float) * 1000.0
+
+    h1, h2, b1, b2, _ = _wing.spar_sizing_broadcast(
+        chord_mm, span_mm, depth_frac[0], depth_frac[1],
+        ws_input=ws_input, mor_MPa=mor_MPa, fos=fos
+    )
+    return density_kg_m3 * (b1 * h1 + b2 * h2) * span_mm * 1e-6
+
+
+# -------------------------------
+# Streaming reduction
+# -------------------------------
+
+class _Histograms:
+    """
+    Per-row fixed-bin histograms for streamed (rows, chunk) arrays.
+
+    Values outside [lo, hi) are counted in under / over rather than
+    folded into the edge bins, so percentiles stay unbiased inside the
+    range and report when they fall outside it.
+    """
+
+    def __init__(self, n_rows, lo, hi, bins=N_BINS):
+        self.lo, self.hi, self.bins = lo, hi, bins
+        self.counts = np.zeros((n_rows, bins), dtype=np.int64)
+        self.under = np.zeros(n_rows, dtype=np.int64)
+        self.over = np.zeros(n_rows, dtype=np.int64)
+        self.total = np.zeros(n_rows)
+        self.n = 0
+
+    def add(self, values):
+        rows, cols = values.shape
+        idx = np.floor((values - self.lo) / (self.hi - self.lo) * self.bins).astype(np.int64)
+
+        self.under += (idx < 0).sum(axis=1)
+        self.over += (idx >= self.bins).sum(axis=1)
+
+        inside = (idx >= 0) & (idx < self.bins)
+        flat = (idx + self.bins * np.arange(rows)[:, None])[inside]
+        self.counts += np.bincount(
+            flat, minlength=rows * self.bins
+        ).reshape(rows, self.bins)
+
+        self.total += values.sum(axis=1)
+        self.n += cols
+
+    def mean(self):
+        return self.total / self.n
+
+    def percentile(self, q, return_clipped=False):
+        """
+        Percentile q per row. A target in the underflow / overflow is
+        returned as lo / hi (a bound, not an estimate); return_clipped
+        also returns the boolean mask of those rows.
+        """
+        target = q / 100.0 * self.n
+        cdf = self.under[:, None] + np.cumsum(self.counts, axis=1)
+
+        low = target <= self.under
+        high = target > cdf[:, -1]
+
+        b = np.argmax(cdf >= target, axis=1)
+        rows = np.arange(len(b))
+
+        below = np.where(b > 0, cdf[rows, np.maximum(b - 1, 0)], self.under)
+        inside = self.counts[rows, b]
+        frac = np.where(inside > 0, (target - below) / np.maximum(inside, 1), 0.0)
+
+        width = (self.hi - self.lo) / self.bins
+        value = self.lo + (b + frac) * width
+        value = np.where(low, self.lo, np.where(high, self.hi, value))
+
+        if return_clipped:
+            return value, low | high
+        return value
+
+
+# -------------------------------
+# Batch vs exact check
+# -------------------------------
+
+def check_against_exact(designs, *, geom_limits, env_params, n_check=8, seed=0, rtol=0.02):
+    """
+    Nominal evaluate_design_batch vs evaluate_design on up to n_check
+    designs. Warns when feasibility or TW_required (beyond rtol) differ.
+    Returns one row per checked design.
+    """
+    designs = np.atleast_2d(np.asarray(designs, dtype=float))
+    rng = np.random.default_rng(seed)
+    pick = np.sort(rng.choice(len(designs), min(n_check, len(designs)), replace=False))
+    sub = designs[pick]
+
+    batch = evaluate_design_batch(
+        wingspan=sub[:, 0], wing_chord=sub[:, 1], fuse_chord=sub[:, 2],
+        geom_limits=geom_limits, env_params=env_params
+    )
+
+    rows = []
+    for i, (b, c, fc) in enumerate(sub):
+        try:
+            exact = evaluate_design(
+                geometry=(b, c, fc, 1.0), geom_limits=geom_limits, env_params=env_params
+            )
+        except Exception:
+            exact = {"feasible": False, "TW_required": np.nan}
+
+        rows.append({
+            "wingspan": b, "wing_chord": c, "fuse_chord": fc,
+            "feasible_batch": bool(batch["feasible"][i]),
+            "feasible_exact": bool(exact["feasible"]),
+            "TW_required_batch": float(batch["TW_required"][i]),
+            "TW_required_exact": float(exact["TW_required"]),
+        })
+    table = pd.DataFrame(rows)
+
+    feas_diff = int((table["feasible_batch"] != table["feasible_exact"]).sum())
+    tw_rel = (
+        (table["TW_required_batch"] - table["TW_required_exact"]).abs()
+        / table["TW_required_exact"].abs().clip(lower=1e-12)
+    )
+    tw_diff = int((tw_rel > rtol).sum())
+
+    if feas_diff or tw_diff:
+        warnings.warn(
+            f"evaluate_design_batch disagrees with evaluate_design on "
+            f"{len(table)} nominal designs: feasibility differs on {feas_diff}, "
+            f"TW_required by more than {rtol:.0%} on {tw_diff}. p_feasible and "
+            "the TW_required percentiles describe the batch model's pass-1 "
+            "wing loading, not the sweep's."
+        )
+
+    return table
+
+
+# -------------------------------
+# Propagation
+# -------------------------------
+
+def propagate(
+    designs,
+    n_samples=10000,
+    distributions=None,
+    *,
+    geom_limits=GEOM_LIMITS,
+    env_params=ENV_PARAMS,
+    chunk_size=4096,
+    seed=0,
+    percentiles=PERCENTILES,
+    airfoil_coords=None,
+    check_exact=8
+):
+    """
+    designs        : (m, 3) array of (wingspan, wing_chord, fuse_chord)
+    airfoil_coords : wing airfoil (Nx2) for the spar depths; None uses
+                     SPAR_DEPTH_FRAC
+    check_exact    : nominal designs compared against evaluate_design
+                     before sampling (check_against_exact); 0 skips it
+
+    Infeasible samples count as zero payload, so payload percentiles
+    are deliverable payload. Returns one row per design.
+    """
+    distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    rng = np.random.default_rng(seed)
+
+    designs = np.atleast_2d(np.asarray(designs, dtype=float))
+    m = len(designs)
+
+    if check_exact:
+        check_against_exact(
+            designs, geom_limits=geom_limits, env_params=env_params,
+            n_check=check_exact, seed=seed
+        )
+    b, c, fc = (designs[:, i:i + 1] for i in range(3))   # (m, 1) → broadcast vs samples
+
+    depth_frac = spar_depth_frac(airfoil_coords)
+    spar_nominal = spar_mass_g(b, c, depth_frac=depth_frac, **MATERIAL_NOMINAL)
+
+    W_max_N = geom_limits["W_max"] * g
+    TW_max = geom_limits.get("TW_max", 7.0)
+
+    payload_hist = _Histograms(m, 0.0, W_max_N)
+    tw_hist = _Histograms(m, 0.0, 2.0 * TW_max)
+    n_feasible = np.zeros(m, dtype=np.int64)
+
+    for start in range(0, n_samples, chunk_size):
+        n = min(chunk_size, n_samples - start)
+        s = {name: sample_distribution(spec, n, rng)[None, :]
+             for name, spec in distributions.items()}
+
+        env = {**env_params, **{k: s[k] for k in ("rho", "V_stall", "S_G", "Vv") if k in s}}
+
+        material = {k: s.get(k, v) for k, v in MATERIAL_NOMINAL.items()}
+        spar_delta_g = spar_mass_g(b, c, depth_frac=depth_frac, **material) - spar_nominal
+
+        res = evaluate_design_batch(
+            wingspan=b,
+            wing_chord=c,
+            fuse_chord=fc,
+            geom_limits=geom_limits,
+            env_params=env,
+            W_struct_delta_g=spar_delta_g
+        )
+
+        feasible = np.broadcast_to(res["feasible"], (m, n))
+        payload = np.where(feasible, np.broadcast_to(res["payload_N"], (m, n)), 0.0)
+
+        n_feasible += feasible.sum(axis=1)
+        payload_hist.add(payload)
+        tw_hist.add(np.broadcast_to(res["TW_required"], (m, n)))
+
+    out = pd.DataFrame({
+        "wingspan": designs[:, 0],
+        "wing_chord": designs[:, 1],
+        "fuse_chord": designs[:, 2],
+        "p_feasible": n_feasible / n_samples,
+        "payload_mean_N": payload_hist.mean(),
+    })
+    for q in percentiles:
+        out[f"payload_p{q}_N"] = payload_hist.percentile(q)
+    out["TW_required_p95"], out["TW_required_p95_clipped"] = tw_hist.percentile(
+        95, return_clipped=True
+    )
+    out["TW_required_overflow"] = tw_hist.over / n_samples
+    out["n_samples"] = n_samples
+
+    return out.sort_values(
+        ["p_feasible", f"payload_p{percentiles[0]}_N"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo robustness of the design grid")
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--chunk", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--airfoil", default=None, help="wing airfoil coordinates (x y)")
+    parser.add_argument("--check-exact", type=int, default=8, metavar="N",
+                        help="nominal designs checked against evaluate_design (0: skip)")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    structural.initialize_structural_surrogates()
+
+    designs = np.array(list(itertools.product(WINGSPANS, WING_CHORDS, FUSE_CHORDS)))
+
+    table = propagate(
+        designs, args.samples, chunk_size=args.chunk, seed=args.seed,
+        airfoil_coords=None if args.airfoil is None else np.loadtxt(args.airfoil),
+        check_exact=args.check_exact
+    )
+
+    print("\n================ ROBUSTNESS ================")
+    print(table.head(15).round(4).to_string(index=False))
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,18 @@
 
 from mdo_outer_loop import evaluate_design
 from structural_surrogate.interface import initialize_structural_surrogates
-import numpy as np
+from grid_search import branch_and_bound_search
+from mdo_config import (
+    WINGSPANS, WING_CHORDS, FUSE_CHORDS, TAPERS, GEOM_LIMITS, ENV_PARAMS
+)
+import argparse
+import profiling
 
 
-def main():
+def main(profile=False, search="grid"):
+
+    if profile:
+        profiling.enable()
 
     # -----------------------------
     # INITIALIZE STRUCTURAL MODELS
@@ -13,62 +21,72 @@ def main():
     initialize_structural_surrogates()
 
     # -----------------------------
-    # GEOMETRY DESIGN SPACE
+    # GEOMETRY DESIGN SPACE / CONSTANT DATA (mdo_config)
     # -----------------------------
-    wingspans = np.linspace(0.8, 1.3, 5)
-    wing_chords = np.linspace(0.15, 0.20, 5)
-    fuse_chords = np.linspace(0.28, 0.32, 5)
-    tapers = np.linspace(1.0, 1.0, 5)
+    wingspans = WINGSPANS
+    wing_chords = WING_CHORDS
+    fuse_chords = FUSE_CHORDS
+    tapers = TAPERS
 
-    # -----------------------------
-    # CONSTANT DATA
-    # -----------------------------
-    geom_limits = {
-        "W_max": 1.5875,          # kg
-        "WS_max": 200.0,          # N/m^2
-        "S_max": 0.3,             # m^2
-        "TW_max": 5.0,
-        "k": 0.045,
-        "airfoil_wing": "s1223",
-        "airfoil_fuse": "e858"
-    }
-
-    env_params = {
-        "rho": 1.225,
-        "S_G": 30.0,
-        "V_stall": 10.0,
-        "Vv": 2.0,
-        "mu": 1.81e-5
-    }
+    geom_limits = dict(GEOM_LIMITS)
+    env_params = dict(ENV_PARAMS)
 
     best = None
 
     # -----------------------------
     # GEOMETRY SEARCH
     # -----------------------------
-    for b in wingspans:
-        for c in wing_chords:
-            for fc in fuse_chords:
-                for t in tapers:
-
-                    geometry = (b, c, fc, t)
-
-                    res = evaluate_design(
-                        geometry=geometry,
-                        geom_limits=geom_limits,
-                        env_params=env_params
-                    )
-
-                    if not res["feasible"]:
-                        continue
-
-                    if best is None or res["payload_N"] > best["payload_N"]:
-                        best = res
-                        print("New best:", best)
+    if search == "bnb":
+        out = branch_and_bound_search(
+            (wingspans, wing_chords, fuse_chords, tapers),
+            geom_limits=geom_limits,
+            env_params=env_params,
+            verbose=True
+        )
+        best = out["best"]
+
+        print(
+            f"\nBranch-and-bound: {out['n_evaluated']} / {out['n_total']} designs evaluated "
+            f"({out['n_pruned_bound']} bounded, {out['n_pruned_infeasible']} infeasible); "
+            f"monotone structure={out['structure_monotone']} payload={out['payload_monotone']}"
+        )
+
+    else:
+        for b in wingspans:
+            for c in wing_chords:
+                for fc in fuse_chords:
+                    for t in tapers:
+
+                        geometry = (b, c, fc, t)
+
+                        res = evaluate_design(
+                            geometry=geometry,
+                            geom_limits=geom_limits,
+                            env_params=env_params
+                        )
+
+                        if not res["feasible"]:
+                            continue
+
+                        if best is None or res["payload_N"] > best["payload_N"]:
+                            best = res
+                            print("New best:", best)
 
     print("\n================ FINAL BEST ================")
     print(best)
 
+    # -----------------------------
+    # PROFILE (MDAO_PROFILE=1 or --profile)
+    # -----------------------------
+    profiling.report()
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", action="store_true",
+                        help="record timings and write a Chrome trace")
+    parser.add_argument("--search", choices=["grid", "bnb"], default="grid",
+                        help="exhaustive grid or branch-and-bound")
+    args = parser.parse_args()
+
+    main(profile=args.profile, search=args.search)
@@ -0,0 +1,418 @@
+# sensitivity.py
+"""
+Global sensitivity analysis of the design evaluation.
+
+Sobol : Saltelli sample matrices (A, B and the d column-swapped AB_i),
+        first-order and total indices with the Jansen estimators.
+Morris: r one-at-a-time trajectories on a p-level grid, elementary
+        effects summarised as mu, mu* and sigma.
+
+Both report bootstrap confidence intervals. By default samples go
+through the exact GPkit evaluate_design in a process pool ("parallel"),
+so the indices explain the model the sweeps use. evaluate_design_batch
+("batch", tens of thousands of samples in seconds) matches it on
+payload but resolves GPkit's arbitrary pass-1 wing loading differently,
+so its TW_* indices describe a different model; compare_evaluators()
+measures the gap on a sample before relying on it.
+
+Usage:
+    python sensitivity.py --method sobol --n 1024 --out sobol.csv
+    python sensitivity.py --check-batch 64
+"""
+
+import argparse
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+import structural_surrogate.interface as structural
+from mdo_outer_loop import evaluate_design, evaluate_design_batch
+from mdo_config import GEOM_LIMITS, ENV_PARAMS
+
+GEOMETRY = ("wingspan", "wing_chord", "fuse_chord")
+ENV = ("rho", "mu", "S_G", "V_stall", "Vv")
+
+BASE_GEOMETRY = {"wingspan": 1.05, "wing_chord": 0.175, "fuse_chord": 0.30}
+
+# factor -> (lo, hi); geometry, env_params or geom_limits keys
+DEFAULT_FACTORS = {
+    "wingspan": (0.8, 1.3),
+    "wing_chord": (0.15, 0.20),
+    "fuse_chord": (0.28, 0.32),
+    "rho": (1.10, 1.25),
+    "V_stall": (8.0, 12.0),
+    "S_G": (20.0, 40.0),
+    "Vv": (1.5, 2.5),
+    "k": (0.035, 0.055),
+    "W_max": (1.4, 1.8),
+}
+
+OUTPUTS = ("payload_N", "TW_required")
+
+
+# -------------------------------
+# Sampling
+# -------------------------------
+
+def _scale(U, bounds):
+    lo = np.array([b[0] for b in bounds])
+    hi = np.array([b[1] for b in bounds])
+    return lo + U * (hi - lo)
+
+
+def saltelli_matrices(bounds, n, seed=0):
+    """
+    Returns A, B (n, d) and AB (d, n, d) with AB[i] = A except column i
+    taken from B. n should be a power of two for the Sobol sequence.
+    """
+    d = len(bounds)
+    U = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random(n)
+
+    A = _scale(U[:, :d], bounds)
+    B = _scale(U[:, d:], bounds)
+
+    AB = np.repeat(A[None], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+
+    return A, B, AB
+
+
+def morris_trajectories(bounds, r, levels=4, seed=0):
+    """
+    r trajectories of d + 1 points each, moving one factor per step by
+    delta = p / (2 (p - 1)) on the unit scale. Returns (r, d + 1, d).
+    """
+    rng = np.random.default_rng(seed)
+    d = len(bounds)
+    delta = levels / (2.0 * (levels - 1))
+
+    grid = np.arange(levels // 2) / (levels - 1)   # starts that keep x ± delta in [0, 1]
+
+    U = np.empty((r, d + 1, d))
+
+    for t in range(r):
+        x = rng.choice(grid, size=d)
+        sign = rng.choice([-1.0, 1.0], size=d)
+        x = np.where(sign < 0, x + delta, x)
+
+        U[t, 0] = x
+        for j, i in enumerate(rng.permutation(d)):
+            x = x.copy()
+            x[i] += sign[i] * delta
+            U[t, j + 1] = x
+
+    return _scale(U, bounds)
+
+
+# -------------------------------
+# Evaluation
+# -------------------------------
+
+def _split(names, X):
+    """
+    Maps factor columns onto (geometry, geom_limits, env_params).
+    """
+    geometry = dict(BASE_GEOMETRY)
+    geom_limits = dict(GEOM_LIMITS)
+    env_params = dict(ENV_PARAMS)
+
+    for j, name in enumerate(names):
+        col = X[:, j]
+        if name in GEOMETRY:
+            geometry[name] = col
+        elif name in ENV:
+            env_params[name] = col
+        else:
+            geom_limits[name] = col
+
+    return geometry, geom_limits, env_params
+
+
+def _evaluate_batch(names, X, outputs):
+    geometry, geom_limits, env_params = _split(names, X)
+    res = evaluate_design_batch(
+        **geometry, geom_limits=geom_limits, env_params=env_params
+    )
+    return np.column_stack([
+        np.broadcast_to(res[o], (len(X),)) for o in outputs
+    ])
+
+
+def _init_worker(csv_path, combined):
+    structural.initialize_structural_surrogates(combined=combined, csv_path=csv_path)
+
+
+def _evaluate_exact(args):
+    names, X, outputs = args
+    geometry, geom_limits, env_params = _split(names, X)
+
+    Y = np.full((len(X), len(outputs)), np.nan)
+    for n in range(len(X)):
+        pick = lambda d: {k: (v[n] if isinstance(v, np.ndarray) else v) for k, v in d.items()}
+        g = pick(geometry)
+        try:
+            res = evaluate_design(
+                geometry=(g["wingspan"], g["wing_chord"], g["fuse_chord"], 1.0),
+                geom_limits=pick(geom_limits),
+                env_params=pick(env_params)
+            )
+        except Exception:
+            continue
+        Y[n] = [res[o] for o in outputs]
+
+    return Y
+
+
+def evaluate_samples(
+    names,
+    X,
+    outputs=OUTPUTS,
+    evaluator="parallel",
+    chunk_size=16384,
+    max_workers=None,
+    csv_path=None,
+    combined=False
+):
+    """
+    Evaluates an (n, d) sample matrix; returns (n, len(outputs)).
+    Failed exact evaluations come back as NaN. Exact chunks default to
+    a size that keeps every worker busy.
+    """
+    X = np.atleast_2d(X)
+
+    if evaluator == "batch":
+        chunks = [X[i:i + chunk_size] for i in range(0, len(X), chunk_size)]
+        return np.vstack([_evaluate_batch(names, c, outputs) for c in chunks])
+
+    if evaluator != "parallel":
+        raise ValueError(f"Unknown evaluator '{evaluator}'")
+
+    exact_chunk = min(chunk_size, max(1, len(X) // (4 * (max_workers or os.cpu_count() or 1))))
+    chunks = [X[i:i + exact_chunk] for i in range(0, len(X), exact_chunk)]
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(csv_path, combined)
+    ) as pool:
+        return np.vstack(list(pool.map(
+            _evaluate_exact, [(names, c, outputs) for c in chunks]
+        )))
+
+
+def compare_evaluators(names, X, outputs=OUTPUTS, **eval_kw):
+    """
+    Batch vs exact evaluation of the same samples. Returns a DataFrame
+    (one row per output): max / mean absolute and relative difference
+    over the samples both evaluators could evaluate.
+    """
+    Y_batch = evaluate_samples(names, X, outputs, "batch")
+    Y_exact = evaluate_samples(names, X, outputs, "parallel", **eval_kw)
+
+    ok = np.all(np.isfinite(Y_exact), axis=1)
+    diff = np.abs(Y_batch[ok] - Y_exact[ok])
+    rel = diff / np.maximum(np.abs(Y_exact[ok]), 1e-12)
+
+    return pd.DataFrame({
+        "max_abs": diff.max(axis=0),
+        "mean_abs": diff.mean(axis=0),
+        "max_rel": rel.max(axis=0),
+        "mean_rel": rel.mean(axis=0),
+        "n": int(ok.sum()),
+    }, index=pd.Index(list(outputs), name="output"))
+
+
+# -------------------------------
+# Indices
+# -------------------------------
+
+def _jansen(fA, fB, fABi):
+    V = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)
+    S1 = 1.0 - 0.5 * np.mean((fB - fABi)**2, axis=-1) / V
+    ST = 0.5 * np.mean((fA - fABi)**2, axis=-1) / V
+    return S1, ST
+
+
+def sobol_indices(fA, fB, fAB, n_boot=200, conf=0.95, seed=0):
+    """
+    fA, fB : (n,) outputs at A and B
+    fAB    : (d, n) outputs at each AB_i
+    Returns DataFrame (one row per factor): S1, ST and CI bounds.
+    """
+    rng = np.random.default_rng(seed)
+    lo_q, hi_q = 50 * (1 - conf), 50 * (1 + conf)
+
+    rows = []
+    for fABi in fAB:
+        ok = np.isfinite(fA) & np.isfinite(fB) & np.isfinite(fABi)
+        a, b, ab = fA[ok], fB[ok], fABi[ok]
+
+        S1, ST = _jansen(a, b, ab)
+
+        idx = rng.integers(0, len(a), size=(n_boot, len(a)))
+        S1_b, ST_b = _jansen(a[idx], b[idx], ab[idx])
+
+        rows.append({
+            "S1": S1,
+            "S1_lo": np.percentile(S1_b, lo_q),
+            "S1_hi": np.percentile(S1_b, hi_q),
+            "ST": ST,
+            "ST_lo": np.percentile(ST_b, lo_q),
+            "ST_hi": np.percentile(ST_b, hi_q),
+            "n": int(ok.sum()),
+        })
+
+    return pd.DataFrame(rows)
+
+
+def morris_indices(X, Y, bounds, n_boot=200, conf=0.95, seed=0):
+    """
+    X : (r, d + 1, d) trajectories, Y : (r, d + 1) outputs
+    Elementary effects are per unit-scale step.
+    Returns DataFrame (one row per factor): mu, mu_star, sigma and a
+    CI on mu_star.
+    """
+    rng = np.random.default_rng(seed)
+    lo_q, hi_q = 50 * (1 - conf), 50 * (1 + conf)
+
+    span = np.array([hi - lo for lo, hi in bounds])
+    dU = np.diff(X, axis=1) / span                     # (r, d, d)
+    moved = np.argmax(np.abs(dU), axis=2)              # (r, d) factor per step
+    step = np.take_along_axis(dU, moved[..., None], axis=2)[..., 0]
+
+    r, d = moved.shape
+    EE = np.full((r, d), np.nan)
+    np.put_along_axis(EE, moved, np.diff(Y, axis=1) / step, axis=1)
+
+    rows = []
+    for i in range(d):
+        e = EE[:, i][np.isfinite(EE[:, i])]
+        idx = rng.integers(0, len(e), size=(n_boot, len(e)))
+        boot = np.mean(np.abs(e[idx]), axis=1)
+        rows.append({
+            "mu": e.mean(),
+            "mu_star": np.abs(e).mean(),
+            "mu_star_lo": np.percentile(boot, lo_q),
+            "mu_star_hi": np.percentile(boot, hi_q),
+            "sigma": e.std(ddof=1) if len(e) > 1 else 0.0,
+            "n": len(e),
+        })
+
+    return pd.DataFrame(rows)
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+
+def run_sensitivity(
+    method="sobol",
+    factors=None,
+    n=1024,
+    outputs=OUTPUTS,
+    evaluator="parallel",
+    n_boot=200,
+    conf=0.95,
+    seed=0,
+    levels=4,
+    **eval_kw
+):
+    """
+    method  : "sobol" (n(d + 2) evaluations) or "morris" (n trajectories,
+              n(d + 1) evaluations)
+    factors : {name: (lo, hi)}, defaults to DEFAULT_FACTORS
+    evaluator : "parallel" (exact, default) or "batch" (see module doc)
+
+    Returns {output: DataFrame indexed by factor}.
+    """
+    if evaluator == "batch" and any(o.startswith("TW") for o in outputs):
+        warnings.warn(
+            "TW_* indices from the batch evaluator describe its own pass-1 "
+            "wing loading, not evaluate_design's; see compare_evaluators()."
+        )
+
+    factors = factors or DEFAULT_FACTORS
+    names = list(factors)
+    bounds = [factors[k] for k in names]
+    d = len(names)
+
+    if method == "sobol":
+        A, B, AB = saltelli_matrices(bounds, n, seed=seed)
+        Y = evaluate_samples(
+            names, np.vstack([A, B, AB.reshape(-1, d)]), outputs, evaluator, **eval_kw
+        )
+        fA, fB, fAB = Y[:n], Y[n:2 * n], Y[2 * n:].reshape(d, n, -1)
+
+        tables = {
+            o: sobol_indices(fA[:, j], fB[:, j], fAB[:, :, j], n_boot, conf, seed)
+            for j, o in enumerate(outputs)
+        }
+
+    elif method == "morris":
+        X = morris_trajectories(bounds, n, levels=levels, seed=seed)
+        Y = evaluate_samples(
+            names, X.reshape(-1, d), outputs, evaluator, **eval_kw
+        ).reshape(n, d + 1, -1)
+
+        tables = {
+            o: morris_indices(X, Y[:, :, j], bounds, n_boot, conf, seed)
+            for j, o in enumerate(outputs)
+        }
+
+    else:
+        raise ValueError(f"Unknown method '{method}'")
+
+    for table in tables.values():
+        table.index = pd.Index(names, name="factor")
+
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sobol / Morris sensitivity of the design evaluation")
+    parser.add_argument("--method", choices=["sobol", "morris"], default="sobol")
+    parser.add_argument("--n", type=int, default=1024,
+                        help="base samples (sobol) or trajectories (morris)")
+    parser.add_argument("--evaluator", choices=["batch", "parallel"], default="parallel")
+    parser.add_argument("--check-batch", type=int, default=0, metavar="N",
+                        help="only compare batch vs exact on N random samples")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--n-boot", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="CSV with all indices")
+    args = parser.parse_args()
+
+    structural.initialize_structural_surrogates()
+
+    if args.check_batch:
+        names = list(DEFAULT_FACTORS)
+        U = np.random.default_rng(args.seed).random((args.check_batch, len(names)))
+        X = _scale(U, [DEFAULT_FACTORS[k] for k in names])
+        print(compare_evaluators(names, X, max_workers=args.workers).to_string())
+        return
+
+    tables = run_sensitivity(
+        method=args.method,
+        n=args.n,
+        evaluator=args.evaluator,
+        n_boot=args.n_boot,
+        seed=args.seed,
+        max_workers=args.workers
+    )
+
+    for output, table in tables.items():
+        print(f"\n================ {output} ({args.method}) ================")
+        print(table.round(4).to_string())
+
+    if args.out:
+        pd.concat(tables, names=["output"]).to_csv(args.out)
+        print(f"\nIndices written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# spar_trade_study.py
+"""
+Material / safety-factor / spar-position trade study for the wing spars.
+
+Evaluates wing_spar_sizing over the full cartesian product
+
+    aircraft rows × materials × safety factors × x1 × x2 × wing loadings
+
+as one broadcast computation (spar_sizing_broadcast), in row chunks so
+peak memory stays near the float32 outputs. Results are written as a
+columnar .npz: one float32 array per output in C order over the axes
+above, plus the axis values, so 10^7 combinations take ~120 MB.
+
+Usage:
+    python spar_trade_study.py dims.csv airfoil.dat --out trade.npz
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from detailed_codes import wing_code
+
+AXES = ("row", "material", "fos", "x1_frac", "x2_frac", "ws_input")
+OUTPUTS = ("b1_mm", "b2_mm", "spar_mass_g")
+
+# name -> (MOR [MPa], density [kg/m³])
+DEFAULT_MATERIALS = {
+    "balsa_light": (12.0, 110.0),
+    "balsa_medium": (20.0, 140.0),
+    "basswood": (50.0, 420.0),
+    "spruce": (65.0, 450.0),
+    "plywood_aircraft": (70.0, 650.0),
+}
+
+DEFAULT_FOS = (1.5, 2.0, 2.5, 3.0)
+DEFAULT_X1 = (0.15, 0.20, 0.25, 0.30)
+DEFAULT_X2 = (0.55, 0.60, 0.65, 0.70)
+
+
+def run_trade_study(
+    dimensions,
+    coords,
+    *,
+    materials=None,
+    fos_values=DEFAULT_FOS,
+    x1_fracs=DEFAULT_X1,
+    x2_fracs=DEFAULT_X2,
+    ws_values=None,
+    out_path=None,
+    chunk_rows=None,
+    max_chunk_elements=2_000_000
+):
+    """
+    dimensions : DataFrame with wing_rib_chord_mm, wing_span_mm
+                 (and aircraft_id if available)
+    coords     : airfoil coordinates (Nx2)
+    materials  : {name: (mor_MPa, density_kg_m3)}
+
+    Returns dict of flat float32 outputs, axis values and shape.
+    """
+    wing = wing_code()
+
+    materials = materials or DEFAULT_MATERIALS
+    ws_values = ws_values if ws_values is not None else (wing.WS_INPUT,)
+
+    chord = dimensions["wing_rib_chord_mm"].to_numpy(dtype=float)
+    span = dimensions["wing_span_mm"].to_numpy(dtype=float)
+
+    names = list(materials)
+    mor = np.array([materials[m][0] for m in names], dtype=float)
+    rho = np.array([materials[m][1] for m in names], dtype=float)
+    fos = np.asarray(fos_values, dtype=float)
+    x1 = np.asarray(x1_fracs, dtype=float)
+    x2 = np.asarray(x2_fracs, dtype=float)
+    ws = np.asarray(ws_values, dtype=float)
+
+    t1 = wing.airfoil_thickness_at(coords, x1)
+    t2 = wing.airfoil_thickness_at(coords, x2)
+
+    shape = (len(chord), len(names), len(fos), len(x1), len(x2), len(ws))
+    per_row = int(np.prod(shape[1:]))
+    n_total = len(chord) * per_row
+
+    if chunk_rows is None:
+        chunk_rows = max(1, max_chunk_elements // max(per_row, 1))
+
+    out = {k: np.empty(n_total, dtype=np.float32) for k in OUTPUTS}
+
+    # Axis views: (row, material, fos, x1, x2, ws)
+    mor_b = mor[None, :, None, None, None, None]
+    rho_b = rho[None, :, None, None, None, None]
+    fos_b = fos[None, None, :, None, None, None]
+    t1_b = t1[None, None, None, :, None, None]
+    t2_b = t2[None, None, None, None, :, None]
+    ws_b = ws[None, None, None, None, None, :]
+
+    t0 = time.perf_counter()
+    for start in range(0, len(chord), chunk_rows):
+        stop = min(start + chunk_rows, len(chord))
+        c = chord[start:stop, None, None, None, None, None]
+        s = span[start:stop, None, None, None, None, None]
+
+        h1, h2, b1, b2, _ = wing.spar_sizing_broadcast(
+            c, s, t1_b, t2_b, ws_input=ws_b, mor_MPa=mor_b, fos=fos_b
+        )
+
+        # kg/m³ · mm² · mm → g
+        mass = rho_b * (b1 * h1 + b2 * h2) * s * 1e-6
+
+        sl = slice(start * per_row, stop * per_row)
+        full = (stop - start,) + shape[1:]
+        out["b1_mm"][sl] = np.broadcast_to(b1, full).ravel()
+        out["b2_mm"][sl] = np.broadcast_to(b2, full).ravel()
+        out["spar_mass_g"][sl] = np.broadcast_to(mass, full).ravel()
+
+    result = {
+        **out,
+        "shape": np.array(shape, dtype=np.int64),
+        "aircraft_id": (
+            # Fixed-width unicode, not object: np.load(allow_pickle=False)
+            dimensions["aircraft_id"].to_numpy(dtype=str)
+            if "aircraft_id" in dimensions else np.arange(len(chord)).astype(str)
+        ),
+        "material": np.array(names),
+        "mor_MPa": mor,
+        "density_kg_m3": rho,
+        "fos": fos,
+        "x1_frac": x1,
+        "x2_frac": x2,
+        "ws_input": ws,
+        "elapsed_s": np.array(time.perf_counter() - t0),
+    }
+
+    if out_path:
+        np.savez(out_path, **result)
+
+    return result
+
+
+def load_trade_study(path, as_frame=False):
+    """
+    Loads a saved study. as_frame=True expands it into a DataFrame with
+    one row per combination (axis index columns + outputs).
+    """
+    with np.load(path, allow_pickle=False) as f:
+        data = {k: f[k] for k in f.files}
+
+    if not as_frame:
+        return data
+
+    shape = tuple(data["shape"])
+    idx = np.unravel_index(np.arange(int(np.prod(shape))), shape)
+
+    df = pd.DataFrame({
+        "aircraft_id": data["aircraft_id"][idx[0]],
+        "material": data["material"][idx[1]],
+        "fos": data["fos"][idx[2]].astype(np.float32),
+        "x1_frac": data["x1_frac"][idx[3]].astype(np.float32),
+        "x2_frac": data["x2_frac"][idx[4]].astype(np.float32),
+        "ws_input": data["ws_input"][idx[5]].astype(np.float32),
+    })
+    for k in OUTPUTS:
+        df[k] = data[k]
+
+    return df
+
+
+def lightest_per_aircraft(study):
+    """
+    Lightest combination for every aircraft row.
+    """
+    shape = tuple(study["shape"])
+    mass = study["spar_mass_g"].reshape(shape[0], -1)
+    best = np.argmin(mass, axis=1)
+    _, m, f, i1, i2, w = np.unravel_index(
+        best + np.arange(shape[0]) * mass.shape[1], shape
+    )
+
+    return pd.DataFrame({
+        "aircraft_id": study["aircraft_id"],
+        "material": study["material"][m],
+        "fos": study["fos"][f],
+        "x1_frac": study["x1_frac"][i1],
+        "x2_frac": study["x2_frac"][i2],
+        "ws_input": study["ws_input"][w],
+        "spar_mass_g": mass[np.arange(shape[0]), best],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wing spar material / FoS trade study")
+    parser.add_argument("dimensions_csv")
+    parser.add_argument("airfoil", help="airfoil coordinates (x y)")
+    parser.add_argument("--fos", type=float, nargs="+", default=list(DEFAULT_FOS))
+    parser.add_argument("--x1", type=float, nargs="+", default=list(DEFAULT_X1))
+    parser.add_argument("--x2", type=float, nargs="+", default=list(DEFAULT_X2))
+    parser.add_argument("--ws", type=float, nargs="+", default=None)
+    parser.add_argument("--out", default="spar_trade_study.npz")
+    args = parser.parse_args()
+
+    study = run_trade_study(
+        pd.read_csv(args.dimensions_csv),
+        np.loadtxt(args.airfoil),
+        fos_values=args.fos,
+        x1_fracs=args.x1,
+        x2_fracs=args.x2,
+        ws_values=args.ws,
+        out_path=args.out
+    )
+
+    n = int(np.prod(study["shape"]))
+    print(f"{n} combinations in {float(study['elapsed_s']):.2f} s → {args.out}")
+    print("\n================ LIGHTEST PER AIRCRAFT ================")
+    print(lightest_per_aircraft(study).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# stage_graph.py
+"""
+Incremental design evaluation over a stage dependency graph.
+
+evaluate_design is the chain of stage functions in mdo_outer_loop:
+
+    structure ──► sizing_pass1 ──► thrust ──► sizing_pass2
+                      aero ───────►
+
+Each stage declares the names it reads (geometry, geom_limits /
+env_params keys, upstream outputs). Its cache key is a hash of exactly
+those values plus the stage version, so a change re-runs only the
+stages that read it; downstream stages whose upstream outputs came back
+unchanged are cache hits as well. Results persist in SQLite, so a
+stored sweep re-runs in a fraction of the time after e.g. an
+env_params change (structure and pass 1 are never recomputed).
+
+Besides its inputs, the structure key includes the surrogate training
+fingerprint and the aero key the polar data fingerprint
+(airfoil_2d.polar_fingerprint), so retrained surrogates or regenerated
+polars / feature tables are never served from a stale cache. The polar
+fingerprint is taken once per run (or per evaluate call); when it
+changes, airfoil_2d's in-process feature caches are cleared so the
+aero results stored under the new key come from the new data.
+
+Bump a stage's version when its code changes.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import namedtuple
+
+import structural_surrogate.interface as structural
+from aero import airfoil_2d
+from mdo_outer_loop import (
+    structure_stage,
+    sizing_pass1_stage,
+    aero_stage,
+    thrust_stage,
+    sizing_pass2_stage,
+    _result,
+)
+
+Stage = namedtuple("Stage", ["name", "fn", "inputs", "optional", "outputs", "version"])
+
+LIMIT_KEYS = ("WS_max", "S_max", "TW_max")
+PASS1_LIMIT_KEYS = LIMIT_KEYS + ("TW_min",)   # pass 2 sets TW_min itself
+
+# Topological order
+STAGES = [
+    Stage("structure", structure_stage,
+          ("wingspan", "wing_chord", "fuse_chord"), (),
+          ("W_struct_g", "W_wing_g", "W_fuse_g", "W_struct_N"), 1),
+    Stage("sizing_pass1", sizing_pass1_stage,
+          ("W_struct_N", "W_max"), PASS1_LIMIT_KEYS,
+          ("WS", "S_wing"), 2),
+    Stage("aero", aero_stage,
+          ("wingspan", "wing_chord", "rho", "V_stall", "mu",
+           "airfoil_wing", "airfoil_fuse"), (),
+          ("Re", "Cl_max", "Cd0_wing", "Cd0_fuse"), 2),
+    Stage("thrust", thrust_stage,
+          ("WS", "S_wing", "fuse_chord", "Cl_max", "Cd0_wing", "Cd0_fuse",
+           "rho", "S_G", "V_stall", "Vv", "k"), (),
+          ("Cd0_total", "TW_required", "TW_takeoff", "TW_climb", "TW_cruise"), 1),
+    Stage("sizing_pass2", sizing_pass2_stage,
+          ("W_struct_N", "TW_required", "W_max"), LIMIT_KEYS,
+          ("TW", "payload_N", "S", "W", "feasible"), 1),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_cache (
+    stage TEXT NOT NULL,
+    key   TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (stage, key)
+);
+CREATE TABLE IF NOT EXISTS designs (
+    id       INTEGER PRIMARY KEY,
+    geometry TEXT NOT NULL UNIQUE
+);
+"""
+
+FLUSH_EVERY = 5000
+
+
+def _plain(v):
+    # numpy scalars → Python, so json / hashing see a stable repr
+    return v.item() if hasattr(v, "item") else v
+
+
+def affected_stages(changed):
+    """
+    Stages that (transitively) read any of the changed names.
+    """
+    dirty = set(changed)
+    hit = []
+    for stage in STAGES:
+        if dirty & set(stage.inputs + stage.optional):
+            hit.append(stage.name)
+            dirty |= set(stage.outputs)
+    return hit
+
+
+class IncrementalEvaluator:
+    """
+    Cached stage-by-stage evaluate_design.
+
+    Call initialize_structural_surrogates() first: the surrogate
+    fingerprint is part of the structure stage key. With a structural
+    correction installed the structure stage is not cached.
+    """
+
+    def __init__(self, db_path=":memory:"):
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+        self.memo = {stage.name: {} for stage in STAGES}
+        for stage, key, value in self.conn.execute("SELECT stage, key, value FROM stage_cache"):
+            if stage in self.memo:
+                self.memo[stage][key] = value
+
+        self.pending = []
+        self.polar_fp = None
+        self.stats = {stage.name: {"hits": 0, "misses": 0} for stage in STAGES}
+
+    # -------------------------------
+    # Cache
+    # -------------------------------
+
+    def _key(self, stage, kwargs):
+        extra = None
+        if stage.name == "structure":
+            extra = structural.surrogate_fingerprint
+        elif stage.name == "aero":
+            extra = self.polar_fp
+
+        blob = json.dumps(
+            [stage.name, stage.version, extra, sorted(kwargs.items())],
+            separators=(",", ":")
+        )
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+    def _run(self, stage, ns):
+        kwargs = {k: _plain(ns[k]) for k in stage.inputs}
+        kwargs.update({k: _plain(ns[k]) for k in stage.optional if ns.get(k) is not None})
+
+        cacheable = not (stage.name == "structure" and structural.structural_correction is not None)
+        key = self._key(stage, kwargs) if cacheable else None
+
+        cached = self.memo[stage.name].get(key) if cacheable else None
+        if cached is not None:
+            self.stats[stage.name]["hits"] += 1
+            return json.loads(cached)
+
+        self.stats[stage.name]["misses"] += 1
+        out = {k: _plain(v) for k, v in stage.fn(**kwargs).items()}
+
+        if cacheable:
+            value = json.dumps(out)
+            self.memo[stage.name][key] = value
+            self.pending.append((stage.name, key, value))
+            if len(self.pending) >= FLUSH_EVERY:
+                self.flush()
+
+        return out
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO stage_cache (stage, key, value) VALUES (?, ?, ?)",
+            self.pending
+        )
+        self.conn.execute("COMMIT")
+        self.pending = []
+
+    def clear(self, stage=None):
+        """
+        Drops cached results (one stage or all).
+        """
+        self.flush()
+        if stage is None:
+            self.conn.execute("DELETE FROM stage_cache")
+            for memo in self.memo.values():
+                memo.clear()
+        else:
+            self.conn.execute("DELETE FROM stage_cache WHERE stage = ?", (stage,))
+            self.memo[stage].clear()
+
+    # -------------------------------
+    # Evaluation
+    # -------------------------------
+
+    def _sync_polars(self, geom_limits):
+        fp = airfoil_2d.polar_fingerprint(
+            geom_limits["airfoil_wing"], geom_limits["airfoil_fuse"]
+        )
+        if fp != self.polar_fp:
+            # Features loaded earlier in this process may predate the files
+            airfoil_2d.clear_polar_caches()
+            self.polar_fp = fp
+
+    def evaluate(self, *, geometry, geom_limits, env_params):
+        """
+        Same result dict as evaluate_design.
+        """
+        self._sync_polars(geom_limits)
+        return self._evaluate(geometry, geom_limits, env_params)
+
+    def _evaluate(self, geometry, geom_limits, env_params):
+        wingspan, wing_chord, fuse_chord, taper = geometry
+
+        ns = {**geom_limits, **env_params,
+              "wingspan": wingspan, "wing_chord": wing_chord,
+              "fuse_chord": fuse_chord, "taper": taper}
+
+        for stage in STAGES:
+            ns.update(self._run(stage, ns))
+
+        return _result(geometry, ns)
+
+    def store_designs(self, designs):
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO designs (geometry) VALUES (?)",
+            [(json.dumps([_plain(v) for v in g]),) for g in designs]
+        )
+        self.conn.execute("COMMIT")
+
+    def stored_designs(self):
+        return [tuple(json.loads(g)) for (g,) in
+                self.conn.execute("SELECT geometry FROM designs ORDER BY id")]
+
+    def run(self, designs=None, *, geom_limits, env_params):
+        """
+        Evaluates a sweep (stored in the database for later re-runs);
+        designs=None re-runs the stored sweep. Designs that raise are
+        returned infeasible with the error and are not cached.
+        """
+        if designs is None:
+            designs = self.stored_designs()
+        else:
+            designs = [tuple(g) for g in designs]
+            self.store_designs(designs)
+
+        for s in self.stats.values():
+            s["hits"] = s["misses"] = 0
+
+        self._sync_polars(geom_limits)
+
+        t0 = time.perf_counter()
+        results = []
+        for geometry in designs:
+            try:
+                results.append(self._evaluate(geometry, geom_limits, env_params))
+            except Exception as exc:
+                results.append({
+                    "geometry": geometry,
+                    "feasible": False,
+                    "error": f"{type(exc).__name__}: {exc}"
+                })
+        self.flush()
+
+        self.elapsed_s = time.perf_counter() - t0
+        return results
+
+    def close(self):
+        self.flush()
+        self.conn.close()
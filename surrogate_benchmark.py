@@ -0,0 +1,239 @@
+"""
+Accuracy / latency benchmark for the structural surrogates.
+
+Runs each surrogate backend and kernel on synthetic cad_summary-shaped
+tables of increasing size and writes a JSON report, so training time,
+prediction latency, memory and cross-validation error can be compared
+between versions.
+
+Usage:
+    python -m structural_surrogate.surrogate_benchmark --sizes 25 50 100 --out report.json
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.gaussian_process.kernels import (
+    RBF, ConstantKernel, Matern, RationalQuadratic
+)
+from sklearn.model_selection import KFold
+
+from .wing_surrogate import WingSurrogate
+from .fuse_surrogate import FuselageSurrogate
+from .combined_surrogate import StructuralSurrogate
+
+
+# -------------------------------
+# Registries
+# -------------------------------
+
+KERNELS = {
+    "rbf": lambda: ConstantKernel(1.0) * RBF(length_scale=1.0),
+    "matern52": lambda: ConstantKernel(1.0) * Matern(length_scale=1.0, nu=2.5),
+    "rq": lambda: ConstantKernel(1.0) * RationalQuadratic(length_scale=1.0),
+}
+
+BACKENDS = {
+    "wing_gp": WingSurrogate,
+    "fuse_gp": FuselageSurrogate,
+    "combined_gp": StructuralSurrogate,
+}
+
+
+# -------------------------------
+# Synthetic data
+# -------------------------------
+
+def make_synthetic_cad_summary(n_rows, seed=0, noise_g=2.0):
+    """
+    Random cad_summary-shaped table over the run_mdo design space.
+    Weights follow smooth power laws so the GP has something to learn.
+    """
+    rng = np.random.default_rng(seed)
+
+    wingspan = rng.uniform(0.8, 1.3, n_rows)
+    wing_rib_chord = rng.uniform(0.15, 0.20, n_rows)
+    fuse_rib_chord = rng.uniform(0.28, 0.32, n_rows)
+
+    wing_weight = (
+        250.0 * wingspan * (wing_rib_chord / 0.175) ** 1.3
+        + rng.normal(0.0, noise_g, n_rows)
+    )
+    fuse_weight = (
+        180.0 * (fuse_rib_chord / 0.30) ** 1.5
+        + rng.normal(0.0, noise_g, n_rows)
+    )
+
+    return pd.DataFrame({
+        "wingspan": wingspan,
+        "wing_rib_chord": wing_rib_chord,
+        "wing_weight": wing_weight,
+        "fuse_rib_chord": fuse_rib_chord,
+        "fuse_weight": fuse_weight,
+    })
+
+
+# -------------------------------
+# Measurements
+# -------------------------------
+
+def _targets(model):
+    return getattr(model, "TARGETS", None) or [model.TARGET]
+
+
+def _median_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def _cross_validate(backend, kernel_name, df, folds, seed):
+    kf = KFold(n_splits=folds, shuffle=True, random_state=seed)
+    errors = []
+
+    for train_idx, test_idx in kf.split(df):
+        model = backend(kernel=KERNELS[kernel_name]())
+        model.fit_frame(df.iloc[train_idx])
+
+        test = df.iloc[test_idx]
+        y_hat = model.predict_batch(test[model.FEATURES].values)
+        y = test[_targets(model)].values
+        errors.append(y_hat.reshape(y.shape) - y)
+
+    err = np.concatenate(errors)
+    return float(np.sqrt(np.mean(err**2))), float(np.mean(np.abs(err)))
+
+
+def benchmark_case(
+    backend_name,
+    kernel_name,
+    n_rows,
+    *,
+    n_predict=1000,
+    repeats=3,
+    folds=5,
+    seed=0
+):
+    backend = BACKENDS[backend_name]
+    df = make_synthetic_cad_summary(n_rows, seed=seed)
+
+    # ---- Training time + peak memory ----
+    model = backend(kernel=KERNELS[kernel_name]())
+
+    tracemalloc.start()
+    model.fit_frame(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    train_s = _median_time(
+        lambda: backend(kernel=KERNELS[kernel_name]()).fit_frame(df),
+        repeats
+    )
+
+    # ---- Prediction latency ----
+    X = make_synthetic_cad_summary(n_predict, seed=seed + 1)[model.FEATURES].values
+    x0 = X[0]
+
+    single_s = _median_time(lambda: model.predict(*x0), max(repeats, 20))
+    batch_s = _median_time(lambda: model.predict_batch(X), repeats)
+
+    # ---- Accuracy ----
+    cv_rmse, cv_mae = _cross_validate(
+        backend, kernel_name, df, min(folds, n_rows), seed
+    )
+
+    return {
+        "backend": backend_name,
+        "kernel": kernel_name,
+        "n_rows": n_rows,
+        "train_s": train_s,
+        "train_peak_mem_kb": peak / 1024.0,
+        "predict_single_us": single_s * 1e6,
+        "predict_batch_us_per_point": batch_s * 1e6 / n_predict,
+        "n_predict": n_predict,
+        "cv_folds": min(folds, n_rows),
+        "cv_rmse_g": cv_rmse,
+        "cv_mae_g": cv_mae,
+        "fitted_kernel": str(model.model.kernel_),
+    }
+
+
+def run_benchmark(
+    sizes=(25, 50, 100, 200),
+    backends=None,
+    kernels=None,
+    **kwargs
+):
+    backends = list(BACKENDS) if backends is None else backends
+    kernels = list(KERNELS) if kernels is None else kernels
+
+    results = []
+    for backend_name in backends:
+        for kernel_name in kernels:
+            for n_rows in sizes:
+                res = benchmark_case(backend_name, kernel_name, n_rows, **kwargs)
+                print(
+                    f"{backend_name:>10} {kernel_name:>9} n={n_rows:<5} "
+                    f"train={res['train_s']*1e3:8.1f} ms  "
+                    f"single={res['predict_single_us']:8.1f} us  "
+                    f"batch={res['predict_batch_us_per_point']:6.2f} us/pt  "
+                    f"cv_rmse={res['cv_rmse_g']:.2f} g"
+                )
+                results.append(res)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "results": results,
+    }
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 200])
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS))
+    parser.add_argument("--kernels", nargs="+", choices=list(KERNELS))
+    parser.add_argument("--n-predict", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="surrogate_benchmark.json")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        sizes=args.sizes,
+        backends=args.backends,
+        kernels=args.kernels,
+        n_predict=args.n_predict,
+        repeats=args.repeats,
+        folds=args.folds,
+        seed=args.seed,
+    )
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+# sweep_queue.py
+"""
+Distributed sweep execution over a shared SQLite work queue.
+
+A coordinator splits the run_mdo design grid or a batch-runner
+dimensions CSV into work units. Workers on any node that can see the
+database (shared filesystem) claim units under a time-limited lease,
+renew it while working, and write one partial-result CSV per unit
+(atomically). A worker that dies simply lets its lease expire; the unit
+is re-claimed by another worker, up to MAX_ATTEMPTS. Merging
+concatenates the partial files in unit order.
+
+Usage:
+    python sweep_queue.py init   --db sweep.db --grid [--unit-size 25]
+    python sweep_queue.py init   --db sweep.db --dimensions dims.csv --airfoil af.dat
+    python sweep_queue.py work   --db sweep.db          (one per core / node)
+    python sweep_queue.py status --db sweep.db
+    python sweep_queue.py merge  --db sweep.db --out results.csv
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from mdo_config import (
+    WINGSPANS, WING_CHORDS, FUSE_CHORDS, TAPERS, GEOM_LIMITS, ENV_PARAMS
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LEASE_S = 600.0
+MAX_ATTEMPTS = 3
+POLL_S = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS units (
+    id            INTEGER PRIMARY KEY,
+    payload       TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result_path   TEXT,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS units_status ON units (status);
+"""
+
+
+# -------------------------------
+# Store
+# -------------------------------
+
+def connect(db_path):
+    # Rollback journal, not WAL: WAL needs shared memory, which network
+    # filesystems do not provide.
+    conn = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA busy_timeout=60000")
+    return conn
+
+
+def _meta(conn):
+    return {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM meta")}
+
+
+def create_queue(db_path, kind, units, config, results_dir=None):
+    """
+    kind  : "design" (payload = list of geometries) or "dimensions"
+            (payload = list of CSV rows as dicts)
+    units : iterable of JSON-serialisable payloads
+
+    Refuses a database that already holds units, so re-running init
+    cannot queue (and later merge) the same work twice.
+    """
+    results_dir = os.path.abspath(
+        results_dir or os.path.splitext(db_path)[0] + "_parts"
+    )
+    os.makedirs(results_dir, exist_ok=True)
+
+    conn = connect(db_path)
+    conn.executescript(SCHEMA)
+
+    conn.execute("BEGIN IMMEDIATE")
+    if conn.execute("SELECT COUNT(*) FROM units").fetchone()[0]:
+        conn.execute("ROLLBACK")
+        conn.close()
+        raise ValueError(
+            f"{db_path} already holds a queue; use a new --db or delete it first"
+        )
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [("kind", json.dumps(kind)),
+         ("config", json.dumps(config)),
+         ("results_dir", json.dumps(results_dir))]
+    )
+    conn.executemany(
+        "INSERT INTO units (payload) VALUES (?)",
+        [(json.dumps(u),) for u in units]
+    )
+    conn.execute("COMMIT")
+
+    n = conn.execute("SELECT COUNT(*) FROM units").fetchone()[0]
+    conn.close()
+    return n
+
+
+def claim(conn, owner, lease_s=LEASE_S, max_attempts=MAX_ATTEMPTS):
+    """
+    Leases one pending (or lease-expired) unit. Returns (id, payload)
+    or None.
+    """
+    now = time.time()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Expired leases that used up their retries are given up on
+        conn.execute(
+            "UPDATE units SET status = 'failed', "
+            "error = COALESCE(error, 'lease expired') "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, max_attempts)
+        )
+
+        row = conn.execute(
+            "SELECT id, payload FROM units "
+            "WHERE status = 'pending' "
+            "   OR (status = 'leased' AND lease_expires < ?) "
+            "ORDER BY id LIMIT 1",
+            (now,)
+        ).fetchone()
+
+        if row is not None:
+            conn.execute(
+                "UPDATE units SET status = 'leased', lease_owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (owner, now + lease_s, row[0])
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return None if row is None else (row[0], json.loads(row[1]))
+
+
+def renew(conn, unit_id, owner, lease_s=LEASE_S):
+    """
+    Extends a held lease; False if it was lost to another worker.
+    """
+    cur = conn.execute(
+        "UPDATE units SET lease_expires = ? "
+        "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+        (time.time() + lease_s, unit_id, owner)
+    )
+    return cur.rowcount == 1
+
+
+def complete(conn, unit_id, owner, result_path):
+    conn.execute(
+        "UPDATE units SET status = 'done', result_path = ?, lease_owner = ?, "
+        "lease_expires = NULL, error = NULL WHERE id = ? AND status != 'done'",
+        (result_path, owner, unit_id)
+    )
+
+
+def fail(conn, unit_id, owner, error, max_attempts=MAX_ATTEMPTS):
+    conn.execute(
+        "UPDATE units SET "
+        "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+        "lease_owner = NULL, lease_expires = NULL, error = ? "
+        "WHERE id = ? AND lease_owner = ?",
+        (max_attempts, error, unit_id, owner)
+    )
+
+
+def status(db_path):
+    conn = connect(db_path)
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status"))
+    conn.close()
+    return counts
+
+
+# -------------------------------
+# Unit runners
+# -------------------------------
+
+class _DesignRunner:
+    def __init__(self, config):
+        from structural_surrogate.interface import initialize_structural_surrogates
+        from mdo_outer_loop import evaluate_design
+
+        initialize_structural_surrogates(csv_path=config.get("csv_path"))
+        self.evaluate_design = evaluate_design
+        self.config = config
+
+    def __call__(self, geometry):
+        try:
+            res = self.evaluate_design(
+                geometry=tuple(geometry),
+                geom_limits=self.config["geom_limits"],
+                env_params=self.config["env_params"]
+            )
+        except Exception as exc:
+            return {
+                "wingspan": geometry[0], "wing_chord": geometry[1],
+                "fuse_chord": geometry[2], "taper": geometry[3],
+                "feasible": False, "error": f"{type(exc).__name__}: {exc}"
+            }
+
+        out = {k: v for k, v in res.items() if k != "geometry"}
+        out["feasible"] = bool(out["feasible"])
+        return {
+            "wingspan": geometry[0], "wing_chord": geometry[1],
+            "fuse_chord": geometry[2], "taper": geometry[3], **out
+        }
+
+
+class _DimensionsRunner:
+    def __init__(self, config):
+        from CALLING_CODE_ITERATION_7 import analyze_aircraft, load_function_from_file
+
+        self.analyze_aircraft = analyze_aircraft
+        self.wing_spar_sizing = load_function_from_file(
+            config["wing_code"], "wing_spar_sizing"
+        )
+        self.fuselage_moi_analysis = load_function_from_file(
+            config["fuselage_code"], "fuselage_moi_analysis"
+        )
+        self.airfoil_csv = config["airfoil_csv"]
+        self.airfoil_coords = np.loadtxt(self.airfoil_csv)
+        self.output_dir = config["output_dir"]
+
+    def __call__(self, row):
+        return self.analyze_aircraft(
+            pd.Series(row),
+            self.wing_spar_sizing,
+            self.fuselage_moi_analysis,
+            self.airfoil_csv,
+            self.airfoil_coords,
+            self.output_dir
+        )
+
+
+RUNNERS = {"design": _DesignRunner, "dimensions": _DimensionsRunner}
+
+
+# -------------------------------
+# Worker / merge
+# -------------------------------
+
+def _write_atomic(df, path):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def run_worker(db_path, worker_id=None, lease_s=LEASE_S, max_attempts=MAX_ATTEMPTS, poll_s=POLL_S):
+    """
+    Processes units until none are pending or leased.
+    Returns the number of units this worker completed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    conn = connect(db_path)
+    meta = _meta(conn)
+    runner = RUNNERS[meta["kind"]](meta["config"])
+
+    done = 0
+    while True:
+        unit = claim(conn, worker_id, lease_s, max_attempts)
+
+        if unit is None:
+            active = conn.execute(
+                "SELECT COUNT(*) FROM units WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+            if active == 0:
+                break
+            time.sleep(poll_s)   # others still hold leases; they may expire
+            continue
+
+        unit_id, items = unit
+        try:
+            rows = []
+            for item in items:
+                rows.append(runner(item))
+                if not renew(conn, unit_id, worker_id, lease_s):
+                    raise RuntimeError("lease lost")
+
+            path = os.path.join(meta["results_dir"], f"unit_{unit_id:06d}.csv")
+            _write_atomic(pd.DataFrame(rows), path)
+            complete(conn, unit_id, worker_id, path)
+            done += 1
+            print(f"[{worker_id}] unit {unit_id} done ({len(rows)} items)")
+
+        except Exception as exc:
+            fail(conn, unit_id, worker_id, f"{type(exc).__name__}: {exc}", max_attempts)
+            print(f"[{worker_id}] unit {unit_id} failed: {exc}")
+
+    conn.close()
+    return done
+
+
+def merge_results(db_path, out_csv=None):
+    conn = connect(db_path)
+    paths = [p for (p,) in conn.execute(
+        "SELECT result_path FROM units WHERE status = 'done' ORDER BY id"
+    )]
+    missing = conn.execute(
+        "SELECT COUNT(*) FROM units WHERE status != 'done'"
+    ).fetchone()[0]
+    conn.close()
+
+    if missing:
+        print(f"Warning: {missing} unit(s) not done; merging partial results.")
+
+    df = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True) if paths else pd.DataFrame()
+
+    if out_csv:
+        df.to_csv(out_csv, index=False)
+
+    return df
+
+
+# -------------------------------
+# Work-unit builders
+# -------------------------------
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def design_grid_units(unit_size=25):
+    grid = itertools.product(WINGSPANS, WING_CHORDS, FUSE_CHORDS, TAPERS)
+    # Repeated axis values (e.g. the constant TAPERS) would queue the
+    # same geometry several times; keep the first of each.
+    unique = dict.fromkeys(tuple(float(v) for v in g) for g in grid)
+    return _chunks([list(g) for g in unique], unit_size)
+
+
+def dimension_units(dimensions_csv, unit_size=25):
+    df = pd.read_csv(dimensions_csv)
+
+    if "aircraft_id" not in df.columns:
+        raise ValueError("CSV must contain aircraft_id")
+
+    return _chunks(json.loads(df.to_json(orient="records")), unit_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed sweep work queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_init = sub.add_parser("init")
+    p_init.add_argument("--db", required=True)
+    src = p_init.add_mutually_exclusive_group(required=True)
+    src.add_argument("--grid", action="store_true", help="run_mdo design grid")
+    src.add_argument("--dimensions", help="batch-runner dimensions CSV")
+    p_init.add_argument("--airfoil", help="airfoil file (dimensions sweep)")
+    p_init.add_argument("--wing-code", default=os.path.join(BASE_DIR, "REFACTORED_WING_CODE4.0.py"))
+    p_init.add_argument("--fuselage-code", default=os.path.join(BASE_DIR, "REFACTORED_FUSELAGE_CODE2.0.py"))
+    p_init.add_argument("--surrogate-csv", default=None)
+    p_init.add_argument("--unit-size", type=int, default=25)
+    p_init.add_argument("--results-dir", default=None)
+
+    p_work = sub.add_parser("work")
+    p_work.add_argument("--db", required=True)
+    p_work.add_argument("--worker-id", default=None)
+    p_work.add_argument("--lease", type=float, default=LEASE_S)
+    p_work.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    p_status = sub.add_parser("status")
+    p_status.add_argument("--db", required=True)
+
+    p_merge = sub.add_parser("merge")
+    p_merge.add_argument("--db", required=True)
+    p_merge.add_argument("--out", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "init":
+        if args.grid:
+            n = create_queue(
+                args.db, "design", design_grid_units(args.unit_size),
+                {"geom_limits": GEOM_LIMITS, "env_params": ENV_PARAMS,
+                 "csv_path": args.surrogate_csv},
+                args.results_dir
+            )
+        else:
+            if not args.airfoil:
+                parser.error("--dimensions needs --airfoil")
+            results_dir = os.path.abspath(
+                args.results_dir or os.path.splitext(args.db)[0] + "_parts"
+            )
+            n = create_queue(
+                args.db, "dimensions", dimension_units(args.dimensions, args.unit_size),
+                {"airfoil_csv": os.path.abspath(args.airfoil),
+                 "wing_code": os.path.abspath(args.wing_code),
+                 "fuselage_code": os.path.abspath(args.fuselage_code),
+                 "output_dir": results_dir},
+                results_dir
+            )
+        print(f"Queued {n} unit(s) in {args.db}")
+
+    elif args.command == "work":
+        done = run_worker(args.db, args.worker_id, args.lease, args.max_attempts)
+        print(f"Worker finished: {done} unit(s) completed")
+
+    elif args.command == "status":
+        for k, v in sorted(status(args.db).items()):
+            print(f"{k:<10} {v}")
+
+    else:
+        df = merge_results(args.db, args.out)
+        print(f"Merged {len(df)} row(s) into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
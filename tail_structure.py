@@ -0,0 +1,140 @@
+# tail_structure.py
+"""
+Tail-boom section sizing.
+
+Section: symmetric I-beam
+    a : flange width      [mm]
+    b : flange thickness  [mm]
+    c : web thickness     [mm]
+    d : overall depth     [mm]
+
+The full (a, b, c, d) candidate grid is built as broadcast arrays and
+bending stress, torsional shear stress, the stiffness limits and mass
+per metre are evaluated in one pass, so sizing one aircraft costs
+microseconds instead of a nested search.
+
+IY_max is an upper bound, as in the tail_analysis interface the batch
+runner was written against: it caps the section size, not its
+stiffness. Stiffness from below is only enforced through the optional
+tip-deflection limit (cantilever under M at the tip, M L² / 2 E I).
+"""
+
+import numpy as np
+import pandas as pd
+
+# ---- MATERIAL (LOCKED FOR NOW, same basis as the wing spars) ----
+SIGMA_ALLOW_N_MM2 = 20.0 / 3.0   # MOR 20 MPa / FoS 3
+TAU_ALLOW_N_MM2 = 10.0 / 3.0     # shear strength 10 MPa / FoS 3
+
+A_STEP_MM = 1.0
+D_STEP_MM = 1.0
+
+
+def _grid(lo_hi, step):
+    lo, hi = lo_hi
+    return np.arange(lo, hi + 0.5 * step, step, dtype=float)
+
+
+def tail_section_properties(a, b, c, d):
+    """
+    Broadcast section properties for an I-beam (all in mm).
+    Returns area [mm²], I_y (bending) [mm^4], J (torsion) [mm^4].
+    """
+    h_web = d - 2.0 * b
+
+    area = 2.0 * a * b + h_web * c
+
+    # Flanges + web about the horizontal centroidal axis
+    I_y = (a * d**3 - (a - c) * h_web**3) / 12.0
+
+    # Thin-walled open section
+    J = (2.0 * a * b**3 + h_web * c**3) / 3.0
+
+    return area, I_y, J
+
+
+def run_tail_structure(
+    M_Nmm,
+    T_Nmm,
+    IY_max_mm4,
+    L_mm,
+    E_N_mm2,
+    density_map_kg_m3,
+    b_values_mm,
+    c_values_mm,
+    a_range_mm,
+    d_range_mm,
+    a_step_mm=A_STEP_MM,
+    d_step_mm=D_STEP_MM,
+    sigma_allow_N_mm2=SIGMA_ALLOW_N_MM2,
+    tau_allow_N_mm2=TAU_ALLOW_N_MM2,
+    deflection_max_mm=None
+):
+    """
+    Sizes the tail boom over every (a, b, c, d) candidate.
+
+    density_map_kg_m3 : {thickness_mm: density} for flange (b) and web (c)
+                        sheet stock
+    deflection_max_mm : tip-deflection limit; None leaves deflection
+                        unconstrained (reported only)
+
+    Returns:
+        feasible_df  : every feasible section, lightest first
+        best         : dict for the lightest feasible section (or None)
+        ok           : True if any section is feasible
+    """
+    a = _grid(a_range_mm, a_step_mm)[:, None, None, None]
+    b = np.asarray(b_values_mm, dtype=float)[None, :, None, None]
+    c = np.asarray(c_values_mm, dtype=float)[None, None, :, None]
+    d = _grid(d_range_mm, d_step_mm)[None, None, None, :]
+
+    rho_b = np.array([density_map_kg_m3[v] for v in b_values_mm], dtype=float)[None, :, None, None]
+    rho_c = np.array([density_map_kg_m3[v] for v in c_values_mm], dtype=float)[None, None, :, None]
+
+    area, I_y, J = tail_section_properties(a, b, c, d)
+
+    # ---- STRESS ----
+    sigma = M_Nmm * (d / 2.0) / I_y
+    tau = T_Nmm * np.maximum(b, c) / J
+
+    # ---- STIFFNESS ----
+    deflection = M_Nmm * L_mm**2 / (2.0 * E_N_mm2 * I_y)
+
+    # ---- MASS (g/m) ----
+    h_web = d - 2.0 * b
+    mass_g_per_m = (2.0 * a * b * rho_b + h_web * c * rho_c) * 1e-6 * 1000.0
+
+    feasible = (
+        (h_web > 0.0)
+        & (c <= a)
+        & (sigma <= sigma_allow_N_mm2)
+        & (tau <= tau_allow_N_mm2)
+        & (I_y <= IY_max_mm4)
+    )
+    if deflection_max_mm is not None:
+        feasible &= deflection <= deflection_max_mm
+
+    shape = np.broadcast_shapes(a.shape, b.shape, c.shape, d.shape)
+    idx = np.nonzero(np.broadcast_to(feasible, shape))
+
+    def pick(arr):
+        return np.broadcast_to(arr, shape)[idx]
+
+    feasible_df = pd.DataFrame({
+        "a_mm": pick(a),
+        "b_mm": pick(b),
+        "c_mm": pick(c),
+        "d_mm": pick(d),
+        "area_mm2": pick(area),
+        "I_y_mm4": pick(I_y),
+        "J_mm4": pick(J),
+        "sigma_N_mm2": pick(sigma),
+        "tau_N_mm2": pick(tau),
+        "deflection_mm": pick(deflection),
+        "mass_g_per_m": pick(mass_g_per_m),
+    }).sort_values("mass_g_per_m", kind="stable").reset_index(drop=True)
+
+    ok = len(feasible_df) > 0
+    best = feasible_df.iloc[0].to_dict() if ok else None
+
+    return feasible_df, best, ok
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel, Matern
+
+from structural_surrogate.gp_gradient import gp_mean_gradient
+
+
+def _fit(kernel):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0.0, 1.0, (30, 3))
+    y = np.sin(3.0 * X[:, 0]) + X[:, 1] ** 2 - 0.5 * X[:, 2]
+    return GaussianProcessRegressor(
+        kernel=kernel, normalize_y=True, optimizer=None
+    ).fit(X, y)
+
+
+def _central_fd(model, X, h=1e-5):
+    grads = []
+    for j in range(X.shape[1]):
+        e = np.zeros(X.shape[1])
+        e[j] = h
+        grads.append((model.predict(X + e) - model.predict(X - e)) / (2.0 * h))
+    return np.stack(grads, axis=1)
+
+
+@pytest.mark.parametrize("kernel", [
+    ConstantKernel(2.0) * RBF(length_scale=[0.4, 0.6, 0.8]),
+    ConstantKernel(2.0) * Matern(length_scale=[0.4, 0.6, 0.8], nu=2.5),
+    ConstantKernel(2.0) * Matern(length_scale=0.5, nu=1.5),
+], ids=["rbf", "matern52", "matern15"])
+def test_mean_gradient_matches_finite_differences(kernel):
+    model = _fit(kernel)
+    X = np.random.default_rng(1).uniform(0.1, 0.9, (5, 3))
+
+    np.testing.assert_allclose(
+        gp_mean_gradient(model, X), _central_fd(model, X), rtol=1e-4, atol=1e-6
+    )
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+grid_search = pytest.importorskip("grid_search")
+
+GEOM_LIMITS = {"W_max": 100.0, "WS_max": 1e6, "S_max": 1e6}
+
+# 2 x 2 x 2 grid, one taper. Payload rises with W_struct between two
+# designs the search only reaches after it has pruned a box on the bound.
+W_STRUCT = np.array([3.12, 4.00, 3.99, 4.87, 3.78, 4.66, 4.65, 5.53]).reshape(2, 2, 2, 1)
+PAYLOAD = np.array([9.0, 4.0, 6.0, 6.0, 0.0, 7.0, 0.0, 0.0]).reshape(2, 2, 2, 1)
+FEASIBLE = np.array([0, 1, 0, 1, 1, 0, 1, 1], dtype=bool).reshape(2, 2, 2, 1)
+
+
+def _evaluate(*, geometry, geom_limits, env_params):
+    i = tuple(int(v) for v in geometry)
+    return {"geometry": geometry, "payload_N": PAYLOAD[i], "feasible": FEASIBLE[i]}
+
+
+def test_non_monotone_payload_matches_exhaustive(monkeypatch):
+    monkeypatch.setattr(grid_search, "_structural_grid", lambda axes: W_STRUCT)
+    axes = [np.arange(n, dtype=float) for n in W_STRUCT.shape]
+
+    result = grid_search.branch_and_bound_search(
+        axes, geom_limits=GEOM_LIMITS, env_params={}, evaluate=_evaluate
+    )
+    reference = grid_search.exhaustive_search(
+        axes, geom_limits=GEOM_LIMITS, env_params={}, evaluate=_evaluate
+    )
+
+    assert not result["payload_monotone"]
+    assert result["best"]["geometry"] == reference["geometry"]
+    assert result["n_pruned_bound"] == 0
@@ -7,3 +7,23 @@ def wing_3d_aero(airfoil_2d, AR, e=0.85):
         "Cl_max": Cl_max_3d,
         "Cd0": airfoil_2d["Cd0"]
     }
+
+
+AERO_DTYPE = np.dtype([("Cl_max", "f8"), ("Cd0", "f8"), ("k", "f8")])
+
+
+def wing_3d_aero_batch(airfoil_2d, AR, e=0.85):
+    """
+    Array version of wing_3d_aero.
+    airfoil_2d : structured array from airfoil_2d_features_batch
+    AR, e      : scalars or arrays broadcastable to airfoil_2d.shape
+    Returns a structured array (AERO_DTYPE), including induced-drag k.
+    """
+    shape = np.broadcast_shapes(airfoil_2d.shape, np.shape(AR), np.shape(e))
+    out = np.empty(shape, dtype=AERO_DTYPE)
+
+    out["Cl_max"] = 0.9 * airfoil_2d["Cl_max_2d"]
+    out["Cd0"] = airfoil_2d["Cd0"]
+    out["k"] = 1.0 / (np.pi * e * np.asarray(AR, dtype=float))
+
+    return out
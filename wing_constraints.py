@@ -1,47 +1,28 @@
+import warnings
+
 import numpy as np
 
-def evaluate_wing_constraints(
+
+def _constraint_curves(
+    ws,
     wingspan,
     fuselage_span,
-    W_kg,
+    W,
     S_G,
     V_stall,
     Vv,
-    aero,
-    geom_params,
-    rho=1.225
+    Cdmin,
+    CL_max,
+    T,
+    o,
+    j,
+    rho
 ):
     """
-    Returns wing-loading based T/W constraints.
+    T/W constraint curves. All arguments broadcast against each other,
+    so ws may be (n_ws,) for one design or (n, n_ws) for many.
     """
 
-    # ------------------------
-    # Unpack
-    # ------------------------
-    X   = geom_params["X"]
-    T   = geom_params["T"]
-    X1  = geom_params["X1"]
-    T1  = geom_params["T1"]
-    o   = geom_params["sweep_deg"]
-    j   = geom_params["taper"]
-
-    Cl2_w = geom_params["Cl2_w"]
-    Cl2_f = geom_params["Cl2_f"]
-
-    a0_w = geom_params["a0_w"]
-    am_w = geom_params["am_w"]
-    a0_f = geom_params["a0_f"]
-    am_f = geom_params["am_f"]
-
-    Cdmin = aero["Cd0"]
-    CL_max = aero["Cl_max_2d"]
-
-    # ------------------------
-    # Wing loading range
-    # ------------------------
-    ws = np.linspace(5, 250, 400)  # N/m²
-    W = W_kg * 9.81
-
     # ------------------------
     # Geometry
     # ------------------------
@@ -81,7 +62,9 @@ def evaluate_wing_constraints(
     TW_climb = (Vv/V_climb) + (q1/ws)*Cdmin + (k_w/q1)*ws
     TW_cruise = (q2*Cdmin)/ws + (k_w/q2)*ws
 
-    TW_required = np.maximum.reduce([TW_takeoff, TW_climb, TW_cruise])
+    TW_required = np.maximum.reduce(
+        np.broadcast_arrays(TW_takeoff, TW_climb, TW_cruise)
+    )
 
     # ------------------------
     # Thrust available
@@ -92,7 +75,294 @@ def evaluate_wing_constraints(
                 + (5.66688/W))
 
     return {
-        "ws": ws,
+        "TW_takeoff": TW_takeoff,
+        "TW_climb": TW_climb,
+        "TW_cruise": TW_cruise,
         "TW_required": TW_required,
         "TW_avail": TW_avail
     }
+
+
+def evaluate_wing_constraints(
+    wingspan,
+    fuselage_span,
+    W_kg,
+    S_G,
+    V_stall,
+    Vv,
+    aero,
+    geom_params,
+    rho=1.225
+):
+    """
+    Returns wing-loading based T/W constraints.
+    """
+
+    # ------------------------
+    # Wing loading range
+    # ------------------------
+    ws = np.linspace(5, 250, 400)  # N/m²
+
+    curves = _constraint_curves(
+        ws,
+        wingspan,
+        fuselage_span,
+        W_kg * 9.81,
+        S_G,
+        V_stall,
+        Vv,
+        aero["Cd0"],
+        aero["Cl_max_2d"],
+        geom_params["T"],
+        geom_params["sweep_deg"],
+        geom_params["taper"],
+        rho
+    )
+
+    return {"ws": ws, **curves}
+
+
+# ==================================================
+# BATCHED (MANY DESIGNS)
+# ==================================================
+
+def _design_columns(
+    wingspan,
+    fuselage_span,
+    W_kg,
+    S_G,
+    V_stall,
+    Vv,
+    aero,
+    geom_params,
+    rho
+):
+    """
+    Broadcasts per-design inputs (scalars or (n,) arrays) to (n, 1) columns.
+    """
+    cols = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+            wingspan,
+            fuselage_span,
+            np.asarray(W_kg, dtype=float) * 9.81,
+            S_G,
+            V_stall,
+            Vv,
+            aero["Cd0"],
+            aero["Cl_max_2d"],
+            geom_params["T"],
+            geom_params["sweep_deg"],
+            geom_params["taper"],
+            rho
+        )]
+    )
+    return [c[:, None] for c in cols]
+
+
+def evaluate_wing_constraints_batch(
+    wingspan,
+    fuselage_span,
+    W_kg,
+    S_G,
+    V_stall,
+    Vv,
+    aero,
+    geom_params,
+    rho=1.225,
+    ws=None
+):
+    """
+    evaluate_wing_constraints for many designs at once.
+
+    Any per-design input (including the values inside aero / geom_params)
+    may be a scalar or an (n,) array. Returns "ws" (n_ws,) and each
+    curve as an (n, n_ws) array.
+    """
+    if ws is None:
+        ws = np.linspace(5, 250, 400)  # N/m²
+    ws = np.asarray(ws, dtype=float)
+
+    cols = _design_columns(
+        wingspan, fuselage_span, W_kg, S_G, V_stall, Vv,
+        aero, geom_params, rho
+    )
+    curves = _constraint_curves(ws[None, :], *cols)
+
+    n = cols[0].shape[0]
+    curves = {k: np.broadcast_to(v, (n, len(ws))) for k, v in curves.items()}
+
+    return {"ws": ws, **curves}
+
+
+def _bisect(margin_fn, a, b, tol):
+    """
+    Vectorised bisection; margin_fn(a) and margin_fn(b) differ in sign
+    element-wise.
+    """
+    fa = margin_fn(a) >= 0.0
+    n_iter = int(np.ceil(np.log2(max(np.max(b - a), tol) / tol)))
+
+    for _ in range(n_iter):
+        m = 0.5 * (a + b)
+        same = (margin_fn(m) >= 0.0) == fa
+        a = np.where(same, m, a)
+        b = np.where(same, b, m)
+
+    return 0.5 * (a + b)
+
+
+def _golden_max(fn, a, b, tol):
+    """
+    Vectorised golden-section search for the maximum of fn on [a, b].
+    """
+    r = 0.5 * (np.sqrt(5.0) - 1.0)
+    n_iter = int(np.ceil(np.log(max(np.max(b - a), tol) / tol) / np.log(1.0 / r)))
+
+    for _ in range(n_iter):
+        c = b - r * (b - a)
+        d = a + r * (b - a)
+        left = fn(c) >= fn(d)
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+
+    return 0.5 * (a + b)
+
+
+def solve_wing_constraints(
+    wingspan,
+    fuselage_span,
+    W_kg,
+    S_G,
+    V_stall,
+    Vv,
+    aero,
+    geom_params,
+    rho=1.225,
+    ws_bounds=(5.0, 250.0),
+    n_bracket=64,
+    tol=1e-6
+):
+    """
+    Feasible wing-loading set per design, without dense curves.
+
+    A coarse grid brackets every sign change of TW_avail - TW_required,
+    and each is refined by vectorised bisection. Infeasible local maxima
+    of the coarse margin are searched (golden section) for feasible
+    windows narrower than the grid spacing; windows sharper than that
+    can still be missed, so raise n_bracket for them.
+
+    The feasible set may be split into several intervals. The design
+    point is the top of the highest one: the highest wing loading
+    (smallest wing) that still has enough thrust. ws_lo / ws_hi bound
+    that interval; "intervals" lists all of them and a warning is
+    issued when any design's set is not a single interval.
+
+    Returns dict of (n,) arrays:
+        feasible, ws_lo, ws_hi, ws_opt, TW_opt, n_intervals
+    (NaN where no feasible wing loading exists in ws_bounds), plus
+    intervals: list of (k, 2) arrays, one per design.
+    """
+    cols = _design_columns(
+        wingspan, fuselage_span, W_kg, S_G, V_stall, Vv,
+        aero, geom_params, rho
+    )
+    flat = [c[:, 0] for c in cols]
+
+    def margin(idx, ws_n):
+        c = _constraint_curves(ws_n, *[f[idx] for f in flat])
+        return c["TW_avail"] - c["TW_required"]
+
+    # ------------------------
+    # Coarse bracketing
+    # ------------------------
+    grid = np.linspace(ws_bounds[0], ws_bounds[1], n_bracket)
+    coarse = _constraint_curves(grid[None, :], *cols)
+    m_c = coarse["TW_avail"] - coarse["TW_required"]
+    ok = m_c >= 0.0
+
+    n = ok.shape[0]
+
+    # (design, a, b) brackets with a sign change between a and b
+    d_idx, i_idx = np.nonzero(ok[:, 1:] != ok[:, :-1])
+    br_d = [d_idx]
+    br_a = [grid[i_idx]]
+    br_b = [grid[i_idx + 1]]
+
+    # ------------------------
+    # Hidden windows
+    # ------------------------
+    inner = m_c[:, 1:-1]
+    peak = ~ok[:, 1:-1] & (inner >= m_c[:, :-2]) & (inner >= m_c[:, 2:])
+    p_d, p_i = np.nonzero(peak)
+    p_i = p_i + 1
+
+    if len(p_d):
+        ws_peak = _golden_max(
+            lambda w: margin(p_d, w), grid[p_i - 1], grid[p_i + 1], tol
+        )
+        hit = margin(p_d, ws_peak) >= 0.0
+        p_d, p_i, ws_peak = p_d[hit], p_i[hit], ws_peak[hit]
+
+        # Each window adds an up- and a down-crossing around its peak
+        br_d += [p_d, p_d]
+        br_a += [grid[p_i - 1], ws_peak]
+        br_b += [ws_peak, grid[p_i + 1]]
+
+    br_d = np.concatenate(br_d)
+    br_a = np.concatenate(br_a)
+    br_b = np.concatenate(br_b)
+
+    # ------------------------
+    # Refine every crossing
+    # ------------------------
+    if len(br_d):
+        cross = _bisect(lambda w: margin(br_d, w), br_a, br_b, tol)
+    else:
+        cross = np.empty(0)
+
+    order = np.lexsort((cross, br_d))
+    br_d, cross = br_d[order], cross[order]
+    splits = np.searchsorted(br_d, np.arange(1, n))
+
+    intervals = []
+    for d, xs in enumerate(np.split(cross, splits)):
+        # Crossings alternate, starting from the state at ws_bounds[0]
+        edges = list(xs)
+        if ok[d, 0]:
+            edges.insert(0, float(ws_bounds[0]))
+        if len(edges) % 2:
+            edges.append(float(ws_bounds[1]))
+        intervals.append(np.array(edges, dtype=float).reshape(-1, 2))
+
+    n_intervals = np.array([len(iv) for iv in intervals])
+    feasible = n_intervals > 0
+
+    nan = np.full(n, np.nan)
+    ws_lo = nan.copy()
+    ws_hi = nan.copy()
+    for d in np.nonzero(feasible)[0]:
+        ws_lo[d], ws_hi[d] = intervals[d][-1]
+
+    if np.any(n_intervals > 1):
+        warnings.warn(
+            f"{int(np.sum(n_intervals > 1))} design(s) have a feasible "
+            "wing-loading set split into several intervals; ws_lo/ws_hi "
+            "bound the highest one, see 'intervals'."
+        )
+
+    TW_opt = nan.copy()
+    if feasible.any():
+        idx = np.nonzero(feasible)[0]
+        TW_opt[idx] = _constraint_curves(
+            ws_hi[idx], *[f[idx] for f in flat]
+        )["TW_required"]
+
+    return {
+        "feasible": feasible,
+        "ws_lo": ws_lo,
+        "ws_hi": ws_hi,
+        "ws_opt": ws_hi.copy(),
+        "TW_opt": TW_opt,
+        "n_intervals": n_intervals,
+        "intervals": intervals
+    }
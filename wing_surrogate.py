@@ -4,11 +4,20 @@ import pandas as pd
 from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import RBF, ConstantKernel
 from .preprocess import Scaler
+from .gp_gradient import gp_mean_gradient, scaler_jacobian
+from profiling import profiled
 
 
 class WingSurrogate:
-    def __init__(self):
-        kernel = ConstantKernel(1.0) * RBF(length_scale=1.0)
+    # Inputs: geometry (Category A)
+    FEATURES = ["wingspan", "wing_rib_chord"]
+
+    # Target: wing weight (grams)
+    TARGET = "wing_weight"
+
+    def __init__(self, kernel=None):
+        if kernel is None:
+            kernel = ConstantKernel(1.0) * RBF(length_scale=1.0)
         self.model = GaussianProcessRegressor(
             kernel=kernel,
             alpha=1e-4,
@@ -23,12 +32,22 @@ class WingSurrogate:
             csv_path = os.path.join(base_dir, "cad_summary.csv")
 
         df = pd.read_csv(csv_path)
+        self.fit_frame(df)
 
-        # Inputs: geometry (Category A)
-        X = df[["wingspan", "wing_rib_chord"]].values
+    @profiled
+    def fit_frame(self, df, warm_start=False):
+        """
+        Trains on a cad_summary-shaped DataFrame.
+        Rows missing the wing columns (e.g. fuselage-only samples) are skipped.
+        warm_start=True starts the hyperparameter search from the last fit.
+        """
+        df = df.dropna(subset=self.FEATURES + [self.TARGET])
 
-        # Target: wing weight (grams)
-        y = df["wing_weight"].values
+        X = df[self.FEATURES].values
+        y = df[self.TARGET].values
+
+        if warm_start and self.trained:
+            self.model.kernel = self.model.kernel_
 
         self.scaler.fit(X)
         Xn = self.scaler.transform(X)
@@ -36,6 +55,7 @@ class WingSurrogate:
 
         self.trained = True
 
+    @profiled
     def predict(self, wingspan, wing_chord):
         if not self.trained:
             raise RuntimeError("WingSurrogate used before training.")
@@ -43,3 +63,34 @@ class WingSurrogate:
         X = np.array([[wingspan, wing_chord]])
         Xn = self.scaler.transform(X)
         return float(self.model.predict(Xn)[0])
+
+    @profiled
+    def predict_batch(self, X, return_std=False):
+        """
+        X : (n, 2) array of [wingspan, wing_rib_chord]
+        Returns wing weights (grams), plus predictive std if requested.
+        """
+        if not self.trained:
+            raise RuntimeError("WingSurrogate used before training.")
+
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        Xn = self.scaler.transform(X)
+        return self.model.predict(Xn, return_std=return_std)
+
+    @profiled
+    def predict_with_grad(self, wingspan, wing_chord):
+        """
+        Returns wing weight (grams) and its analytic gradient
+        [dW/d wingspan, dW/d wing_chord] (grams per metre).
+        """
+        if not self.trained:
+            raise RuntimeError("WingSurrogate used before training.")
+
+        X = np.array([[wingspan, wing_chord]])
+        Xn = self.scaler.transform(X)
+
+        W = float(self.model.predict(Xn)[0])
+        grad_n = gp_mean_gradient(self.model, Xn)[0]
+        grad = scaler_jacobian(self.scaler, X) @ grad_n
+
+        return W, grad